@@ -0,0 +1,46 @@
+"""
+Throughput of `load_json` with the different json decoders.
+
+Usage: python -m benchmarks.decoders --lines 2000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Tuple
+
+from logs_handler.utils import load_json, make_decoder, available_decoders
+from logs_handler.reports import AvgResponseTime, UserAgent
+from .generator import GeneratorConfig, generate_log
+
+def measure(path: str, required_fields: List[str], backend: str | None, exact_decimals: bool) -> float:
+    """Returns lines per second of a full `load_json` pass."""
+    decoder = None if backend is None else make_decoder(backend, required_fields, exact_decimals)
+    started = time.perf_counter()
+    lines = sum(1 for _line in load_json(path, required_fields, decoder=decoder))
+    return lines / (time.perf_counter() - started)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2_000_000, help="Amount of generated log lines.")
+    args = parser.parse_args()
+
+    cases: List[Tuple[str, List[str], bool]] = [
+        ("average", AvgResponseTime.REQUIRED_FIELDS, True),
+        ("user-agent", UserAgent.REQUIRED_FIELDS, False)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.log")
+        generate_log(path, GeneratorConfig(lines=args.lines))
+
+        for report_name, required_fields, exact_decimals in cases:
+            baseline = measure(path, required_fields, None, True)
+            print(f"{report_name:<12} {'baseline':<10} {baseline:>12,.0f} lines/sec")
+
+            for backend in available_decoders():
+                speed = measure(path, required_fields, backend, exact_decimals)
+                print(f"{report_name:<12} {backend:<10} {speed:>12,.0f} lines/sec  x{speed / baseline:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Deterministic generator of nginx-like json logs for benchmarks and load tests.
+
+Usage: python -m benchmarks.generator out.log --lines 1000000 --urls 500 --user-agents 50 --malformed 0.001
+"""
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import random
+from typing import Iterator, List, Tuple
+
+STATUSES = [(200, 80), (201, 5), (204, 2), (304, 5), (400, 2), (401, 1), (404, 3), (500, 1), (502, 1)]
+METHODS = [("GET", 80), ("POST", 14), ("PUT", 3), ("DELETE", 2), ("PATCH", 1)]
+RESOURCES = ["users", "orders", "homeworks", "lessons", "courses", "payments", "context", "specializations", "search", "files"]
+BROWSERS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{version}.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/{version}.0 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:{version}.0) Gecko/20100101 Firefox/{version}.0",
+    "python-requests/2.{version}",
+    "curl/8.{version}.0"
+]
+# Lines written to the file at once.
+WRITE_BATCH = 10000
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """
+    Shape of a generated log. The same config always produces the same bytes.
+
+    Urls and user agents are picked with Zipf-like weights from pools of the given cardinality, timestamps are
+    spread evenly (in order) over `span_seconds` from `start`, and `malformed_ratio` of the lines are cut in half.
+    """
+    lines: int = 100_000
+    urls: int = 100
+    user_agents: int = 20
+    malformed_ratio: float = 0.0
+    start: str = "2025-06-22T00:00:00+00:00"
+    span_seconds: int = 24 * 60 * 60
+    seed: int = 0
+
+
+def _zipf_weights(count: int) -> List[float]:
+    """Cumulative weights of a Zipf-like popularity of `count` items."""
+    cumulative, total = [], 0.0
+    for rank in range(1, count + 1):
+        total += 1 / rank ** 1.1
+        cumulative.append(total)
+    return cumulative
+
+def _url_pool(rng: random.Random, count: int) -> List[str]:
+    urls = []
+    for i in range(count):
+        resource = RESOURCES[i % len(RESOURCES)]
+        depth = rng.randrange(3)
+        if depth == 0:
+            urls.append(f"/api/{resource}/" if i < len(RESOURCES) else f"/api/{resource}/v{i // len(RESOURCES)}/")
+        elif depth == 1:
+            urls.append(f"/api/{resource}/{rng.randrange(1, 10 ** 6)}/")
+        else:
+            urls.append(f"/api/{resource}/{rng.randrange(1, 10 ** 6)}/{RESOURCES[rng.randrange(len(RESOURCES))]}/")
+    return urls
+
+def _agent_pool(count: int) -> List[str]:
+    return [BROWSERS[i % len(BROWSERS)].format(version=100 + i // len(BROWSERS)) for i in range(count)]
+
+def _weighted(pairs: List[Tuple[object, int]]) -> Tuple[List[object], List[int]]:
+    values, cumulative, total = [], [], 0
+    for value, weight in pairs:
+        total += weight
+        values.append(value)
+        cumulative.append(total)
+    return values, cumulative
+
+def generate_lines(config: GeneratorConfig) -> List[str]:
+    """Returns the generated lines, newline terminated. Meant for small logs, big ones are written by `generate_log`."""
+    lines: List[str] = []
+    for batch in _generate_batches(config):
+        lines.extend(batch)
+    return lines
+
+def _generate_batches(config: GeneratorConfig) -> Iterator[List[str]]:
+    rng = random.Random(config.seed)
+    urls, url_weights = _url_pool(rng, config.urls), _zipf_weights(config.urls)
+    agents, agent_weights = _agent_pool(config.user_agents), _zipf_weights(config.user_agents)
+    statuses, status_weights = _weighted(STATUSES)
+    methods, method_weights = _weighted(METHODS)
+    start = datetime.fromisoformat(config.start)
+    step = config.span_seconds / max(config.lines, 1)
+    offset = start.strftime("%z")
+    offset = f"{offset[:3]}:{offset[3:]}" if offset else "+00:00"
+
+    second, timestamp = -1, ""
+    for first in range(0, config.lines, WRITE_BATCH):
+        count = min(WRITE_BATCH, config.lines - first)
+        batch_urls = rng.choices(urls, cum_weights=url_weights, k=count)
+        batch_agents = rng.choices(agents, cum_weights=agent_weights, k=count)
+        batch_statuses = rng.choices(statuses, cum_weights=status_weights, k=count)
+        batch_methods = rng.choices(methods, cum_weights=method_weights, k=count)
+        lines = []
+
+        for i in range(count):
+            line_second = int((first + i) * step)
+            if line_second != second:
+                second = line_second
+                timestamp = (start + timedelta(seconds=second)).strftime("%Y-%m-%dT%H:%M:%S") + offset
+
+            response_time = round(min(rng.lognormvariate(-3.0, 1.0), 30.0), 3)
+            line = (
+                f'{{"@timestamp": "{timestamp}", "status": {batch_statuses[i]}, "url": "{batch_urls[i]}", '
+                f'"request_method": "{batch_methods[i]}", "response_time": {response_time}, "http_user_agent": "{batch_agents[i]}"}}'
+            )
+            if config.malformed_ratio and rng.random() < config.malformed_ratio:
+                line = line[:len(line) // 2]
+            lines.append(line + "\n")
+
+        yield lines
+
+def generate_log(path: str, config: GeneratorConfig = GeneratorConfig()) -> None:
+    """Writes the log described by the config."""
+    with open(path, "w") as file:
+        for lines in _generate_batches(config):
+            file.writelines(lines)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Output log file.")
+    parser.add_argument("--lines", type=int, default=GeneratorConfig.lines, help="Amount of lines.")
+    parser.add_argument("--urls", type=int, default=GeneratorConfig.urls, help="Amount of distinct urls.")
+    parser.add_argument("--user-agents", type=int, default=GeneratorConfig.user_agents, help="Amount of distinct user agents.")
+    parser.add_argument("--malformed", type=float, default=GeneratorConfig.malformed_ratio, help="Ratio of malformed lines.")
+    parser.add_argument("--start", default=GeneratorConfig.start, help="ISO 8601 timestamp of the first line.")
+    parser.add_argument("--span", type=int, default=GeneratorConfig.span_seconds, help="Seconds covered by the log.")
+    parser.add_argument("--seed", type=int, default=GeneratorConfig.seed, help="Random seed.")
+    args = parser.parse_args()
+
+    generate_log(args.path, GeneratorConfig(args.lines, args.urls, args.user_agents, args.malformed, args.start, args.span, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Throughput benchmarks with saved baselines.
+
+Every case runs in a fresh process on the same generated log and reports lines/sec, time to first output
+and peak RSS: `load_json` alone, the aggregation of each report over decoded entries, and `main.py` end to end.
+Report cases also measure the memory of the aggregated state per group (e.g. per handler), traced in a second pass.
+
+Usage:
+    python -m benchmarks.harness --lines 500000 --save benchmarks/baseline.json
+    python -m benchmarks.harness --lines 500000 --compare benchmarks/baseline.json --threshold 0.2
+    python -m benchmarks.harness --lines 1000000 --urls 1000000 --cases report:average report:average-compact
+"""
+import argparse
+from dataclasses import asdict, dataclass
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from .generator import GeneratorConfig, generate_log
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Allowed relative slowdown (or memory growth) against the baseline before a case counts as a regression.
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass
+class CaseResult:
+    """Measurements of a single benchmark case."""
+    name: str
+    lines: int
+    seconds: float
+    first_output_seconds: float
+    peak_rss_kb: int = 0
+    groups: int = 0
+    bytes_per_group: float = 0.0
+
+    @property
+    def lines_per_sec(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+def _report_classes() -> Dict[str, Callable]:
+    from logs_handler.reports import AvgResponseTime, CompactAvgResponseTime, UserAgent, Percentiles, TimeSeries
+    return {
+        "average": AvgResponseTime,
+        "average-compact": CompactAvgResponseTime,
+        "user-agent": UserAgent,
+        "percentiles": Percentiles,
+        "timeseries": TimeSeries
+    }
+
+def _run_load_json(path: str) -> CaseResult:
+    from logs_handler.reports import AvgResponseTime
+    from logs_handler.utils import load_json
+
+    started = time.perf_counter()
+    first_output = None
+    lines = 0
+    for _line in load_json(path, AvgResponseTime.REQUIRED_FIELDS):
+        if first_output is None:
+            first_output = time.perf_counter() - started
+        lines += 1
+
+    return CaseResult("load_json", lines, time.perf_counter() - started, first_output or 0.0)
+
+def _run_report(name: str, path: str) -> CaseResult:
+    from logs_handler.engine import build_decoder
+    from logs_handler.utils import load_json
+
+    report = _report_classes()[name]()
+    decoder = build_decoder([report], lambda line: True)
+    entries = list(load_json(path, report.get_required_fields(), decoder=decoder))
+
+    started = time.perf_counter()
+    for entry in entries:
+        report.process_line(entry)
+    groups = len(report.generate_table())
+    seconds = time.perf_counter() - started
+
+    # The entries exist already, so only the state of the fresh report is traced (without its key strings).
+    tracemalloc.start()
+    traced_report = _report_classes()[name]()
+    for entry in entries:
+        traced_report.process_line(entry)
+    state_bytes, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return CaseResult(f"report:{name}", len(entries), seconds, seconds, groups=groups, bytes_per_group=state_bytes / groups if groups else 0.0)
+
+def run_case(name: str, path: str) -> CaseResult:
+    """Runs an in-process case. Called in the benchmark's child process."""
+    if name == "load_json":
+        return _run_load_json(path)
+    return _run_report(name.split(":", 1)[1], path)
+
+def case_names() -> List[str]:
+    return ["load_json"] + [f"report:{name}" for name in _report_classes()] + ["main"]
+
+
+def _peak_rss_kb(rusage) -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+
+def measure_case(name: str, path: str, lines: int) -> CaseResult:
+    """Runs the case in a fresh process, adding its peak RSS."""
+    if name == "main":
+        command = [sys.executable, os.path.join(ROOT_DIR, "main.py"), "-f", path, "-r", "average", "user-agent"]
+    else:
+        command = [sys.executable, "-m", "benchmarks.harness", "--run-case", name, "--log", path]
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    first_line = process.stdout.readline()
+    first_output = time.perf_counter() - started
+    output = first_line + process.stdout.read()
+    process.stdout.close()
+    _pid, status, rusage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark case {name} failed with exit code {process.returncode}")
+
+    if name == "main":
+        result = CaseResult(name, lines, seconds, first_output)
+    else:
+        result = CaseResult(**json.loads(output.strip().splitlines()[-1]))
+    result.peak_rss_kb = _peak_rss_kb(rusage)
+    return result
+
+
+def compare(results: List[CaseResult], baseline: Dict[str, dict], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Returns a description of every case that is slower or bigger than the baseline by more than the threshold."""
+    regressions = []
+
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+
+        base_speed = base["lines"] / base["seconds"] if base["seconds"] else 0.0
+        if base_speed and result.lines_per_sec < base_speed * (1 - threshold):
+            regressions.append(f"{result.name}: {result.lines_per_sec:,.0f} lines/sec, baseline {base_speed:,.0f}")
+
+        if base["peak_rss_kb"] and result.peak_rss_kb > base["peak_rss_kb"] * (1 + threshold):
+            regressions.append(f"{result.name}: peak RSS {result.peak_rss_kb:,} KB, baseline {base['peak_rss_kb']:,} KB")
+
+        base_group = base.get("bytes_per_group", 0.0)
+        if base_group and result.bytes_per_group > base_group * (1 + threshold):
+            regressions.append(f"{result.name}: {result.bytes_per_group:,.0f} bytes per group, baseline {base_group:,.0f}")
+
+    return regressions
+
+def print_results(results: List[CaseResult]) -> None:
+    print(f"{'case':<24} {'lines/sec':>14} {'first output':>13} {'peak RSS':>12} {'groups':>9} {'B/group':>8}")
+    for result in results:
+        group_columns = f" {result.groups:>9,} {result.bytes_per_group:>8,.0f}" if result.groups else ""
+        print(f"{result.name:<24} {result.lines_per_sec:>14,.0f} {result.first_output_seconds:>12.3f}s {result.peak_rss_kb:>9,} KB{group_columns}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=500_000, help="Amount of generated log lines.")
+    parser.add_argument("--urls", type=int, default=GeneratorConfig.urls, help="Amount of distinct urls.")
+    parser.add_argument("--malformed", type=float, default=GeneratorConfig.malformed_ratio, help="Ratio of malformed lines.")
+    parser.add_argument("--cases", nargs="+", default=None, help="Cases to run, all by default.")
+    parser.add_argument("--save", help="Write the results as the new baseline.")
+    parser.add_argument("--compare", help="Compare the results with a saved baseline, exit with 1 on a regression.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative regression.")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--log", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case is not None:
+        print(json.dumps(asdict(run_case(args.run_case, args.log))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.log")
+        generate_log(path, GeneratorConfig(lines=args.lines, urls=args.urls, malformed_ratio=args.malformed))
+        results = [measure_case(name, path, args.lines) for name in (args.cases or case_names())]
+
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({result.name: asdict(result) for result in results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
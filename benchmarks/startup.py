@@ -0,0 +1,71 @@
+"""
+CLI startup time, measured with `python -X importtime`.
+
+Lists the total import time of `main.py` with the given arguments and the slowest imported modules.
+
+Usage: python -m benchmarks.startup -- --help
+       python -m benchmarks.startup -- -f access.log -r average --format csv
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Set
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Slowest modules listed, by their own import time.
+TOP_MODULES = 15
+# Runs the script given as first argument like `python script.py ...`, then lists the loaded modules on stderr.
+LIST_MODULES = (
+    "import atexit, runpy, sys; "
+    "atexit.register(lambda: print(*('loaded module: ' + name for name in sorted(sys.modules)), sep='\\n', file=sys.stderr)); "
+    "sys.argv = sys.argv[1:]; runpy.run_path(sys.argv[0], run_name='__main__')"
+)
+MODULE_PREFIX = "loaded module: "
+
+
+def import_times(main_args: List[str]) -> Dict[str, int]:
+    """
+    Runs `main.py` with the arguments under `-X importtime` and returns the self import time,
+    in microseconds, of every module it imported. Modules already imported by the interpreter itself are not listed.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT_DIR, "main.py")] + main_args,
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def loaded_modules(main_args: List[str]) -> Set[str]:
+    """
+    Runs `main.py` with the arguments and returns the names of all the modules loaded by its end.
+    Unlike `import_times`, it includes the modules imported with `importlib.import_module`, which `-X importtime` leaves out.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", LIST_MODULES, os.path.join(ROOT_DIR, "main.py")] + main_args,
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    return {line[len(MODULE_PREFIX):] for line in result.stderr.splitlines() if line.startswith(MODULE_PREFIX)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("main_args", nargs=argparse.REMAINDER, help="Arguments of main.py, after `--`.")
+    args = parser.parse_args(argv)
+    main_args = args.main_args[1:] if args.main_args[:1] == ["--"] else args.main_args
+
+    times = import_times(main_args or ["--help"])
+    print(f"{len(times)} modules imported in {sum(times.values()) / 1000:.1f} ms")
+    for name, self_us in sorted(times.items(), key=lambda item: item[1], reverse=True)[:TOP_MODULES]:
+        print(f"{self_us / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,15 @@
-from .parser import init_parser, parse_args, ReportType
+from .parser import init_parser, parse_args, init_convert_parser, parse_convert_args, init_serve_parser, parse_serve_args, ParsedArgs, ParsedServeArgs, ReportType, CONVERT_COMMAND, SERVE_COMMAND
 
-__all__ = ["init_parser", "parse_args", "ReportType"]
\ No newline at end of file
+__all__ = [
+    "init_parser",
+    "parse_args",
+    "init_convert_parser",
+    "parse_convert_args",
+    "init_serve_parser",
+    "parse_serve_args",
+    "ParsedArgs",
+    "ParsedServeArgs",
+    "ReportType",
+    "CONVERT_COMMAND",
+    "SERVE_COMMAND"
+]
@@ -1,57 +1,319 @@
 import argparse
 from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from typing import Any, Callable, Dict, List, Protocol
 from enum import Enum
 import os
+import stat
 import sys
 
-class ReportType(Enum):
-    """Type that represents eliglble values for --report/-r cli argument"""
+from logs_handler.reports.registry import is_report, report_names
+from logs_handler.utils.columns import numpy_available
+from logs_handler.utils.decoders import available_decoders
+from logs_handler.utils.diagnostics import SAMPLE_SIZE
+from logs_handler.utils.filters import AcceptAll, AllFilters, DateFilter, LineFilter, WhereFilter
+from logs_handler.utils.reader import STDIN, is_compressed, is_stream
+from logs_handler.utils.timestamps import BUCKETS
+from logs_handler.utils.utils import MAX_MISSING_FIELDS
+from logs_handler.utils.writers import TABLE, WRITERS
+
+# First argument that switches the cli into converting the files into columnar caches.
+CONVERT_COMMAND = "convert"
+# First argument that switches the cli into serving the reports of followed files.
+SERVE_COMMAND = "serve"
+
+class ReportType(str, Enum):
+    """
+    Type that represents the built-in values for --report/-r cli argument.
+    Members equal their names, reports added through the registry are requested by their plain names.
+    """
     AVERAGE = "average"
     USERAGENT = "user-agent"
+    PERCENTILES = "percentiles"
+    TIMESERIES = "timeseries"
+    GROUPBY = "groupby"
 
     @classmethod
     def valid_values(cls) -> List[str]:
         return [e.value for e in cls]
     
 class Validator(Protocol):
-    def __call__(self, value: str) -> str: ...
+    def __call__(self, value: str) -> Any: ...
 
 @dataclass(frozen=True)
 class Argument:
     """Class that represents a cli argument for argparser builder."""
     flags: List[str]
-    type_validator: Validator
+    type_validator: Validator | None
     dest: str
     nargs: str | None = None
     required: bool = True
+    default: Any = None
+    action: str | None = None
     help: str = ""
 
 @dataclass(frozen=True)
 class ParsedArgs:
     """Class that represents parsed arguments."""
     input_files: List[str]
-    report_type: ReportType
+    report_types: List[str]
     date_filter: Callable[Dict[str, Any], bool]
+    workers: int
+    decoder: str
+    use_index: bool
+    state_dir: str | None
+    follow: bool
+    interval: float
+    top_k: int | None
+    normalize_urls: bool
+    batch_size: int
+    use_cache: bool
+    bucket: str = "1m"
+    by_handler: bool = False
+    group_by: List[str] | None = None
+    aggregations: List[str] | None = None
+    stats: bool = False
+    stats_json: str | None = None
+    profile: str | None = None
+    where: WhereFilter | None = None
+    quarantine: str | None = None
+    max_missing_fields: int = MAX_MISSING_FIELDS
+    error_samples: int = SAMPLE_SIZE
+    output_format: str = TABLE
+    limit: int | None = None
+    compact: bool = False
+    server: str | None = None
+    read_concurrency: int = 1
+
+    @property
+    def line_filter(self) -> Callable[[Dict[str, Any]], bool]:
+        """The date filter combined with the --where expression."""
+        if self.where is None:
+            return self.date_filter
+        return AllFilters.of(self.date_filter, self.where)
+
+@dataclass(frozen=True)
+class ParsedConvertArgs:
+    """Class that represents parsed arguments of the `convert` subcommand."""
+    input_files: List[str]
+
+@dataclass(frozen=True)
+class ParsedServeArgs:
+    """Class that represents parsed arguments of the `serve` subcommand."""
+    input_files: List[str]
+    report_types: List[str]
+    line_filter: Callable[[Dict[str, Any]], bool]
+    decoder: str
+    top_k: int | None
+    normalize_urls: bool
+    batch_size: int
+    bucket: str
+    by_handler: bool
+    group_by: List[str] | None
+    aggregations: List[str] | None
+    compact: bool
+    quarantine: str | None
+    error_samples: int
+    max_missing_fields: int
+    socket: str | None
+    port: int | None
 
 
 def validate_path(value: str) -> str:
-    """Function that validates whether a given path exist."""
-    if not os.path.exists(value):
+    """Function that validates whether a given path exist. `-` stands for the standard input."""
+    if value != STDIN and not os.path.exists(value):
         raise argparse.ArgumentTypeError(f"file <{value}> not found.")
     return value
 
 def validate_report_type(value: str) -> str:
     """Function that validates the report type string, inputted by user."""
+    if not is_report(value):
+        msg = f"invalid report type <{value}>. \nAvailable report types: {report_names()}"
+        raise argparse.ArgumentTypeError(msg)
+    return value
+
+def validate_workers(value: str) -> int:
+    """Function that validates the amount of worker processes."""
     try:
-        ReportType(value)
-        return value
+        workers = int(value)
     except ValueError:
-        valid_types = ReportType.valid_values()
-        msg = f"invalid report type <{value}>. \nAvailable report types: {valid_types}"
-        raise argparse.ArgumentTypeError(msg)
+        raise argparse.ArgumentTypeError(f"invalid workers amount <{value}>, expected a positive integer.")
+
+    if workers < 1:
+        raise argparse.ArgumentTypeError(f"invalid workers amount <{value}>, expected a positive integer.")
+    return workers
 
-def mock_date_validator(value: str) -> str:
+def validate_read_concurrency(value: str) -> int:
+    """Function that validates the amount of inputs read at once."""
+    try:
+        concurrency = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid read concurrency <{value}>, expected a positive integer.")
+
+    if concurrency < 1:
+        raise argparse.ArgumentTypeError(f"invalid read concurrency <{value}>, expected a positive integer.")
+    return concurrency
+
+def validate_decoder(value: str) -> str:
+    """Function that validates that the requested json decoder is installed."""
+    valid_decoders = ["auto"] + available_decoders()
+    if value not in valid_decoders:
+        raise argparse.ArgumentTypeError(f"json decoder <{value}> is not available. \nAvailable decoders: {valid_decoders}")
+    return value
+
+def validate_date(value: str) -> datetime:
+    """Function that validates a YYYY-MM-DD date and returns its (UTC) midnight."""
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date <{value}>, expected YYYY-MM-DD.")
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+def validate_datetime(value: str) -> datetime:
+    """Function that validates an ISO 8601 date or datetime. Values without an offset are considered UTC."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid datetime <{value}>, expected ISO 8601, e.g. 2025-06-22 or 2025-06-22T13:00:00+00:00.")
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def validate_interval(value: str) -> float:
+    """Function that validates the refresh interval in seconds."""
+    try:
+        interval = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid interval <{value}>, expected a positive number of seconds.")
+
+    if interval <= 0:
+        raise argparse.ArgumentTypeError(f"invalid interval <{value}>, expected a positive number of seconds.")
+    return interval
+
+def validate_top(value: str) -> int:
+    """Function that validates the amount of top keys to report."""
+    try:
+        top_k = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid top amount <{value}>, expected a positive integer.")
+
+    if top_k < 1:
+        raise argparse.ArgumentTypeError(f"invalid top amount <{value}>, expected a positive integer.")
+    return top_k
+
+def validate_limit(value: str) -> int:
+    """Function that validates the amount of rows output per report."""
+    try:
+        limit = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid limit <{value}>, expected a positive integer.")
+
+    if limit < 1:
+        raise argparse.ArgumentTypeError(f"invalid limit <{value}>, expected a positive integer.")
+    return limit
+
+def validate_format(value: str) -> str:
+    """Function that validates the output format."""
+    if value not in WRITERS:
+        raise argparse.ArgumentTypeError(f"invalid format <{value}>. \nAvailable formats: {list(WRITERS)}")
+    return value
+
+def validate_where(value: str) -> WhereFilter:
+    """Function that parses and compiles the --where expression."""
+    try:
+        return WhereFilter(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid where expression <{value}>: {e}")
+
+def validate_group_by(value: str) -> List[str]:
+    """Function that splits the comma separated key fields of the groupby report."""
+    fields = [field.strip() for field in value.split(",")]
+    if not all(fields):
+        raise argparse.ArgumentTypeError(f"invalid group-by fields <{value}>, expected comma separated field names.")
+    return fields
+
+def validate_aggregations(value: str) -> List[str]:
+    """Function that validates the comma separated aggregations of the groupby report."""
+    from logs_handler.reports.groupby import Aggregation
+
+    specs = [spec.strip() for spec in value.split(",")]
+    try:
+        for spec in specs:
+            Aggregation.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid aggregations <{value}>: {e}")
+    return specs
+
+def validate_bucket(value: str) -> str:
+    """Function that validates the time bucket width of the timeseries report."""
+    if value not in BUCKETS:
+        raise argparse.ArgumentTypeError(f"invalid bucket <{value}>. \nAvailable buckets: {list(BUCKETS)}")
+    return value
+
+def validate_batch_size(value: str) -> int:
+    """Function that validates the batch size and that numpy is installed for the batch engine."""
+    try:
+        batch_size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid batch size <{value}>, expected a positive integer.")
+
+    if batch_size < 1:
+        raise argparse.ArgumentTypeError(f"invalid batch size <{value}>, expected a positive integer.")
+    if not numpy_available():
+        raise argparse.ArgumentTypeError("batch processing requires numpy to be installed.")
+    return batch_size
+
+def validate_max_missing_fields(value: str) -> int:
+    """Function that validates the amount of incomplete lines that rejects a file."""
+    try:
+        threshold = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid max missing fields <{value}>, expected a non-negative integer.")
+
+    if threshold < 0:
+        raise argparse.ArgumentTypeError(f"invalid max missing fields <{value}>, expected a non-negative integer.")
+    return threshold
+
+def validate_error_samples(value: str) -> int:
+    """Function that validates the amount of rejected lines shown per file."""
+    try:
+        samples = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid error samples amount <{value}>, expected a non-negative integer.")
+
+    if samples < 0:
+        raise argparse.ArgumentTypeError(f"invalid error samples amount <{value}>, expected a non-negative integer.")
+    return samples
+
+def validate_port(value: str) -> int:
+    """Function that validates the TCP port of the report server, 0 picks a free one."""
+    try:
+        port = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid port <{value}>, expected an integer from 0 to 65535.")
+
+    if not 0 <= port <= 65535:
+        raise argparse.ArgumentTypeError(f"invalid port <{value}>, expected an integer from 0 to 65535.")
+    return port
+
+def validate_socket_path(value: str) -> str:
+    """Function that validates the Unix socket path of the report server: a stale socket is replaced, any other file never is."""
+    try:
+        mode = os.lstat(value).st_mode
+    except FileNotFoundError:
+        return value
+    except OSError as e:
+        raise argparse.ArgumentTypeError(f"invalid socket path <{value}>: {e.strerror}.")
+
+    if not stat.S_ISSOCK(mode):
+        raise argparse.ArgumentTypeError(f"<{value}> already exists and is not a socket.")
+    return value
+
+def validate_state_dir(value: str) -> str:
+    """Function that validates that the state path is a directory or can be created as one."""
+    if os.path.exists(value) and not os.path.isdir(value):
+        raise argparse.ArgumentTypeError(f"state path <{value}> is not a directory.")
     return value
 
 class CLIArguments(Enum):
@@ -63,25 +325,353 @@ class CLIArguments(Enum):
         dest="input_files",
         nargs="+",
         required=True,
-        help="Input file paths to process"
+        help=f"Input file paths to process. `{STDIN}` reads the standard input; named pipes and `<(command)` are read as streams."
     )
 
     REPORT_TYPE = Argument(
         flags=["-r", "--report"],
         type_validator=validate_report_type,
-        dest="report_type",
-        nargs=None,
+        dest="report_types",
+        nargs="+",
         required=True,
-        help=f"Report type to generate. Options: {ReportType.valid_values()}"
+        help=f"Report types to generate, all computed in a single pass over each file. Options: {ReportType.valid_values()}, or the name of a report plugin."
     )
 
     DATE = Argument(
         flags=["-d", "--date"],
-        type_validator=mock_date_validator,
+        type_validator=validate_date,
         dest="date",
         nargs=None,
         required=False,
-        help="Specify the date."
+        help="Keep only the lines of the given (UTC) day, YYYY-MM-DD."
+    )
+
+    DATE_FROM = Argument(
+        flags=["--from"],
+        type_validator=validate_datetime,
+        dest="date_from",
+        nargs=None,
+        required=False,
+        help="Keep only the lines at or after the given ISO 8601 date or datetime."
+    )
+
+    DATE_TO = Argument(
+        flags=["--to"],
+        type_validator=validate_datetime,
+        dest="date_to",
+        nargs=None,
+        required=False,
+        help="Keep only the lines before the given ISO 8601 date or datetime."
+    )
+
+    TIME_ORDERED = Argument(
+        flags=["--time-ordered"],
+        type_validator=None,
+        dest="time_ordered",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Input files are ordered by time, so the date range is located by binary search instead of a full scan."
+    )
+
+    INDEX = Argument(
+        flags=["--index"],
+        type_validator=None,
+        dest="use_index",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Build (or refresh) a <file>.idx sidecar index of hourly offsets and use it to jump to the date range and to plan parallel chunks."
+    )
+
+    STATE = Argument(
+        flags=["--state"],
+        type_validator=validate_state_dir,
+        dest="state_dir",
+        nargs=None,
+        required=False,
+        help="Directory to keep report snapshots in. Each run then only processes the lines appended since the previous one."
+    )
+
+    FOLLOW = Argument(
+        flags=["--follow"],
+        type_validator=None,
+        dest="follow",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Keep following the files as they grow (and rotate), printing the reports every --interval seconds."
+    )
+
+    INTERVAL = Argument(
+        flags=["--interval"],
+        type_validator=validate_interval,
+        dest="interval",
+        nargs=None,
+        required=False,
+        default=5.0,
+        help="Seconds between report refreshes in --follow mode."
+    )
+
+    WHERE = Argument(
+        flags=["--where"],
+        type_validator=validate_where,
+        dest="where",
+        nargs=None,
+        required=False,
+        default=None,
+        help='Keep only the lines matching the expression, e.g. \'status >= 500 and url ~ "^/api/users/"\'. '
+             'Supports ==, !=, <, <=, >, >=, in (...), not in (...), ~ and !~ (regex), and, or, not and parentheses.'
+    )
+
+    TOP = Argument(
+        flags=["--top"],
+        type_validator=validate_top,
+        dest="top_k",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Report only the K most frequent keys, tracked in bounded memory. Counts come with their maximum overestimation."
+    )
+
+    LIMIT = Argument(
+        flags=["--limit"],
+        type_validator=validate_limit,
+        dest="limit",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Output only the first N rows of every report. They are selected with a heap instead of sorting all the rows; aggregation stays exact."
+    )
+
+    FORMAT = Argument(
+        flags=["--format"],
+        type_validator=validate_format,
+        dest="output_format",
+        nargs=None,
+        required=False,
+        default=TABLE,
+        help=f"Output format: {', '.join(WRITERS)}. Machine readable formats are written row by row as the reports are generated. Defaults to {TABLE}."
+    )
+
+    NORMALIZE_URLS = Argument(
+        flags=["--normalize-urls"],
+        type_validator=None,
+        dest="normalize_urls",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Replace numeric, UUID and hex id segments of the urls with {id}, so handlers are grouped by route."
+    )
+
+    COMPACT = Argument(
+        flags=["--compact"],
+        type_validator=None,
+        dest="compact",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Keep the average report in compact columns of integer microseconds per interned handler id, with exact averages and floats not decoded as Decimal."
+    )
+
+    BUCKET = Argument(
+        flags=["--bucket"],
+        type_validator=validate_bucket,
+        dest="bucket",
+        nargs=None,
+        required=False,
+        default="1m",
+        help="Time bucket of the timeseries report: 1s, 1m or 1h."
+    )
+
+    BY_HANDLER = Argument(
+        flags=["--by-handler"],
+        type_validator=None,
+        dest="by_handler",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Split the buckets of the timeseries report by handler."
+    )
+
+    GROUP_BY = Argument(
+        flags=["--group-by"],
+        type_validator=validate_group_by,
+        dest="group_by",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Key fields of the groupby report, comma separated, e.g. url,status."
+    )
+
+    AGG = Argument(
+        flags=["--agg"],
+        type_validator=validate_aggregations,
+        dest="aggregations",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Aggregations of the groupby report, comma separated: count, sum:FIELD, avg:FIELD, min:FIELD, max:FIELD. Defaults to count."
+    )
+
+    BATCH_SIZE = Argument(
+        flags=["--batch-size"],
+        type_validator=validate_batch_size,
+        dest="batch_size",
+        nargs=None,
+        required=False,
+        default=0,
+        help="Aggregate lines in numpy column batches of this size (e.g. 8192) instead of one by one. Requires numpy."
+    )
+
+    NO_CACHE = Argument(
+        flags=["--no-cache"],
+        type_validator=None,
+        dest="use_cache",
+        required=False,
+        default=True,
+        action="store_false",
+        help=f"Parse the files even when they have a fresh columnar cache (built by `main.py {CONVERT_COMMAND}`)."
+    )
+
+    QUARANTINE = Argument(
+        flags=["--quarantine"],
+        type_validator=None,
+        dest="quarantine",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Write the rejected (malformed or incomplete) lines, as they were, to the given file."
+    )
+
+    MAX_MISSING_FIELDS = Argument(
+        flags=["--max-missing-fields"],
+        type_validator=validate_max_missing_fields,
+        dest="max_missing_fields",
+        nargs=None,
+        required=False,
+        default=MAX_MISSING_FIELDS,
+        help=f"Reject a file as having a wrong structure once this many of its lines miss required fields, 0 to never. Defaults to {MAX_MISSING_FIELDS}."
+    )
+
+    ERROR_SAMPLES = Argument(
+        flags=["--error-samples"],
+        type_validator=validate_error_samples,
+        dest="error_samples",
+        nargs=None,
+        required=False,
+        default=SAMPLE_SIZE,
+        help=f"Amount of rejected lines per file shown, with their line numbers, in the summary on stderr. Defaults to {SAMPLE_SIZE}."
+    )
+
+    STATS = Argument(
+        flags=["--stats"],
+        type_validator=None,
+        dest="stats",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Print per-file counters and per-stage (read, decode, filter, aggregate, render) timings to stderr."
+    )
+
+    STATS_JSON = Argument(
+        flags=["--stats-json"],
+        type_validator=None,
+        dest="stats_json",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Also write the stats as json to the given path, '-' for stdout. Implies --stats."
+    )
+
+    PROFILE = Argument(
+        flags=["--profile"],
+        type_validator=None,
+        dest="profile",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Run under cProfile, dump the profile to the given path and list the slowest functions on stderr."
+    )
+
+    SERVER = Argument(
+        flags=["--server"],
+        type_validator=None,
+        dest="server",
+        nargs=None,
+        required=False,
+        default=None,
+        help=f"Ask the report server (`main.py {SERVE_COMMAND}`) at the given Unix socket path or host:port first, "
+             "processing the files locally when it is not running or holds other reports."
+    )
+
+    WORKERS = Argument(
+        flags=["-w", "--workers"],
+        type_validator=validate_workers,
+        dest="workers",
+        nargs=None,
+        required=False,
+        default=1,
+        help="Amount of worker processes. Files are split into chunks and processed in parallel when greater than 1."
+    )
+
+    READ_CONCURRENCY = Argument(
+        flags=["--read-concurrency"],
+        type_validator=validate_read_concurrency,
+        dest="read_concurrency",
+        nargs=None,
+        required=False,
+        default=1,
+        help="Amount of inputs read at once when greater than 1, overlapping their I/O waits on an asyncio reader "
+             "that feeds the parsing through a bounded queue. Reports are still built per input."
+    )
+
+    DECODER = Argument(
+        flags=["--decoder"],
+        type_validator=validate_decoder,
+        dest="decoder",
+        nargs=None,
+        required=False,
+        default="auto",
+        help="Json decoder backend: auto, json, orjson or msgspec. Auto picks the fastest installed one."
+    )
+
+    @classmethod
+    def all_arguments(cls) -> List[Argument]:
+        return [e.value for e in cls]
+
+    @classmethod
+    def serve_arguments(cls) -> List[Argument]:
+        """Arguments shared with the `serve` subcommand."""
+        members = [
+            cls.FILE_PATHS, cls.DATE, cls.DATE_FROM, cls.DATE_TO, cls.WHERE, cls.TOP, cls.NORMALIZE_URLS, cls.COMPACT,
+            cls.BUCKET, cls.BY_HANDLER, cls.GROUP_BY, cls.AGG, cls.BATCH_SIZE, cls.DECODER, cls.QUARANTINE, cls.ERROR_SAMPLES,
+            cls.MAX_MISSING_FIELDS
+        ]
+        return [member.value for member in members]
+
+
+class ServeArguments(Enum):
+    """Type that represents the cli arguments of the `serve` subcommand only."""
+
+    SOCKET = Argument(
+        flags=["--socket"],
+        type_validator=validate_socket_path,
+        dest="socket",
+        nargs=None,
+        required=False,
+        default=None,
+        help="Unix socket path to answer report queries on."
+    )
+
+    PORT = Argument(
+        flags=["--port"],
+        type_validator=validate_port,
+        dest="port",
+        nargs=None,
+        required=False,
+        default=None,
+        help="TCP port to answer report queries on, bound to the loopback interface only."
     )
 
     @classmethod
@@ -98,32 +688,173 @@ class CustomArgumentParser(argparse.ArgumentParser):
         sys.exit(2)
 
 
-def init_parser() -> argparse.ArgumentParser:
-    """Function that builds argparser."""
-    parser = CustomArgumentParser()
-    
-    for arg_def in CLIArguments.all_arguments():
+def add_arguments(parser: argparse.ArgumentParser, arguments: List[Argument]) -> None:
+    """Function that registers the argument definitions in the argparser."""
+    for arg_def in arguments:
+        if arg_def.action is not None:
+            parser.add_argument(
+                *arg_def.flags,
+                dest=arg_def.dest,
+                help=arg_def.help,
+                required=arg_def.required,
+                default=arg_def.default,
+                action=arg_def.action
+            )
+            continue
+
         parser.add_argument(
             *arg_def.flags,
             dest=arg_def.dest,
             help=arg_def.help,
             required=arg_def.required,
             nargs=arg_def.nargs,
+            default=arg_def.default,
             type=arg_def.type_validator
         )
-    
+
+def init_parser() -> argparse.ArgumentParser:
+    """Function that builds argparser."""
+    parser = CustomArgumentParser()
+    add_arguments(parser, CLIArguments.all_arguments())
+    return parser
+
+def init_convert_parser() -> argparse.ArgumentParser:
+    """Function that builds argparser of the `convert` subcommand."""
+    parser = CustomArgumentParser(prog=f"main.py {CONVERT_COMMAND}", description="Convert log files into columnar caches, reused by later runs while the files are unchanged.")
+    add_arguments(parser, [CLIArguments.FILE_PATHS.value])
     return parser
 
+def parse_convert_args(parser: argparse.ArgumentParser, argv: List[str]) -> ParsedConvertArgs:
+    if not numpy_available():
+        parser.error("converting logs requires numpy to be installed.")
+    args = parser.parse_args(argv)
+    return ParsedConvertArgs(input_files=args.input_files)
+
+def init_serve_parser() -> argparse.ArgumentParser:
+    """Function that builds argparser of the `serve` subcommand."""
+    parser = CustomArgumentParser(prog=f"main.py {SERVE_COMMAND}", description="Follow log files and answer report queries from memory, as json over a Unix socket or loopback HTTP.")
+    add_arguments(parser, CLIArguments.serve_arguments() + ServeArguments.all_arguments())
+    return parser
+
+def parse_date_filter(parser: argparse.ArgumentParser, args: argparse.Namespace) -> LineFilter:
+    """Function that builds the date filter out of the --date or --from/--to arguments."""
+    if args.date is not None and (args.date_from is not None or args.date_to is not None):
+        parser.error("argument -d/--date cannot be combined with --from/--to")
+
+    time_ordered = getattr(args, "time_ordered", False)
+    if args.date is not None:
+        return DateFilter.for_day(args.date, time_ordered)
+
+    if args.date_from is not None or args.date_to is not None:
+        if args.date_from is not None and args.date_to is not None and args.date_from >= args.date_to:
+            parser.error("argument --from must be earlier than --to")
+        return DateFilter(args.date_from, args.date_to, time_ordered)
+
+    return AcceptAll()
+
+def check_streams(parser: argparse.ArgumentParser, input_files: List[str], incompatible: str | None) -> None:
+    """Function that checks that the standard input is given once, and streams only where `incompatible` options are not."""
+    if input_files.count(STDIN) > 1:
+        parser.error(f"the standard input ({STDIN}) can be given only once")
+
+    if incompatible is not None and any(map(is_stream, input_files)):
+        parser.error(f"the standard input and pipes cannot be combined with {incompatible}")
+
+def check_followable(parser: argparse.ArgumentParser, input_files: List[str], follower: str) -> None:
+    """Function that checks that no input is compressed: a compressed file is only readable from its start, it cannot be tailed."""
+    compressed = [path for path in input_files if is_compressed(path)]
+    if compressed:
+        parser.error(f"compressed files cannot be followed by {follower}: {', '.join(compressed)}")
+
+def parse_serve_args(parser: argparse.ArgumentParser, argv: List[str]) -> ParsedServeArgs:
+    args = parser.parse_args(argv)
+
+    if (args.socket is None) == (args.port is None):
+        parser.error("exactly one of --socket and --port is required")
+
+    # Followed files are reopened by their paths, which streams cannot be.
+    check_streams(parser, args.input_files, SERVE_COMMAND)
+    check_followable(parser, args.input_files, SERVE_COMMAND)
+
+    # Every report type is served; groupby only when it has keys to group by.
+    report_types = [name for name in report_names() if name != ReportType.GROUPBY or args.group_by is not None]
+    date_filter = parse_date_filter(parser, args)
+
+    return ParsedServeArgs(
+        input_files=args.input_files,
+        report_types=report_types,
+        line_filter=date_filter if args.where is None else AllFilters.of(date_filter, args.where),
+        decoder=args.decoder,
+        top_k=args.top_k,
+        normalize_urls=args.normalize_urls,
+        batch_size=args.batch_size,
+        bucket=args.bucket,
+        by_handler=args.by_handler,
+        group_by=args.group_by,
+        aggregations=args.aggregations,
+        compact=args.compact,
+        quarantine=args.quarantine,
+        error_samples=args.error_samples,
+        max_missing_fields=args.max_missing_fields,
+        socket=args.socket,
+        port=args.port
+    )
+
 def parse_args(parser: argparse.ArgumentParser) -> ParsedArgs:
     args = parser.parse_args()
-    date_filter = lambda x: True
 
-    if args.date is not None:
-        date_filter = lambda line: line["@timestamp"] == args.date
+    if args.state_dir is not None and args.workers > 1:
+        parser.error("argument --state cannot be combined with -w/--workers")
+
+    if args.follow and (args.workers > 1 or args.state_dir is not None):
+        parser.error("argument --follow cannot be combined with -w/--workers or --state")
+
+    if args.follow and (args.stats or args.stats_json is not None):
+        parser.error("argument --follow cannot be combined with --stats or --stats-json")
+
+    if args.server is not None and (args.follow or args.state_dir is not None or args.workers > 1 or args.stats or args.stats_json is not None):
+        parser.error("argument --server cannot be combined with --follow, --state, -w/--workers or --stats")
+
+    if args.read_concurrency > 1 and (args.follow or args.state_dir is not None or args.workers > 1 or args.stats or args.stats_json is not None or args.server is not None):
+        parser.error("argument --read-concurrency cannot be combined with --follow, --state, -w/--workers, --stats or --server")
+
+    if ReportType.GROUPBY.value in args.report_types and args.group_by is None:
+        parser.error("report groupby requires --group-by")
+
+    check_streams(parser, args.input_files, "--follow or --state" if args.follow or args.state_dir is not None else None)
+    if args.follow:
+        check_followable(parser, args.input_files, "--follow")
+    date_filter = parse_date_filter(parser, args)
 
     return ParsedArgs(
         input_files=args.input_files,
-        report_type=ReportType(args.report_type),
-        date_filter=date_filter
+        report_types=list(dict.fromkeys(args.report_types)),
+        date_filter=date_filter,
+        workers=args.workers,
+        decoder=args.decoder,
+        use_index=args.use_index,
+        state_dir=args.state_dir,
+        follow=args.follow,
+        interval=args.interval,
+        top_k=args.top_k,
+        normalize_urls=args.normalize_urls,
+        batch_size=args.batch_size,
+        use_cache=args.use_cache,
+        bucket=args.bucket,
+        by_handler=args.by_handler,
+        where=args.where,
+        group_by=args.group_by,
+        aggregations=args.aggregations,
+        stats=args.stats or args.stats_json is not None,
+        stats_json=args.stats_json,
+        profile=args.profile,
+        quarantine=args.quarantine,
+        max_missing_fields=args.max_missing_fields,
+        error_samples=args.error_samples,
+        output_format=args.output_format,
+        limit=args.limit,
+        compact=args.compact,
+        server=args.server,
+        read_concurrency=args.read_concurrency
     )
 
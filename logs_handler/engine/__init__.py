@@ -0,0 +1,52 @@
+from importlib import import_module
+from typing import Any
+
+from .options import RunOptions
+from .pipeline import run_reports, collect_required_fields, collect_field_groups, build_decoder, dispatch
+from .state import run_incremental
+from .follow import Follower
+from .instrumentation import FileStats, StageStats, Stopwatch, emit_stats
+
+# Imported on first access: process pools, asyncio and http are only loaded by the runs using them.
+_LAZY_EXPORTS = {
+    "submit_file": "logs_handler.engine.parallel",
+    "plan_chunks": "logs_handler.engine.parallel",
+    "FileJob": "logs_handler.engine.parallel",
+    "ReportServer": "logs_handler.engine.server",
+    "report_signature": "logs_handler.engine.server",
+    "serve": "logs_handler.engine.server",
+    "query_report": "logs_handler.engine.client",
+    "SourceJob": "logs_handler.engine.multisource",
+    "read_sources": "logs_handler.engine.multisource",
+    "collect_sources": "logs_handler.engine.multisource"
+}
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = [
+    "RunOptions",
+    "run_reports",
+    "collect_required_fields",
+    "collect_field_groups",
+    "build_decoder",
+    "dispatch",
+    "submit_file",
+    "plan_chunks",
+    "FileJob",
+    "run_incremental",
+    "Follower",
+    "FileStats",
+    "StageStats",
+    "Stopwatch",
+    "emit_stats",
+    "ReportServer",
+    "report_signature",
+    "serve",
+    "query_report",
+    "SourceJob",
+    "read_sources",
+    "collect_sources"
+]
@@ -0,0 +1,67 @@
+import http.client
+import json
+import socket
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+# Seconds the client waits for the report server before processing the files itself.
+CLIENT_TIMEOUT = 5.0
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket."""
+    def __init__(self, socket_path: str, timeout: float = CLIENT_TIMEOUT) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def parse_address(address: str) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    """Splits the server address into host and port, or a Unix socket path: `http://host:port` and `host:port` are TCP."""
+    target = address[len("http://"):] if address.startswith("http://") else address
+    host, separator, port = target.rstrip("/").rpartition(":")
+    if separator and host and "/" not in host and port.isdigit():
+        return host, int(port), None
+    return None, None, address
+
+
+def connect(address: str, timeout: float = CLIENT_TIMEOUT) -> http.client.HTTPConnection:
+    host, port, socket_path = parse_address(address)
+    if socket_path is not None:
+        return UnixHTTPConnection(socket_path, timeout)
+    return http.client.HTTPConnection(host, port, timeout=timeout)
+
+
+def request(address: str, path: str, timeout: float = CLIENT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Sends a GET request to the report server and returns the decoded json body.
+    Raises OSError when the server cannot be reached, ValueError when it answers with an error.
+    """
+    connection = connect(address, timeout)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        body = response.read()
+    except http.client.HTTPException as e:
+        raise OSError(f"invalid response from the report server: {e}")
+    finally:
+        connection.close()
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError(f"report server answered {response.status} without json")
+    if response.status != 200:
+        raise ValueError(f"report server answered {response.status}: {data.get('error', '')}")
+    return data
+
+
+def query_report(address: str, name: str, file: Optional[str] = None, limit: Optional[int] = None, signature: Optional[str] = None, timeout: float = CLIENT_TIMEOUT) -> Dict[str, Any]:
+    """Returns the tables of the report held by the server, see `ReportServer`."""
+    query = {key: value for key, value in (("file", file), ("limit", limit), ("signature", signature)) if value is not None}
+    path = f"/reports/{name}" + (f"?{urlencode(query)}" if query else "")
+    return request(address, path, timeout)
@@ -0,0 +1,236 @@
+from copy import deepcopy
+import os
+import threading
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+from logs_handler.reports import Report, ReportFactory
+from logs_handler.utils import Diagnostics, LoadStats, parse_lines
+from logs_handler.utils.diagnostics import SAMPLE_SIZE
+from logs_handler.utils.filters import get_prefilter
+from logs_handler.utils.reader import BLOCK_SIZE
+from .options import RunOptions
+from .pipeline import build_decoder, collect_field_groups, collect_required_fields, dispatch, record_invalid
+
+# Seconds the reader sleeps when none of the files has new data.
+POLL_INTERVAL = 0.25
+# Longer lines are dropped, so a file without newlines cannot grow the buffer forever.
+MAX_LINE_BYTES = 1024 * 1024
+# Bytes read by a single poll. A bigger backlog (e.g. the initial contents of the file) is read over several polls,
+# so the lines in memory and the time the reports stay locked are bounded.
+MAX_POLL_BYTES = 8 * 1024 * 1024
+
+ReportTables = List[Tuple[List[List[Any]], List[str]]]
+
+
+class FileTailer:
+    """
+    Reads the complete lines appended to a file, following it across rotation and truncation.
+
+    Rotation is noticed by the path pointing to a new inode: the old file is read to its end first, then the new one
+    from its start. A file that became shorter than the read position was truncated and is read from its start again.
+    A last line without a newline is returned once the file has not grown for a whole poll, or right away when the
+    file is rotated or truncated, as nothing can complete it any more.
+    A poll reads at most `MAX_POLL_BYTES`; `backlog` tells that more data is already waiting.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file: Optional[BinaryIO] = None
+        self.inode: Optional[Tuple[int, int]] = None
+        self.position = 0
+        self.partial = b""
+        self.idle_partial = False
+        self.dropped_lines = 0
+        self.backlog = False
+
+    def _open(self) -> bool:
+        try:
+            self.file = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+
+        stat = os.fstat(self.file.fileno())
+        self.inode = (stat.st_dev, stat.st_ino)
+        self.position = 0
+        self.partial = b""
+        return True
+
+    def _read_available(self) -> List[bytes]:
+        lines: List[bytes] = []
+        read_bytes = 0
+        self.backlog = False
+
+        while True:
+            if read_bytes >= MAX_POLL_BYTES:
+                self.backlog = True
+                return lines
+
+            block = self.file.read(BLOCK_SIZE)
+            if not block:
+                return lines
+            self.position += len(block)
+            read_bytes += len(block)
+
+            block_lines = (self.partial + block).split(b"\n")
+            self.partial = block_lines.pop()
+            lines.extend(block_lines)
+
+            if len(self.partial) > MAX_LINE_BYTES:
+                self.partial = b""
+                self.dropped_lines += 1
+
+    def poll(self) -> List[bytes]:
+        """Returns the complete lines appended since the previous poll."""
+        if self.file is None and not self._open():
+            return []
+
+        lines = self._read_available()
+        if self.backlog:
+            # Rotation and truncation are only checked once the current file is read to its end.
+            return lines
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Rotated away and not recreated yet, keep reading the old file.
+            return lines
+
+        if (stat.st_dev, stat.st_ino) != self.inode:
+            self.file.close()
+            lines.extend(self._take_partial())
+            if self._open():
+                lines.extend(self._read_available())
+        elif stat.st_size < self.position:
+            self.file.seek(0)
+            self.position = 0
+            lines.extend(self._take_partial())
+            lines.extend(self._read_available())
+
+        if self.backlog:
+            return lines
+        return lines + self._flush_idle_partial(bool(lines))
+
+    def _take_partial(self) -> List[bytes]:
+        partial, self.partial = self.partial, b""
+        self.idle_partial = False
+        return [partial] if partial else []
+
+    def _flush_idle_partial(self, grew: bool) -> List[bytes]:
+        if grew or not self.partial:
+            self.idle_partial = False
+            return []
+
+        if not self.idle_partial:
+            self.idle_partial = True
+            return []
+        return self._take_partial()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class FollowedFile:
+    """
+    Reports of a single followed file, updated by the reader thread and read by the renderer.
+    Rejected lines are recorded in `diagnostics`, quarantined ones are written out after every poll.
+    Once `max_missing_fields` of its lines lack the required fields, the file is rejected as in a batch run:
+    the poll raises ValueError, which stops the follower.
+    """
+    def __init__(self, path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, diagnostics: Optional[Diagnostics] = None) -> None:
+        self.path = path
+        self.tailer = FileTailer(path)
+        self.reports = [ReportClass() for ReportClass in report_classes]
+        self.required_fields = collect_required_fields(self.reports)
+        self.field_groups = collect_field_groups(self.reports)
+        self.decoder = build_decoder(self.reports, filter_func, options.decoder_backend, options.batch_size > 0)
+        self.batch_size = options.batch_size
+        self.max_missing_fields = options.max_missing_fields
+        self.prefilter = get_prefilter(filter_func)
+        self.filter_func = filter_func
+        self.stats = LoadStats()
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics(path)
+        self.lines_read = 0
+        self.invalid_lines = 0
+        self.lock = threading.Lock()
+
+    def poll(self) -> int:
+        """Processes the lines appended since the previous poll, returns their amount."""
+        lines = self.tailer.poll()
+        if not lines:
+            return 0
+
+        parsed = parse_lines(
+            lines, self.path, self.required_fields, self.stats, strict=True, decoder=self.decoder, prefilter=self.prefilter, first_line_num=self.lines_read + 1,
+            diagnostics=self.diagnostics, max_missing_fields=self.max_missing_fields, field_groups=self.field_groups
+        )
+        # Decoded and filtered before taking the lock, which is then only held while the entries are aggregated.
+        entries = list(filter(self.filter_func, parsed))
+
+        with self.lock:
+            dispatch(entries, self.reports, self.batch_size)
+            self.invalid_lines = record_invalid(self.reports, self.diagnostics, self.invalid_lines)
+        self.diagnostics.flush()
+
+        self.lines_read += len(lines)
+        return len(lines)
+
+    def tables(self, limit: Optional[int] = None) -> ReportTables:
+        """Returns the current tables, with `limit` only their first rows. Holds the lock only while the reports are copied."""
+        with self.lock:
+            reports = deepcopy(self.reports)
+        return [(list(report.iter_table(limit)), report.get_headers()) for report in reports]
+
+    def table(self, index: int, limit: Optional[int] = None) -> Tuple[List[List[Any]], List[str]]:
+        """Returns the current table of a single report, see `tables`."""
+        with self.lock:
+            report = deepcopy(self.reports[index])
+        return list(report.iter_table(limit)), report.get_headers()
+
+
+class Follower:
+    """
+    Tails the files on a background thread and keeps their reports up to date.
+
+    Ingestion never waits for the rendering: lines are decoded outside the lock, which is only held while they are
+    aggregated, and the renderer only holds it to copy the reports' state, building the tables from the copy.
+    Memory stays bounded by the reports' state, as lines are processed as soon as they are read.
+    Rejected lines of all the files are appended to `quarantine_path` when it is given.
+    """
+    def __init__(self, file_paths: Sequence[str], report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions = RunOptions(), poll_interval: float = POLL_INTERVAL, quarantine_path: Optional[str] = None, sample_size: int = SAMPLE_SIZE) -> None:
+        self.files = [
+            FollowedFile(path, report_classes, filter_func, options, Diagnostics(path, sample_size, quarantine_path))
+            for path in file_paths
+        ]
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="log-follower", daemon=True)
+        self.error: Optional[BaseException] = None
+
+    def poll_once(self) -> int:
+        """Processes the new lines of every file once, returns the amount of lines read."""
+        return sum(followed.poll() for followed in self.files)
+
+    def _run(self) -> None:
+        try:
+            while not self.stop_event.is_set():
+                if not self.poll_once():
+                    self.stop_event.wait(self.poll_interval)
+        except BaseException as e:
+            self.error = e
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        for followed in self.files:
+            followed.tailer.close()
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Tuple[str, ReportTables]]:
+        """Returns the current tables of every file."""
+        if self.error is not None:
+            raise RuntimeError(f"Log reader stopped: {self.error}")
+        return [(followed.path, followed.tables(limit)) for followed in self.files]
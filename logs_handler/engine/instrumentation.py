@@ -0,0 +1,153 @@
+from dataclasses import asdict, dataclass, field
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+from logs_handler.utils import LoadStats
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Pipeline stages in processing order. Each one is timed exclusive of the stages feeding it.
+STAGES = ("read", "decode", "filter", "aggregate", "render")
+
+
+@dataclass
+class StageStats:
+    """Wall and CPU seconds spent in a single stage."""
+    wall: float = 0.0
+    cpu: float = 0.0
+    items: int = 0
+
+    def merge(self, other: "StageStats") -> None:
+        self.wall += other.wall
+        self.cpu += other.cpu
+        self.items += other.items
+
+
+def peak_memory_kb() -> int:
+    """Returns the peak resident memory of the process in kilobytes, 0 where it is not available."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+@dataclass
+class FileStats:
+    """
+    Counters and timings of processing a single file, filled in by the runs it is passed to.
+
+    Chunks processed by different workers are merged: their stage times add up (so they may exceed the file's
+    wall time) and the peak memory is the highest of the processes.
+    """
+    file_path: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes_read: int = 0
+    entries: int = 0
+    kept_entries: int = 0
+    peak_memory_kb: int = 0
+    load: LoadStats = field(default_factory=LoadStats)
+    stages: Dict[str, StageStats] = field(default_factory=lambda: {stage: StageStats() for stage in STAGES})
+
+    @property
+    def lines_per_sec(self) -> float:
+        return self.load.total_lines / self.wall if self.wall else 0.0
+
+    def merge(self, other: "FileStats") -> None:
+        """Adds the counters of another chunk of the same file."""
+        self.cpu += other.cpu
+        self.bytes_read += other.bytes_read
+        self.entries += other.entries
+        self.kept_entries += other.kept_entries
+        self.peak_memory_kb = max(self.peak_memory_kb, other.peak_memory_kb)
+        self.load.merge(other.load)
+        for stage, stage_stats in other.stages.items():
+            self.stages[stage].merge(stage_stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["lines_per_sec"] = self.lines_per_sec
+        return data
+
+    def summary(self) -> str:
+        """Returns a human readable summary."""
+        load = self.load
+        lines = [
+            f"--- Stats for: {self.file_path} ---",
+            f"wall {self.wall:.3f}s, cpu {self.cpu:.3f}s, {self.bytes_read:,} bytes, {load.total_lines:,} lines, {self.lines_per_sec:,.0f} lines/sec, peak memory {self.peak_memory_kb:,} KB",
+            f"lines: {load.valid_lines:,} valid, {load.malformed_json:,} malformed, {load.missing_fields:,} missing fields, {load.skipped_lines:,} prefiltered, {self.entries - self.kept_entries:,} filtered out",
+        ]
+        lines += [f"  {stage:<10} wall {stats.wall:8.3f}s  cpu {stats.cpu:8.3f}s" for stage, stats in self.stages.items()]
+        return "\n".join(lines)
+
+
+class Stopwatch:
+    """Measures the wall and CPU time of a block and adds it to a stage (or to the totals of a file)."""
+    def __init__(self, stage: "StageStats | FileStats") -> None:
+        self.stage = stage
+
+    def __enter__(self) -> "Stopwatch":
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stage.wall += time.perf_counter() - self.wall
+        self.stage.cpu += time.process_time() - self.cpu
+
+
+def timed(items: Iterable[Any], stage: StageStats) -> Iterator[Any]:
+    """Yields the items, adding the time spent producing them (including the upstream stages) to the stage."""
+    iterator = iter(items)
+    perf_counter, process_time = time.perf_counter, time.process_time
+
+    while True:
+        wall, cpu = perf_counter(), process_time()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            stage.wall += perf_counter() - wall
+            stage.cpu += process_time() - cpu
+        stage.items += 1
+        yield item
+
+def timed_lines(lines: Iterable[bytes], stage: StageStats, stats: FileStats) -> Iterator[bytes]:
+    """Times the reading of the raw lines, counting their bytes (with the newline) as read."""
+    for line in timed(lines, stage):
+        stats.bytes_read += len(line) + 1
+        yield line
+
+def add_exclusive(stats: FileStats, inclusive: Dict[str, StageStats]) -> None:
+    """Adds the nested timings of a pass to the stats: every stage without the stages feeding it."""
+    previous = StageStats()
+    for stage in ("read", "decode", "filter", "aggregate"):
+        current = inclusive[stage]
+        stats.stages[stage].wall += current.wall - previous.wall
+        stats.stages[stage].cpu += current.cpu - previous.cpu
+        stats.stages[stage].items += current.items
+        previous = current
+
+    stats.entries += inclusive["decode"].items
+    stats.kept_entries += inclusive["filter"].items
+
+def emit_stats(file_stats: Sequence[FileStats], json_path: Optional[str] = None) -> None:
+    """Prints the summaries to stderr and writes them as json to the path ("-" for stdout) when it is given."""
+    for stats in file_stats:
+        print(stats.summary(), file=sys.stderr)
+
+    if json_path is None:
+        return
+
+    data = json.dumps({"files": [stats.to_dict() for stats in file_stats]}, indent=2)
+    if json_path == "-":
+        print(data)
+    else:
+        with open(json_path, "w") as file:
+            file.write(data + "\n")
@@ -0,0 +1,154 @@
+"""
+Concurrent ingestion of many inputs: files, compressed logs, named pipes and the standard input.
+
+Blocks are read on a pool of threads driven by an asyncio loop, so the I/O waits of up to `concurrency` inputs
+(e.g. on network storage, or pipes fed by slow producers) overlap, while a single consumer splits, decodes and
+aggregates the blocks as they come. Readers hand their blocks over through a bounded queue and wait once it is full:
+memory stays flat when the inputs are read faster than they are parsed.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from logs_handler.reports import Report, ReportFactory
+from logs_handler.utils import Diagnostics, LoadStats, check_load_stats, parse_lines
+from logs_handler.utils.cache import load_cache
+from logs_handler.utils.filters import get_byte_range, get_prefilter
+from logs_handler.utils.index import ensure_index
+from logs_handler.utils.reader import iter_blocks, split_block
+from .options import RunOptions
+from .pipeline import build_decoder, collect_field_groups, collect_required_fields, dispatch, record_invalid, run_cached
+
+# Inputs read at once by default.
+READ_CONCURRENCY = 8
+# Blocks (of up to `BLOCK_SIZE` bytes) waiting between the readers and the aggregation.
+QUEUE_BLOCKS = 16
+
+
+class SourceJob:
+    """
+    Reports of a single input, fed with its blocks in order. Lines split across two blocks are joined back.
+    The first error (an unreadable input, a wrong structure) is kept in `error` and the rest of the input is skipped.
+    """
+    def __init__(self, path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions = RunOptions(), diagnostics: Optional[Diagnostics] = None) -> None:
+        self.path = path
+        self.reports = [ReportClass() for ReportClass in report_classes]
+        self.required_fields = collect_required_fields(self.reports)
+        self.field_groups = collect_field_groups(self.reports)
+        self.decoder = build_decoder(self.reports, filter_func, options.decoder_backend, options.batch_size > 0)
+        self.prefilter = get_prefilter(filter_func)
+        self.filter_func = filter_func
+        self.options = options
+        self.diagnostics = diagnostics
+        self.stats = LoadStats()
+        self.location = ""
+        self.tail = b""
+        self.lines_read = 0
+        self.error: Optional[ValueError] = None
+
+    def feed(self, lines: List[bytes]) -> None:
+        parsed = parse_lines(
+            lines, self.path, self.required_fields, self.stats, True, self.decoder, self.prefilter, self.location,
+            self.lines_read + 1, self.diagnostics, self.options.max_missing_fields, self.field_groups
+        )
+        dispatch(filter(self.filter_func, parsed), self.reports, self.options.batch_size)
+        self.lines_read += len(lines)
+
+    def feed_block(self, block: bytes) -> None:
+        lines, self.tail = split_block(self.tail, block)
+        self.feed(lines)
+
+    def finish(self) -> None:
+        """Processes the last line left without a newline and judges the input as a whole."""
+        if self.tail:
+            self.feed([self.tail])
+            self.tail = b""
+        check_load_stats(self.path, self.stats, self.required_fields, self.options.max_missing_fields, self.field_groups)
+        record_invalid(self.reports, self.diagnostics)
+
+
+def _byte_range(job: SourceJob, filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions) -> Tuple[int, int | None]:
+    index = ensure_index(job.path) if options.use_index else None
+    return get_byte_range(filter_func, job.path, index)
+
+async def _read(job: SourceJob, filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, queue: "asyncio.Queue[Tuple[SourceJob, Optional[bytes]]]", slots: asyncio.Semaphore, executor: ThreadPoolExecutor) -> None:
+    """Reads the blocks of the input into the queue, then an empty block marking its end."""
+    loop = asyncio.get_running_loop()
+
+    async with slots:
+        try:
+            start, end = await loop.run_in_executor(executor, _byte_range, job, filter_func, options)
+            job.location = "" if start == 0 else f" (range from byte {start})"
+            blocks = iter_blocks(job.path, start, end)
+            try:
+                while job.error is None:
+                    block = await loop.run_in_executor(executor, next, blocks, None)
+                    if block is None:
+                        break
+                    # Waits while the queue is full, the backpressure on fast inputs.
+                    await queue.put((job, block))
+            finally:
+                await loop.run_in_executor(executor, blocks.close)
+        except (OSError, ValueError) as e:
+            if job.error is None:
+                job.error = ValueError(str(e))
+
+    await queue.put((job, None))
+
+async def _aggregate(queue: "asyncio.Queue[Tuple[SourceJob, Optional[bytes]]]", readers: int) -> None:
+    """Feeds the queued blocks to the reports of their inputs until every reader has finished."""
+    while readers:
+        job, block = await queue.get()
+        try:
+            if block is None:
+                readers -= 1
+                if job.error is None:
+                    job.finish()
+            elif job.error is None:
+                job.feed_block(block)
+        except ValueError as e:
+            job.error = e
+
+async def _read_sources(jobs: Sequence[SourceJob], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, concurrency: int, queue_blocks: int) -> None:
+    queue: "asyncio.Queue[Tuple[SourceJob, Optional[bytes]]]" = asyncio.Queue(maxsize=queue_blocks)
+    slots = asyncio.Semaphore(concurrency)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="log-reader") as executor:
+        readers = [asyncio.create_task(_read(job, filter_func, options, queue, slots, executor)) for job in jobs]
+        await _aggregate(queue, len(readers))
+        await asyncio.gather(*readers)
+
+def read_sources(jobs: Sequence[SourceJob], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions = RunOptions(), concurrency: int = READ_CONCURRENCY, queue_blocks: int = QUEUE_BLOCKS) -> None:
+    """
+    Reads up to `concurrency` inputs at once and feeds their blocks to the jobs, see the module docstring.
+    At most `queue_blocks` blocks wait in the queue, plus one being read by every reader.
+    """
+    if jobs:
+        asyncio.run(_read_sources(jobs, filter_func, options, concurrency, queue_blocks))
+
+
+def collect_sources(file_paths: Sequence[str], report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions = RunOptions(), concurrency: int = READ_CONCURRENCY, diagnostics: Optional[Sequence[Diagnostics]] = None) -> List[List[Report] | ValueError]:
+    """
+    Builds the reports of every input, reading them concurrently. Returns the reports, or the error, of every input in order.
+    Files with a fresh columnar cache are read from it first, without going through the readers.
+    """
+    all_diagnostics = diagnostics if diagnostics is not None else [None] * len(file_paths)
+    jobs = [
+        SourceJob(file_path, report_classes, filter_func, options, file_diagnostics)
+        for file_path, file_diagnostics in zip(file_paths, all_diagnostics)
+    ]
+    unread: List[SourceJob] = []
+
+    for job in jobs:
+        cache = load_cache(job.path) if options.use_cache else None
+        try:
+            if cache is not None and run_cached(cache, job.reports, filter_func, options, diagnostics=job.diagnostics):
+                record_invalid(job.reports, job.diagnostics)
+                continue
+        except ValueError as e:
+            job.error = e
+            continue
+        unread.append(job)
+
+    read_sources(unread, filter_func, options, concurrency)
+    return [job.error if job.error is not None else job.reports for job in jobs]
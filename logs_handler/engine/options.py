@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from logs_handler.utils.utils import MAX_MISSING_FIELDS
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """
+    Class that represents the options of a report run, shared by the serial and the parallel engines.
+
+    A positive `batch_size` feeds the reports numpy column batches of that many lines; floats are then decoded as float.
+    With `use_cache`, files with a fresh columnar cache (see `convert`) are read from it instead of being parsed.
+    A file with `max_missing_fields` lines lacking the required fields is rejected as having a wrong structure (0 never).
+    """
+    decoder_backend: str = "auto"
+    use_index: bool = False
+    state_dir: Optional[str] = None
+    batch_size: int = 0
+    use_cache: bool = True
+    max_missing_fields: int = MAX_MISSING_FIELDS
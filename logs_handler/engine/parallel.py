@@ -0,0 +1,184 @@
+from concurrent.futures import Executor, Future
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from logs_handler.reports import Report, ReportFactory
+from logs_handler.utils import Diagnostics, LoadStats, check_load_stats
+from logs_handler.utils.cache import load_cache
+from logs_handler.utils.filters import get_byte_range
+from logs_handler.utils.index import LogIndex, ensure_index
+from logs_handler.utils.reader import is_sequential, is_stream
+from .instrumentation import FileStats, Stopwatch, peak_memory_kb
+from .options import RunOptions
+from .pipeline import collect_field_groups, collect_required_fields, process_range, record_invalid, run_cached
+
+# Chunks are never bigger than this, so a worker holds a bounded part of a file.
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+# Small files are not split further than this.
+MIN_CHUNK_SIZE = 1024 * 1024
+
+ChunkResult = Tuple[List[Report], LoadStats, Optional[FileStats], Optional[Diagnostics]]
+
+
+def plan_chunks(path: str, chunk_size: int, start: int = 0, end: int | None = None, index: Optional[LogIndex] = None) -> List[Tuple[int, int | None]]:
+    """
+    Splits the [start, end) range of the file into byte ranges of roughly `chunk_size` bytes, aligned to newline boundaries.
+
+    The range itself must be aligned. With an index, the boundaries are picked among its line offsets without
+    touching the file. Compressed files and streams cannot be split and are processed as a single chunk.
+    """
+    if is_sequential(path):
+        return [(0, None)]
+
+    range_end = os.path.getsize(path) if end is None else end
+    boundaries = [start]
+
+    if index is not None:
+        offsets = sorted(set(index.checkpoints) | {bucket.offset for bucket in index.buckets})
+        for offset in offsets:
+            if offset >= boundaries[-1] + chunk_size and offset < range_end:
+                boundaries.append(offset)
+
+        boundaries.append(range_end)
+        return list(zip(boundaries, boundaries[1:]))
+
+    with open(path, "rb") as file:
+        while boundaries[-1] + chunk_size < range_end:
+            file.seek(boundaries[-1] + chunk_size)
+            file.readline()
+            boundary = file.tell()
+
+            if boundary >= range_end:
+                break
+            boundaries.append(boundary)
+
+    boundaries.append(range_end)
+    return list(zip(boundaries, boundaries[1:]))
+
+def choose_chunk_size(path: str, workers: int) -> int:
+    """Picks the chunk size so that a single file still keeps every worker busy."""
+    if is_sequential(path):
+        return MAX_CHUNK_SIZE
+    per_worker = -(-os.path.getsize(path) // workers)
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, per_worker))
+
+def process_chunk(path: str, start: int, end: int | None, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions = RunOptions(), collect_stats: bool = False, diagnostics: Optional[Diagnostics] = None) -> ChunkResult:
+    """
+    Worker entry point: builds the reports over a single chunk of the file, with the chunk's stats if requested.
+    With `diagnostics` (the empty ones of the chunk, see `Diagnostics.for_chunk`), rejected lines are recorded and quarantined.
+    """
+    reports = [ReportClass() for ReportClass in report_classes]
+    stats = LoadStats()
+    chunk_stats = FileStats(path) if collect_stats else None
+
+    if chunk_stats is None:
+        process_range(path, reports, filter_func, options, stats, start, end, diagnostics=diagnostics)
+    else:
+        with Stopwatch(chunk_stats):
+            process_range(path, reports, filter_func, options, stats, start, end, file_stats=chunk_stats, diagnostics=diagnostics)
+        chunk_stats.load.merge(stats)
+        chunk_stats.peak_memory_kb = peak_memory_kb()
+
+    if diagnostics is not None:
+        diagnostics.flush()
+    return reports, stats, chunk_stats, diagnostics
+
+
+def process_cached(path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions = RunOptions(), collect_stats: bool = False, diagnostics: Optional[Diagnostics] = None) -> Optional[ChunkResult]:
+    """
+    Builds the reports over the fresh columnar cache of the file as a single chunk, None when the file has to be parsed.
+    The cache is judged as a whole right away, so the chunk carries no load counters of its own.
+    """
+    cache = load_cache(path) if options.use_cache else None
+    if cache is None:
+        return None
+
+    reports = [ReportClass() for ReportClass in report_classes]
+    chunk_stats = FileStats(path) if collect_stats else None
+    if not run_cached(cache, reports, filter_func, options, chunk_stats, diagnostics):
+        return None
+    return reports, LoadStats(), chunk_stats, diagnostics
+
+def _completed(function: Callable[..., Optional[ChunkResult]], *args: Any) -> "Optional[Future[ChunkResult]]":
+    """Runs the function in this process, returns a finished future of its result (None when it returned None) or its error."""
+    future: Future = Future()
+    try:
+        result = function(*args)
+    except ValueError as e:
+        future.set_exception(e)
+        return future
+
+    if result is None:
+        return None
+    future.set_result(result)
+    return future
+
+
+class FileJob:
+    """
+    Chunks of a single file scheduled on an executor.
+    The chunks' stats and diagnostics are merged into `file_stats` and `diagnostics` if they are given.
+    """
+    def __init__(self, file_path: str, futures: List["Future[ChunkResult]"], file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None, max_missing_fields: int = RunOptions.max_missing_fields) -> None:
+        self.file_path = file_path
+        self.futures = futures
+        self.file_stats = file_stats
+        self.diagnostics = diagnostics
+        self.max_missing_fields = max_missing_fields
+        self.started = time.perf_counter()
+
+    def result(self) -> List[Report]:
+        """Waits for all the chunks and merges them in file order, which keeps the output identical to a serial run."""
+        stats = LoadStats()
+        reports: List[Report] = []
+
+        for future in self.futures:
+            chunk_reports, chunk_stats, chunk_file_stats, chunk_diagnostics = future.result()
+            stats.merge(chunk_stats)
+            if self.file_stats is not None and chunk_file_stats is not None:
+                self.file_stats.merge(chunk_file_stats)
+            if self.diagnostics is not None and chunk_diagnostics is not None:
+                self.diagnostics.merge(chunk_diagnostics)
+
+            if not reports:
+                reports = chunk_reports
+                continue
+
+            for report, chunk_report in zip(reports, chunk_reports):
+                report.merge(chunk_report)
+
+        if self.file_stats is not None:
+            # Chunks run concurrently, so the file took as long as waiting for the last of them.
+            self.file_stats.wall += time.perf_counter() - self.started
+        check_load_stats(self.file_path, stats, collect_required_fields(reports), self.max_missing_fields, collect_field_groups(reports))
+        record_invalid(reports, self.diagnostics)
+        return reports
+
+
+def submit_file(executor: Executor, file_path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], workers: int, options: RunOptions = RunOptions(), file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None) -> FileJob:
+    """
+    Splits the file into chunks and schedules them on the executor. The filter has to be picklable.
+    Streams (the standard input, named pipes, process substitutions) are processed right away in this process:
+    the standard input is not inherited by the workers, and a pipe can only be read once, by a single reader.
+    A file with a fresh columnar cache is also read from it right away, memory-mapping it is cheaper than shipping chunks.
+    """
+    if is_stream(file_path):
+        future = _completed(process_chunk, file_path, 0, None, report_classes, filter_func, options, file_stats is not None, diagnostics.for_chunk() if diagnostics is not None else None)
+        return FileJob(file_path, [future], file_stats, diagnostics, options.max_missing_fields)
+
+    future = _completed(process_cached, file_path, report_classes, filter_func, options, file_stats is not None, diagnostics.for_chunk() if diagnostics is not None else None)
+    if future is not None:
+        return FileJob(file_path, [future], file_stats, diagnostics, options.max_missing_fields)
+
+    index = ensure_index(file_path) if options.use_index else None
+    start, end = get_byte_range(filter_func, file_path, index)
+    chunks = plan_chunks(file_path, choose_chunk_size(file_path, workers), start, end, index)
+    futures = [
+        executor.submit(
+            process_chunk, file_path, start, end, report_classes, filter_func, options, file_stats is not None,
+            diagnostics.for_chunk() if diagnostics is not None else None
+        )
+        for start, end in chunks
+    ]
+    return FileJob(file_path, futures, file_stats, diagnostics, options.max_missing_fields)
@@ -0,0 +1,264 @@
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from logs_handler.reports import Report
+from logs_handler.utils import make_decoder, check_load_stats, parse_lines, read_json_lines, Decoder, Diagnostics, LoadStats
+from logs_handler.utils.diagnostics import INVALID_VALUES, MALFORMED_JSON, MISSING_FIELDS
+from logs_handler.utils.cache import CachedBatch, ColumnCache, build_lines, load_cache
+from logs_handler.utils.columns import BATCH_SIZE, ColumnBatch, np
+from logs_handler.utils.filters import AcceptAll, get_filter_fields, get_prefilter, get_byte_range
+from logs_handler.utils.index import ensure_index
+from logs_handler.utils.reader import iter_lines
+from .instrumentation import FileStats, StageStats, Stopwatch, STAGES, add_exclusive, peak_memory_kb, timed, timed_lines
+from .options import RunOptions
+
+
+def collect_required_fields(reports: Sequence[Report]) -> List[str]:
+    """Returns the union of the required fields of all reports, preserving order."""
+    fields: Dict[str, None] = {}
+    for report in reports:
+        fields.update(dict.fromkeys(report.get_required_fields()))
+    return list(fields)
+
+def collect_field_groups(reports: Sequence[Report]) -> Optional[List[List[str]]]:
+    """
+    Returns the distinct required fields of the reports, None when they all require the same ones.
+
+    Lines are validated against every group separately, so a report never loses lines for lacking fields
+    that only another report requires: adding a report to a run does not change the numbers of the others.
+    """
+    groups: Dict[frozenset, List[str]] = {}
+    for report in reports:
+        fields = report.get_required_fields()
+        groups.setdefault(frozenset(fields), list(fields))
+    return list(groups.values()) if len(groups) > 1 else None
+
+def _routes(reports: Sequence[Report]) -> List[Tuple[List[str], List[Report]]]:
+    """Returns the reports grouped by their required fields, which a line must have to be handed to them."""
+    routes: Dict[frozenset, Tuple[List[str], List[Report]]] = {}
+    for report in reports:
+        fields = report.get_required_fields()
+        routes.setdefault(frozenset(fields), (list(fields), []))[1].append(report)
+    return list(routes.values())
+
+def build_decoder(reports: Sequence[Report], filter_func: Callable[[Dict[str, Any]], bool], backend: str = "auto", batched: bool = False) -> Decoder:
+    """
+    Builds the decoder for the given reports.
+
+    Decoding is limited to the required fields plus the filter fields when the filter declares them,
+    and floats are only decoded as `Decimal` when one of the reports needs it outside of batches.
+    """
+    filter_fields = get_filter_fields(filter_func)
+    fields = None
+
+    if filter_fields is not None:
+        fields = collect_required_fields(reports)
+        fields += [field for field in filter_fields if field not in fields]
+
+    exact_decimals = not batched and any(report.needs_exact_decimals() for report in reports)
+    return make_decoder(backend, fields, exact_decimals)
+
+def dispatch(lines: Iterable[Dict[str, Any]], reports: Sequence[Report], batch_size: int = 0) -> None:
+    """
+    Feeds the log entries to all the reports, one by one or in column batches of `batch_size` entries.
+    When the reports require different fields, every report only gets the entries that have its fields.
+    """
+    routes = _routes(reports) if collect_field_groups(reports) is not None else None
+
+    if batch_size <= 0:
+        if routes is None:
+            processors = [report.process_line for report in reports]
+            for line in lines:
+                for process_line in processors:
+                    process_line(line)
+            return
+
+        line_routes = [(fields, [report.process_line for report in route_reports]) for fields, route_reports in routes]
+        for line in lines:
+            for fields, processors in line_routes:
+                if all(field in line for field in fields):
+                    for process_line in processors:
+                        process_line(line)
+        return
+
+    lines = iter(lines)
+    while batch_lines := list(islice(lines, batch_size)):
+        batch = ColumnBatch(batch_lines)
+        if routes is None:
+            dispatch_batch(batch, reports)
+            continue
+
+        for fields, route_reports in routes:
+            complete = [line for line in batch_lines if all(field in line for field in fields)]
+            if complete:
+                dispatch_batch(batch if len(complete) == len(batch_lines) else ColumnBatch(complete), route_reports)
+
+def dispatch_batch(batch: ColumnBatch, reports: Sequence[Report]) -> None:
+    """Feeds a single column batch to all the reports."""
+    for report in reports:
+        report.process_batch(batch)
+
+def record_invalid(reports: Sequence[Report], diagnostics: Optional[Diagnostics], before: int = 0) -> int:
+    """
+    Records the entries the reports skipped for values they could not interpret as rejected lines, see `Report.invalid_lines`.
+    Only the ones skipped since the reports had skipped `before` entries are added; returns the new total.
+    """
+    total = sum(report.invalid_lines() for report in reports)
+    if diagnostics is not None:
+        diagnostics.count(INVALID_VALUES, total - before)
+    return total
+
+def process_range(file_path: str, reports: Sequence[Report], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, stats: LoadStats, start: int = 0, end: int | None = None, strict: bool = False, file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None) -> None:
+    """
+    Feeds the log entries of the [start, end) byte range of the file to all the reports, see `read_json_lines`.
+    Rejected lines are recorded in `diagnostics` when it is given.
+
+    With `file_stats`, the read, decode, filter and aggregate stages are timed separately and added to it.
+    The stages are only wrapped then, so a run without stats pays nothing for them.
+    """
+    required_fields = collect_required_fields(reports)
+    field_groups = collect_field_groups(reports)
+    decoder = build_decoder(reports, filter_func, options.decoder_backend, options.batch_size > 0)
+    prefilter = get_prefilter(filter_func)
+
+    if file_stats is None:
+        lines = read_json_lines(file_path, required_fields, stats, start, end, strict, decoder, prefilter, diagnostics, options.max_missing_fields, field_groups)
+        dispatch(filter(filter_func, lines), reports, options.batch_size)
+        return
+
+    inclusive = {stage: StageStats() for stage in STAGES}
+    location = "" if start == 0 else f" (chunk at byte {start})"
+    raw_lines = timed_lines(iter_lines(file_path, start, end), inclusive["read"], file_stats)
+    parsed = parse_lines(raw_lines, file_path, required_fields, stats, strict, decoder, prefilter, location, diagnostics=diagnostics, max_missing_fields=options.max_missing_fields, field_groups=field_groups)
+    entries = timed(parsed, inclusive["decode"])
+    kept_entries = timed(filter(filter_func, entries), inclusive["filter"])
+
+    with Stopwatch(inclusive["aggregate"]):
+        dispatch(kept_entries, reports, options.batch_size)
+    inclusive["aggregate"].items = inclusive["filter"].items
+    add_exclusive(file_stats, inclusive)
+
+def run_cached(cache: ColumnCache, reports: Sequence[Report], filter_func: Callable[[Dict[str, Any]], bool] = lambda x: True, options: RunOptions = RunOptions(), file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None) -> bool:
+    """
+    Feeds the rows of the columnar cache to all the reports, loading only the required and the filter columns.
+
+    Returns False without touching the reports when the cache lacks some of the columns, the file has to be parsed then.
+    The rows are judged like the lines of the file, so a cache of an invalid log fails the same way.
+    With `file_stats`, mapping the columns counts as reading and everything else as aggregating.
+    The cache only keeps the amount of rejected lines, so `diagnostics` get counts without samples.
+    """
+    required_fields = collect_required_fields(reports)
+    filter_fields = get_filter_fields(filter_func)
+
+    if not cache.has_fields(required_fields) or not cache.has_fields(filter_fields):
+        return False
+
+    fields = required_fields + [field for field in (filter_fields if filter_fields is not None else cache.fields) if field not in required_fields]
+    stages = file_stats.stages if file_stats is not None else {stage: StageStats() for stage in STAGES}
+
+    with Stopwatch(stages["read"]):
+        columns = {field: cache.load(field) for field in fields}
+
+    with Stopwatch(stages["aggregate"]):
+        _run_cached_rows(cache, columns, reports, filter_func, options, required_fields, file_stats, diagnostics)
+    return True
+
+def _present_rows(cache: ColumnCache, columns: Dict[str, Any], fields: List[str]) -> "np.ndarray":
+    """Returns the mask of the rows that have all the fields."""
+    present = np.ones(cache.meta.rows, dtype=bool)
+    for field in fields:
+        if columns[field].meta.missing:
+            present &= columns[field].present()
+    return present
+
+def _run_cached_rows(cache: ColumnCache, columns: Dict[str, Any], reports: Sequence[Report], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, required_fields: List[str], file_stats: Optional[FileStats], diagnostics: Optional[Diagnostics]) -> None:
+    field_groups = collect_field_groups(reports)
+    present = _present_rows(cache, columns, required_fields)
+    groups_present = [_present_rows(cache, columns, fields) for fields in field_groups] if field_groups is not None else [present]
+    taken = np.logical_or.reduce(groups_present)
+
+    stats = LoadStats(
+        total_lines=cache.meta.total_lines,
+        valid_lines=int(taken.sum()),
+        malformed_json=cache.meta.malformed_json,
+        missing_fields=cache.meta.rows - int(taken.sum())
+    )
+    if field_groups is not None:
+        stats.group_missing = tuple(cache.meta.rows - int(group_present.sum()) for group_present in groups_present)
+
+    threshold = options.max_missing_fields
+    if threshold:
+        # A parsed file is given up on at the row that reached the threshold.
+        failed_at = [missing_rows[threshold - 1] for missing_rows in (np.flatnonzero(~group_present) for group_present in groups_present) if len(missing_rows) >= threshold]
+        if failed_at:
+            stats.total_lines = int(min(failed_at)) + 1
+    if diagnostics is not None:
+        diagnostics.count(MALFORMED_JSON, stats.malformed_json)
+        diagnostics.count(MISSING_FIELDS, cache.meta.rows - int(present.sum()))
+    check_load_stats(cache.path, stats, required_fields, threshold, field_groups)
+
+    if file_stats is not None:
+        file_stats.load.merge(stats)
+        file_stats.bytes_read += sum(column.data.nbytes for column in columns.values())
+        file_stats.entries += stats.valid_lines
+
+    rows = np.flatnonzero(taken)
+    batched = options.batch_size > 0
+    batch_size = options.batch_size if batched else BATCH_SIZE
+    exact_decimals = not batched and any(report.needs_exact_decimals() for report in reports)
+    accept_all = isinstance(filter_func, AcceptAll)
+    routes = [(route_reports, _present_rows(cache, columns, fields)) for fields, route_reports in _routes(reports)] if field_groups is not None else []
+
+    for first in range(0, len(rows), batch_size):
+        batch_rows = rows[first:first + batch_size]
+
+        if not batched:
+            dispatch(filter(filter_func, build_lines(columns, batch_rows, exact_decimals)), reports)
+            continue
+
+        batch = CachedBatch(columns, batch_rows)
+        if not accept_all:
+            batch = CachedBatch(columns, batch_rows[[bool(filter_func(line)) for line in batch.lines]])
+        if field_groups is None:
+            dispatch_batch(batch, reports)
+            continue
+
+        for route_reports, route_present in routes:
+            complete = route_present[batch.rows]
+            if complete.all():
+                dispatch_batch(batch, route_reports)
+            elif complete.any():
+                dispatch_batch(CachedBatch(columns, batch.rows[complete]), route_reports)
+
+def run_reports(file_path: str, reports: Sequence[Report], filter_func: Callable[[Dict[str, Any]], bool] = lambda x: True, options: RunOptions = RunOptions(), file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None) -> None:
+    """
+    Feeds every log entry of the file to all the reports in a single pass.
+
+    Each line is parsed once, no matter how many reports are attached.
+    A line missing some of the fields is only skipped by the reports requiring them, see `collect_field_groups`.
+    A fresh columnar cache of the file is used instead of parsing it, unless disabled in the options.
+    Counters and stage timings are added to `file_stats`, rejected lines to `diagnostics`, when they are given.
+    """
+    if file_stats is None:
+        _run_reports(file_path, reports, filter_func, options, None, diagnostics)
+        record_invalid(reports, diagnostics)
+        return
+
+    with Stopwatch(file_stats):
+        _run_reports(file_path, reports, filter_func, options, file_stats, diagnostics)
+    record_invalid(reports, diagnostics)
+    file_stats.peak_memory_kb = max(file_stats.peak_memory_kb, peak_memory_kb())
+
+def _run_reports(file_path: str, reports: Sequence[Report], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, file_stats: Optional[FileStats], diagnostics: Optional[Diagnostics]) -> None:
+    cache = load_cache(file_path) if options.use_cache else None
+    if cache is not None and run_cached(cache, reports, filter_func, options, file_stats, diagnostics):
+        return
+
+    stats = LoadStats()
+    index = ensure_index(file_path) if options.use_index else None
+    start, end = get_byte_range(filter_func, file_path, index)
+
+    process_range(file_path, reports, filter_func, options, stats, start, end, strict=True, file_stats=file_stats, diagnostics=diagnostics)
+    if file_stats is not None:
+        file_stats.load.merge(stats)
+    check_load_stats(file_path, stats, collect_required_fields(reports), options.max_missing_fields, collect_field_groups(reports))
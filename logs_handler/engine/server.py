@@ -0,0 +1,209 @@
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass
+import errno
+import hashlib
+import os
+import signal
+import socket
+import stat
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from logs_handler.reports import ReportFactory
+from logs_handler.utils.writers import encode_json
+from .follow import Follower
+from .state import run_signature
+
+LOOPBACK = "127.0.0.1"
+# Seconds a client has to send its request before the connection is dropped.
+REQUEST_TIMEOUT = 10.0
+# Bytes of a request line and its headers accepted by the server.
+MAX_REQUEST_BYTES = 64 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+
+
+def report_signature(report_class: ReportFactory, filter_func: Any) -> str:
+    """Returns the short signature of a report and the filter, matched by the clients before they trust its tables."""
+    return hashlib.sha1(run_signature([report_class], filter_func).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class ServedReport:
+    """A report held by the server: its position in the reports of every followed file and its signature."""
+    index: int
+    signature: str
+
+
+class RequestError(Exception):
+    """A request the server answers with an error status."""
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def remove_socket(socket_path: str) -> None:
+    """
+    Removes a stale Unix socket left at the path, one nothing listens on any more.
+    Raises ValueError rather than removing anything else, or the socket of a running server.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{socket_path} already exists and is not a socket")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                return
+            if e.errno != errno.ECONNREFUSED:
+                raise ValueError(f"cannot tell whether {socket_path} is still in use: {e.strerror}")
+        else:
+            raise ValueError(f"{socket_path} is in use by a running server")
+    os.remove(socket_path)
+
+
+class ReportServer:
+    """
+    Answers report queries from the in-memory state of a follower, as json over a minimal HTTP/1.1.
+
+        GET /health                                   files read so far and the names of the reports
+        GET /reports/<name>?file=&limit=&signature=   `{"report", "signature", "files": [{"file", "headers", "rows"}]}`
+
+    The follower keeps ingesting on its own thread; tables are built and encoded on the default executor,
+    so a slow query never stalls the event loop. Every connection answers a single request.
+    """
+    def __init__(self, follower: Follower, reports: Dict[str, ServedReport]) -> None:
+        self.follower = follower
+        self.reports = reports
+        self.files = {os.path.abspath(followed.path): followed for followed in follower.files}
+
+    async def start(self, socket_path: Optional[str] = None, port: Optional[int] = None) -> asyncio.AbstractServer:
+        """Starts listening on the Unix socket path, or on the TCP port of the loopback interface."""
+        if socket_path is not None:
+            remove_socket(socket_path)
+            return await asyncio.start_unix_server(self.handle, socket_path, limit=MAX_REQUEST_BYTES)
+        return await asyncio.start_server(self.handle, LOOPBACK, port, limit=MAX_REQUEST_BYTES)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+
+            try:
+                body = await self.respond(request)
+                status = 200
+            except RequestError as e:
+                status, body = e.status, encode_json({"error": str(e)})
+            except Exception as e:
+                status, body = 500, encode_json({"error": str(e)})
+
+            payload = body.encode()
+            head = f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+            writer.write(head.encode() + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request: bytes) -> str:
+        """Returns the json body answering the raw request, raises RequestError when it cannot be answered."""
+        try:
+            method, target, _ = request.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise RequestError(400, "malformed request line")
+        if method != "GET":
+            raise RequestError(405, f"method {method} is not supported")
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        loop = asyncio.get_running_loop()
+
+        if url.path == "/health":
+            return await loop.run_in_executor(None, self.health)
+        if url.path.startswith("/reports/"):
+            return await loop.run_in_executor(None, self.report, url.path[len("/reports/"):], query)
+        raise RequestError(404, f"unknown path {url.path}")
+
+    def health(self) -> str:
+        if self.follower.error is not None:
+            raise RequestError(500, f"log reader stopped: {self.follower.error}")
+        files = [
+            {
+                "file": followed.path,
+                "lines_read": followed.lines_read,
+                "backlog": followed.tailer.backlog,
+                "rejected": followed.diagnostics.counts
+            }
+            for followed in self.follower.files
+        ]
+        return encode_json({"status": "ok", "reports": list(self.reports), "files": files})
+
+    def report(self, name: str, query: Dict[str, str]) -> str:
+        if self.follower.error is not None:
+            raise RequestError(500, f"log reader stopped: {self.follower.error}")
+        if name not in self.reports:
+            raise RequestError(404, f"unknown report <{name}>, served: {', '.join(self.reports)}")
+        served = self.reports[name]
+
+        if "signature" in query and query["signature"] != served.signature:
+            raise RequestError(409, f"report <{name}> is served with other options or filters")
+
+        limit = None
+        if "limit" in query:
+            try:
+                limit = int(query["limit"])
+            except ValueError:
+                limit = -1
+            if limit < 1:
+                raise RequestError(400, f"invalid limit <{query['limit']}>, expected a positive integer")
+
+        if "file" in query:
+            path = os.path.abspath(query["file"])
+            if path not in self.files:
+                raise RequestError(404, f"file <{query['file']}> is not followed")
+            followed_files = [self.files[path]]
+        else:
+            followed_files = self.follower.files
+
+        tables: List[Dict[str, Any]] = []
+        for followed in followed_files:
+            rows, headers = followed.table(served.index, limit)
+            tables.append({"file": followed.path, "headers": headers, "rows": rows})
+        return encode_json({"report": name, "signature": served.signature, "files": tables})
+
+
+def serve(follower: Follower, reports: Sequence[Tuple[str, ReportFactory]], filter_func: Any, socket_path: Optional[str] = None, port: Optional[int] = None) -> None:
+    """
+    Follows the files and answers report queries until interrupted or terminated.
+    `reports` name the report factories the follower was built with, in the same order.
+    """
+    served = {name: ServedReport(i, report_signature(report_class, filter_func)) for i, (name, report_class) in enumerate(reports)}
+    server = ReportServer(follower, served)
+
+    async def run() -> None:
+        listener = await server.start(socket_path, port)
+        address = socket_path if socket_path is not None else "http://{}:{}".format(*listener.sockets[0].getsockname()[:2])
+        print(f"Serving {', '.join(served)} over {len(follower.files)} file(s) on {address}", flush=True)
+        stop = asyncio.Event()
+        with suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        async with listener:
+            await stop.wait()
+
+    follower.start()
+    try:
+        asyncio.run(run())
+    finally:
+        follower.stop()
+        if socket_path is not None:
+            with suppress(ValueError):
+                remove_socket(socket_path)
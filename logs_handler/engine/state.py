@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+import hashlib
+import os
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from logs_handler.reports import Report, ReportFactory
+from logs_handler.utils import Diagnostics, LoadStats, check_load_stats
+from logs_handler.utils.filters import get_byte_range
+from logs_handler.utils.index import ensure_index
+from logs_handler.utils.reader import find_last_line_end, is_compressed, is_stream
+from .instrumentation import FileStats, Stopwatch, peak_memory_kb
+from .options import RunOptions
+from .pipeline import collect_field_groups, collect_required_fields, process_range, record_invalid
+
+STATE_SUFFIX = ".state"
+# Size of the file head used to tell an appended file from a rewritten one.
+HEAD_BYTES = 4096
+
+
+@dataclass
+class Snapshot:
+    """Aggregated state of the reports over a file, up to the `offset` of the last consumed line."""
+    file_path: str
+    signature: str
+    device: int
+    inode: int
+    size: int
+    mtime_ns: int
+    offset: int
+    head_digest: str
+    reports: List[Report]
+    stats: LoadStats
+
+
+def run_signature(report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool]) -> str:
+    """
+    Describes the reports and the filter of a run. A snapshot is only resumed by a run with the same signature.
+
+    Report factories are described by their repr (partials include their options), plain classes by their name.
+    Filters without a stable repr (lambdas) never match, so such runs always start from scratch.
+    """
+    names = [
+        f"{ReportClass.__module__}.{ReportClass.__qualname__}" if isinstance(ReportClass, type) else repr(ReportClass)
+        for ReportClass in report_classes
+    ]
+    return f"{names}|{filter_func!r}"
+
+def snapshot_path(state_dir: str, file_path: str, signature: str) -> str:
+    """Returns the path of the snapshot of the given file and run signature."""
+    key = hashlib.sha1(f"{os.path.abspath(file_path)}|{signature}".encode()).hexdigest()
+    return os.path.join(state_dir, key + STATE_SUFFIX)
+
+def _head_digest(path: str, size: int) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read(min(size, HEAD_BYTES))).hexdigest()
+
+def load_snapshot(path: str) -> Optional[Snapshot]:
+    """Loads a snapshot. Returns None if there is none or it is unreadable."""
+    try:
+        with open(path, "rb") as file:
+            snapshot = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    return snapshot if isinstance(snapshot, Snapshot) else None
+
+def save_snapshot(path: str, snapshot: Snapshot) -> None:
+    """Atomically writes the snapshot."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as file:
+        pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+def can_resume(snapshot: Snapshot, file_path: str, stat: os.stat_result) -> bool:
+    """
+    Checks that the file is the same one the snapshot was taken of, with data only appended since.
+
+    A different inode means the file was rotated, a smaller size or a different head means it was truncated or rewritten.
+    Compressed files cannot be appended to, so they are only resumed when unchanged.
+    """
+    if (snapshot.device, snapshot.inode) != (stat.st_dev, stat.st_ino):
+        return False
+
+    if is_compressed(file_path):
+        return (snapshot.size, snapshot.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+    if stat.st_size < snapshot.offset:
+        return False
+    return snapshot.head_digest == _head_digest(file_path, snapshot.offset)
+
+def run_incremental(file_path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None) -> List[Report]:
+    """
+    Builds the reports over the file, resuming from the snapshot kept in `options.state_dir`.
+
+    Only the complete lines appended since the previous run are processed; their reports are merged into the
+    stored ones. When the file was truncated or rotated, the whole file is processed again.
+    `file_stats` gets the counters and timings, and `diagnostics` the rejected lines, of the processed part only.
+    """
+    if file_stats is None:
+        return _run_incremental(file_path, report_classes, filter_func, options, None, diagnostics)
+
+    with Stopwatch(file_stats):
+        reports = _run_incremental(file_path, report_classes, filter_func, options, file_stats, diagnostics)
+    file_stats.peak_memory_kb = max(file_stats.peak_memory_kb, peak_memory_kb())
+    return reports
+
+def _run_incremental(file_path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], options: RunOptions, file_stats: Optional[FileStats], diagnostics: Optional[Diagnostics]) -> List[Report]:
+    if is_stream(file_path):
+        raise ValueError("The standard input and pipes are read only once and cannot be resumed from a state directory.")
+    signature = run_signature(report_classes, filter_func)
+    path = snapshot_path(options.state_dir, file_path, signature)
+    stat = os.stat(file_path)
+    snapshot = load_snapshot(path)
+
+    if snapshot is None or snapshot.signature != signature or not can_resume(snapshot, file_path, stat):
+        snapshot = Snapshot(
+            file_path=os.path.abspath(file_path),
+            signature=signature,
+            device=stat.st_dev,
+            inode=stat.st_ino,
+            size=0,
+            mtime_ns=0,
+            offset=0,
+            head_digest="",
+            reports=[ReportClass() for ReportClass in report_classes],
+            stats=LoadStats()
+        )
+
+    reports = [ReportClass() for ReportClass in report_classes]
+    required_fields = collect_required_fields(reports)
+
+    if is_compressed(file_path):
+        start, end, consumed = 0, None, stat.st_size
+        if snapshot.size == stat.st_size:
+            start = end = consumed
+    else:
+        consumed = find_last_line_end(file_path, snapshot.offset, stat.st_size)
+        index = ensure_index(file_path) if options.use_index else None
+        range_start, range_end = get_byte_range(filter_func, file_path, index)
+        start = max(snapshot.offset, range_start)
+        end = consumed if range_end is None else max(start, min(consumed, range_end))
+
+    if end is None or start < end:
+        stats = LoadStats()
+        process_range(file_path, reports, filter_func, options, stats, start, end, file_stats=file_stats, diagnostics=diagnostics)
+        record_invalid(reports, diagnostics)
+        snapshot.stats.merge(stats)
+        if file_stats is not None:
+            file_stats.load.merge(stats)
+
+        for stored, report in zip(snapshot.reports, reports):
+            stored.merge(report)
+
+    check_load_stats(file_path, snapshot.stats, required_fields, options.max_missing_fields, collect_field_groups(reports))
+
+    snapshot.size = stat.st_size
+    snapshot.mtime_ns = stat.st_mtime_ns
+    snapshot.offset = consumed
+    snapshot.head_digest = _head_digest(file_path, consumed) if not is_compressed(file_path) else ""
+    save_snapshot(path, snapshot)
+
+    return snapshot.reports
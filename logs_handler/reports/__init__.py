@@ -1,9 +1,37 @@
-from .base import Report
-from .average_response_time import AvgResponseTime
-from .user_agent import UserAgent
+from importlib import import_module
+from typing import Any
+
+from .base import Report, ReportFactory
+from .registry import register_report, get_report_class, report_names, is_report
+
+# Report classes are imported on first access, so importing the package loads none of the report modules.
+_LAZY_EXPORTS = {
+    "AvgResponseTime": "logs_handler.reports.average_response_time",
+    "CompactAvgResponseTime": "logs_handler.reports.average_response_time",
+    "UserAgent": "logs_handler.reports.user_agent",
+    "Percentiles": "logs_handler.reports.percentiles",
+    "TimeSeries": "logs_handler.reports.timeseries",
+    "GroupBy": "logs_handler.reports.groupby",
+    "UrlNormalizer": "logs_handler.reports.normalizers"
+}
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "Report", 
+    "ReportFactory",
+    "register_report",
+    "get_report_class",
+    "report_names",
+    "is_report",
     "AvgResponseTime",
-    "UserAgent"
-]
\ No newline at end of file
+    "CompactAvgResponseTime",
+    "UserAgent",
+    "Percentiles",
+    "TimeSeries",
+    "GroupBy",
+    "UrlNormalizer"
+]
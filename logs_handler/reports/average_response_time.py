@@ -1,8 +1,12 @@
+from array import array
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, Dict, List
+from math import isfinite
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from .base import Report
+from logs_handler.utils.columns import ColumnBatch, remap_codes, np
+from .base import MICROSECONDS, Report, ranked
+from .sketches import SpaceSaving, TOP_CAPACITY_FACTOR
 
 @dataclass
 class AggregatedData:
@@ -16,28 +20,239 @@ class AggregatedData:
             return Decimal("0.0")
         return self.total_time / self.count
 
+    def merge(self, other: "AggregatedData") -> None:
+        """Adds the totals of another aggregate."""
+        self.total_time += other.total_time
+        self.count += other.count
+
+
+def valid_response_time(value: Any) -> bool:
+    """Returns whether the decoded response time is a finite number; booleans and strings are not."""
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool) and isfinite(value)
+
 
 class AvgResponseTime(Report):
+    """
+    Average response time per handler.
+
+    With `top_k`, only the top handlers are tracked in a bounded `SpaceSaving` summary: totals are upper bounds
+    off by at most `count_error`, averages are over the requests seen while the handler was tracked.
+    `url_normalizer` is applied to the urls before aggregation. Lines whose response time is not a number are
+    skipped and counted by `invalid_lines`.
+    """
     HEADERS = ["handler", "total", "avg_response_time"]
+    TOP_HEADERS = HEADERS + ["count_error"]
     REQUIRED_FIELDS = ["url", "response_time"]
+    # Payload of the `SpaceSaving` summary.
+    PAYLOAD: Callable[[], Any] = AggregatedData
 
-    def __init__(self) -> None:
+    def __init__(self, top_k: Optional[int] = None, url_normalizer: Optional[Callable[[str], str]] = None) -> None:
         self.report: Dict[str, AggregatedData] = {}
+        self.top_k = top_k
+        self.url_normalizer = url_normalizer
+        self.heavy_hitters = SpaceSaving(top_k * TOP_CAPACITY_FACTOR, self.PAYLOAD) if top_k is not None else None
+        self.invalid = 0
+
+    def invalid_lines(self) -> int:
+        return self.invalid
 
     def process_line(self, line: Dict[str, Any]) -> None:
         url = line["url"]
         response_time = line["response_time"]
+        if not valid_response_time(response_time):
+            self.invalid += 1
+            return
+
+        if self.url_normalizer is not None:
+            url = self.url_normalizer(url)
 
-        agg_data = self.report.setdefault(url, AggregatedData())
+        if self.heavy_hitters is not None:
+            agg_data = self.heavy_hitters.increment(url)
+        else:
+            agg_data = self.report.setdefault(url, AggregatedData())
         agg_data.total_time += response_time
         agg_data.count += 1
 
+    def process_batch(self, batch: ColumnBatch) -> None:
+        """
+        Sums the response times per handler with `np.bincount` over float64 columns.
+
+        The sums are added back as decimals of their shortest repr, so the averages match the per-line
+        path within a relative error of 1e-9 (float64 rounding over a batch).
+        """
+        columns = self._batch_columns(batch)
+        if columns is None:
+            return
+        codes, urls, response_times = columns
+
+        counts = np.bincount(codes, minlength=len(urls)).tolist()
+        totals = np.bincount(codes, weights=response_times, minlength=len(urls)).tolist()
+
+        for url, count, total in zip(urls, counts, totals):
+            if not count:
+                continue
+            if self.heavy_hitters is not None:
+                agg_data = self.heavy_hitters.increment(url, count)
+            else:
+                agg_data = self.report.setdefault(url, AggregatedData())
+            agg_data.total_time += Decimal(repr(total))
+            agg_data.count += count
+
+    def _batch_columns(self, batch: ColumnBatch) -> Optional[Tuple["np.ndarray", List[str], "np.ndarray"]]:
+        """
+        Returns the url codes, the distinct urls and the response times of the batch's valid lines.
+
+        A batch with a response time that is not a number is processed line by line instead, and None is returned.
+        """
+        try:
+            response_times = batch.floats("response_time")
+        except (TypeError, ValueError):
+            for line in batch.lines:
+                self.process_line(line)
+            return None
+
+        codes, urls = batch.factorize("url")
+        if self.url_normalizer is not None:
+            codes, urls = remap_codes(codes, urls, self.url_normalizer)
+
+        valid = np.isfinite(response_times)
+        if not valid.all():
+            self.invalid += len(valid) - int(valid.sum())
+            codes, response_times = codes[valid], response_times[valid]
+        return codes, urls, response_times
+
+    def merge(self, other: "AvgResponseTime") -> None:
+        self.invalid += other.invalid
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.merge(other.heavy_hitters, AggregatedData.merge)
+            return
+
+        for url, other_data in other.report.items():
+            self.report.setdefault(url, AggregatedData()).merge(other_data)
+
     def generate_table(self) -> List[List[Any]]:
-        sorted_report = sorted(self.report.items(), key=lambda item: item[1].count, reverse=True)
-        return [[url, data.count, data.average] for url, data in sorted_report]
+        return list(self.iter_table())
+
+    def iter_table(self, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        if self.heavy_hitters is not None:
+            top = self.heavy_hitters.top(self.top_k if limit is None else min(self.top_k, limit))
+            return ([url, count, data.average, error] for url, count, error, data in top)
+
+        sorted_report = ranked(self.report.items(), key=lambda item: item[1].count, limit=limit)
+        return ([url, data.count, data.average] for url, data in sorted_report)
     
     def get_headers(self) -> List[str]:
-        return self.HEADERS
+        return self.TOP_HEADERS if self.heavy_hitters is not None else self.HEADERS
     
     def get_required_fields(self) -> List[str]:
-        return self.REQUIRED_FIELDS
\ No newline at end of file
+        return self.REQUIRED_FIELDS
+
+    def needs_exact_decimals(self) -> bool:
+        return True
+
+
+def exact_average(total_microseconds: int, count: int) -> Decimal:
+    """Returns the average in seconds, the same decimal as summing and dividing the response times as `Decimal`."""
+    if count == 0:
+        return Decimal("0.0")
+    return Decimal(total_microseconds) / (count * MICROSECONDS)
+
+
+class CompactData:
+    """Slotted aggregate of the compact report, the payload of its `SpaceSaving` summary."""
+    __slots__ = ("total_microseconds", "count")
+
+    def __init__(self, total_microseconds: int = 0, count: int = 0) -> None:
+        self.total_microseconds = total_microseconds
+        self.count = count
+
+    @property
+    def average(self) -> Decimal:
+        return exact_average(self.total_microseconds, self.count)
+
+    def merge(self, other: "CompactData") -> None:
+        self.total_microseconds += other.total_microseconds
+        self.count += other.count
+
+
+class CompactAvgResponseTime(AvgResponseTime):
+    """
+    Average response time per handler with compact aggregate state, the same table as `AvgResponseTime`.
+
+    Every handler is interned to an integer id, which indexes two parallel `array("q")` columns: request counts
+    and total response times in integer microseconds. A handler then costs a dict entry and 16 bytes instead of
+    a dataclass with a `Decimal`. Floats need not be decoded as `Decimal`: averages are exact as long as
+    response times have at most microsecond resolution (finer ones are rounded to the microsecond).
+    With `top_k`, the `SpaceSaving` summary keeps slotted `CompactData` payloads.
+    """
+    PAYLOAD = CompactData
+
+    def __init__(self, top_k: Optional[int] = None, url_normalizer: Optional[Callable[[str], str]] = None) -> None:
+        super().__init__(top_k, url_normalizer)
+        self.ids: Dict[str, int] = {}
+        self.counts = array("q")
+        self.totals = array("q")
+
+    def _add(self, url: str, count: int, total_microseconds: int) -> None:
+        if self.heavy_hitters is not None:
+            data = self.heavy_hitters.increment(url, count)
+            data.total_microseconds += total_microseconds
+            data.count += count
+            return
+
+        key_id = self.ids.get(url)
+        if key_id is None:
+            key_id = self.ids[url] = len(self.counts)
+            self.counts.append(0)
+            self.totals.append(0)
+        self.counts[key_id] += count
+        self.totals[key_id] += total_microseconds
+
+    def process_line(self, line: Dict[str, Any]) -> None:
+        url = line["url"]
+        response_time = line["response_time"]
+        if not valid_response_time(response_time):
+            self.invalid += 1
+            return
+
+        if self.url_normalizer is not None:
+            url = self.url_normalizer(url)
+        # Exact for response times with up to 6 decimals, whether decoded as float or `Decimal`.
+        self._add(url, 1, round(response_time * MICROSECONDS))
+
+    def process_batch(self, batch: ColumnBatch) -> None:
+        """Sums the microseconds per handler with `np.bincount`; float64 holds these integer sums exactly up to 2^53."""
+        columns = self._batch_columns(batch)
+        if columns is None:
+            return
+        codes, urls, response_times = columns
+
+        microseconds = np.rint(response_times * MICROSECONDS)
+        counts = np.bincount(codes, minlength=len(urls)).tolist()
+        totals = np.bincount(codes, weights=microseconds, minlength=len(urls)).tolist()
+
+        for url, count, total in zip(urls, counts, totals):
+            if count:
+                self._add(url, count, int(total))
+
+    def merge(self, other: "CompactAvgResponseTime") -> None:
+        self.invalid += other.invalid
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.merge(other.heavy_hitters, CompactData.merge)
+            return
+
+        for url, key_id in other.ids.items():
+            self._add(url, other.counts[key_id], other.totals[key_id])
+
+    def iter_table(self, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        if self.heavy_hitters is not None:
+            return super().iter_table(limit)
+
+        # Ids follow the insertion order, so equal counts keep the order of `AvgResponseTime`.
+        urls = list(self.ids)
+        counts, totals = self.counts, self.totals
+        key_ids = ranked(range(len(urls)), key=counts.__getitem__, limit=limit)
+        return ([urls[key_id], counts[key_id], exact_average(totals[key_id], counts[key_id])] for key_id in key_ids)
+
+    def needs_exact_decimals(self) -> bool:
+        return False
@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+import heapq
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from logs_handler.utils.columns import ColumnBatch
+
+T = TypeVar("T")
+
+# Values summed exactly are kept as integer micro-units (microseconds for response times).
+MICROSECONDS = 1_000_000
 
 
 class Report(ABC):
@@ -11,11 +20,30 @@ class Report(ABC):
         """Processes a single log entry to update the report's state."""
         pass
 
+    def process_batch(self, batch: ColumnBatch) -> None:
+        """Processes a batch of log entries. Reports override it with columnar aggregation, the fallback goes line by line."""
+        for line in batch.lines:
+            self.process_line(line)
+
+    def merge(self, other: "Report") -> None:
+        """
+        Merges the state of another report of the same type, built over a different part of the input.
+        Needed by `--workers` and `--state` only, so reports that do not implement it still work in serial runs.
+        """
+        raise ValueError(f"{type(self).__name__} report does not implement merge, it cannot be used with --workers or --state")
+
     @abstractmethod
     def generate_table(self) -> List[List[Any]]:
         """Generates the final table data from the aggregated report."""
         pass
 
+    def iter_table(self, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        """
+        Yields the rows of the final table one by one, only the first `limit` of them if it is given.
+        Reports override it to build the rows lazily and to select the first rows without ordering all of them.
+        """
+        return islice(self.generate_table(), limit)
+
     @abstractmethod
     def get_headers(self) -> List[str]:
         """Returns the list of header strings for the report's table."""
@@ -23,4 +51,24 @@ class Report(ABC):
 
     @abstractmethod
     def get_required_fields(self) -> List[str]:
-        """Returns the list of the fields log file should have."""
\ No newline at end of file
+        """Returns the list of the fields log file should have."""
+        pass
+
+    def invalid_lines(self) -> int:
+        """Returns the amount of entries skipped for values the report could not interpret, e.g. an unparsable timestamp."""
+        return 0
+
+    def needs_exact_decimals(self) -> bool:
+        """Returns whether float values have to be decoded as `Decimal` for this report."""
+        return False
+
+
+def ranked(items: Iterable[T], key: Callable[[T], Any], limit: Optional[int] = None, descending: bool = True) -> List[T]:
+    """Orders the items by the key, stable for equal keys. With `limit`, only the first items are selected, on a heap."""
+    if limit is None:
+        return sorted(items, key=key, reverse=descending)
+    return (heapq.nlargest if descending else heapq.nsmallest)(limit, items, key=key)
+
+
+# Report classes, or partials binding their options (e.g. `top_k`), used by the engine to create fresh reports.
+ReportFactory = Callable[[], Report]
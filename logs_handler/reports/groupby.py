@@ -0,0 +1,227 @@
+from array import array
+from math import isfinite
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from logs_handler.utils.columns import ColumnBatch, float_column, remap_codes, np
+from .base import MICROSECONDS, Report, ranked
+
+# Aggregation functions; all but `count` take a numeric field, e.g. `avg:response_time`.
+AGGREGATIONS = ("count", "sum", "avg", "min", "max")
+# Accumulator slot kinds. Slot 0 of every group is its count.
+COUNT, SUM, MIN, MAX = "count", "sum", "min", "max"
+SLOT_INITIAL = {COUNT: 0.0, SUM: 0.0, MIN: float("inf"), MAX: float("-inf")}
+
+
+@dataclass(frozen=True)
+class Aggregation:
+    """A single output column of the group-by report, parsed from "func" or "func:field"."""
+    func: str
+    field: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "Aggregation":
+        func, _, field = spec.strip().partition(":")
+        if func not in AGGREGATIONS:
+            raise ValueError(f"unknown aggregation <{func}>, expected one of: {', '.join(AGGREGATIONS)}")
+        if func == COUNT and field:
+            raise ValueError("count takes no field")
+        if func != COUNT and not field:
+            raise ValueError(f"{func} needs a field, e.g. {func}:response_time")
+        return cls(func, field or None)
+
+    @property
+    def header(self) -> str:
+        return self.func if self.field is None else f"{self.func}_{self.field}"
+
+
+class GroupBy(Report):
+    """
+    Generic hash aggregate: groups the lines by a tuple of fields and computes count/sum/avg/min/max per group.
+
+    Every group holds one flat `array("d")` of accumulator slots (count first, then a sum, min or max slot per
+    aggregated field), so millions of groups cost a dict entry and a small array each. Aggregated values are
+    converted to float and summed as integer micro-units, so sums and averages do not depend on the order the
+    lines are added in (serial, batched or merged from `--workers`), as long as a sum stays below 2^53 micro-units.
+    Lines with a non-numeric value or an unhashable key are skipped and counted by
+    `invalid_lines`. Groups are ordered by the first aggregation, descending; with `limit`, only the top
+    groups are selected with a heap instead of sorting them all.
+    """
+    def __init__(self, keys: Sequence[str], aggregations: Sequence[str] = (COUNT,), limit: Optional[int] = None, url_normalizer: Optional[Callable[[str], str]] = None) -> None:
+        if not keys:
+            raise ValueError("group-by needs at least one key field")
+
+        self.keys = tuple(keys)
+        self.aggregations = [Aggregation.parse(spec) for spec in aggregations]
+        self.limit = limit
+        self.url_normalizer = url_normalizer if "url" in self.keys else None
+        self.report: Dict[Any, array] = {}
+        self.invalid = 0
+
+        slots: Dict[Tuple[str, Optional[str]], int] = {(COUNT, None): 0}
+        for aggregation in self.aggregations:
+            for kind in {COUNT: (), SUM: (SUM,), "avg": (SUM,), MIN: (MIN,), MAX: (MAX,)}[aggregation.func]:
+                slots.setdefault((kind, aggregation.field), len(slots))
+        self.slots = slots
+        self.slot_kinds = [kind for kind, _field in slots]
+        self.initial = array("d", [SLOT_INITIAL[kind] for kind in self.slot_kinds])
+
+        # Slot updates grouped by field, so every field is read and converted once per line.
+        updates: Dict[str, List[Tuple[int, str]]] = {}
+        for (kind, field), slot in slots.items():
+            if field is not None:
+                updates.setdefault(field, []).append((slot, kind))
+        self.updates = list(updates.items())
+        self.value_fields = list(updates)
+        self._key_of = itemgetter(*self.keys)
+
+    def _key(self, line: Dict[str, Any]) -> Any:
+        key = self._key_of(line)
+        if self.url_normalizer is None:
+            return key
+        if len(self.keys) == 1:
+            return self.url_normalizer(key)
+        return tuple(self.url_normalizer(value) if name == "url" else value for name, value in zip(self.keys, key))
+
+    def process_line(self, line: Dict[str, Any]) -> None:
+        try:
+            key = self._key(line)
+            accumulator = self.report.get(key)
+            values = [float(line[field]) for field in self.value_fields]
+        except (TypeError, ValueError):
+            self.invalid += 1
+            return
+        if not all(map(isfinite, values)):
+            self.invalid += 1
+            return
+
+        if accumulator is None:
+            accumulator = self.report[key] = array("d", self.initial)
+
+        accumulator[0] += 1
+        for value, (_field, slots) in zip(values, self.updates):
+            for slot, kind in slots:
+                if kind == SUM:
+                    accumulator[slot] += round(value * MICROSECONDS)
+                elif kind == MIN:
+                    if value < accumulator[slot]:
+                        accumulator[slot] = value
+                elif value > accumulator[slot]:
+                    accumulator[slot] = value
+
+    def process_batch(self, batch: ColumnBatch) -> None:
+        """
+        Combines the factorized key columns into group codes and aggregates them with numpy.
+
+        A batch with an unhashable key value is processed line by line instead, so only those lines are skipped.
+        """
+        try:
+            codes, keys = self._group_codes(batch)
+        except TypeError:
+            for line in batch.lines:
+                self.process_line(line)
+            return
+
+        values, valid = {}, np.ones(len(codes), dtype=bool)
+        for field in self.value_fields:
+            values[field], field_valid = float_column(batch, field)
+            valid &= field_valid & np.isfinite(values[field])
+        if not valid.all():
+            self.invalid += len(valid) - int(valid.sum())
+            codes = codes[valid]
+            values = {field: column[valid] for field, column in values.items()}
+
+        size = len(keys)
+        columns = [np.bincount(codes, minlength=size).astype(np.float64)]
+        for (kind, field) in list(self.slots)[1:]:
+            if kind == SUM:
+                columns.append(np.bincount(codes, weights=np.rint(values[field] * MICROSECONDS), minlength=size))
+            else:
+                column = np.full(size, SLOT_INITIAL[kind])
+                (np.minimum if kind == MIN else np.maximum).at(column, codes, values[field])
+                columns.append(column)
+
+        for key, row in zip(keys, np.column_stack(columns).tolist()):
+            if not row[0]:
+                continue
+            accumulator = self.report.get(key)
+            if accumulator is None:
+                self.report[key] = array("d", row)
+            else:
+                self._merge_slots(accumulator, row)
+
+    def _group_codes(self, batch: ColumnBatch) -> Tuple["np.ndarray", List[Any]]:
+        """Returns the group code of every line of the batch and the group keys; raises TypeError on unhashable keys."""
+        codes, uniques = batch.factorize(self.keys[0])
+        if self.url_normalizer is not None and self.keys[0] == "url":
+            codes, uniques = remap_codes(codes, uniques, self.url_normalizer)
+        key_columns = [uniques]
+
+        for name in self.keys[1:]:
+            other_codes, other_uniques = batch.factorize(name)
+            if self.url_normalizer is not None and name == "url":
+                other_codes, other_uniques = remap_codes(other_codes, other_uniques, self.url_normalizer)
+            # Mixed radix codes, compacted right away so they stay far below the int64 range.
+            combined, codes = np.unique(codes * len(other_uniques) + other_codes, return_inverse=True)
+            previous = len(other_uniques)
+            key_columns = [[column[code // previous] for code in combined.tolist()] for column in key_columns]
+            key_columns.append([other_uniques[code % previous] for code in combined.tolist()])
+
+        keys: List[Any] = key_columns[0] if len(key_columns) == 1 else list(zip(*key_columns))
+        return codes, keys
+
+    def _merge_slots(self, accumulator: array, other: Iterable[float]) -> None:
+        for slot, (kind, value) in enumerate(zip(self.slot_kinds, other)):
+            if kind == MIN:
+                if value < accumulator[slot]:
+                    accumulator[slot] = value
+            elif kind == MAX:
+                if value > accumulator[slot]:
+                    accumulator[slot] = value
+            else:
+                accumulator[slot] += value
+
+    def merge(self, other: "GroupBy") -> None:
+        self.invalid += other.invalid
+        for key, other_accumulator in other.report.items():
+            accumulator = self.report.get(key)
+            if accumulator is None:
+                self.report[key] = array("d", other_accumulator)
+            else:
+                self._merge_slots(accumulator, other_accumulator)
+
+    def _value(self, aggregation: Aggregation, accumulator: array) -> Any:
+        count = accumulator[0]
+        if aggregation.func == COUNT:
+            return int(count)
+        if aggregation.func == "avg":
+            return round(accumulator[self.slots[(SUM, aggregation.field)]] / MICROSECONDS / count, 6) if count else 0.0
+        if aggregation.func == SUM:
+            return round(accumulator[self.slots[(SUM, aggregation.field)]] / MICROSECONDS, 6)
+        return round(accumulator[self.slots[(aggregation.func, aggregation.field)]], 6)
+
+    def _row(self, key: Any, accumulator: array) -> List[Any]:
+        key_values = list(key) if len(self.keys) > 1 else [key]
+        return key_values + [self._value(aggregation, accumulator) for aggregation in self.aggregations]
+
+    def generate_table(self) -> List[List[Any]]:
+        return list(self.iter_table())
+
+    def iter_table(self, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        first = self.aggregations[0] if self.aggregations else Aggregation(COUNT)
+        order = lambda item: self._value(first, item[1])
+
+        if limit is None or self.limit is not None and self.limit < limit:
+            limit = self.limit
+        groups = ranked(self.report.items(), key=order, limit=limit)
+        return (self._row(key, accumulator) for key, accumulator in groups)
+
+    def get_headers(self) -> List[str]:
+        return list(self.keys) + [aggregation.header for aggregation in self.aggregations]
+
+    def invalid_lines(self) -> int:
+        return self.invalid
+
+    def get_required_fields(self) -> List[str]:
+        return list(self.keys) + [field for field in self.value_fields if field not in self.keys]
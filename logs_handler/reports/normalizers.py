@@ -0,0 +1,38 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+import re
+import sys
+from typing import Callable
+
+# Path segments that are identifiers rather than routes: numbers, UUIDs and long hex strings.
+ID_SEGMENT = re.compile(
+    r"(?<=/)(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})(?=/|$|\?)"
+)
+# Raw urls remembered by a normalizer, so repeated urls cost a dict lookup and share one interned string.
+CACHE_SIZE = 65536
+
+
+@dataclass(frozen=True)
+class UrlNormalizer:
+    """
+    Url normalisation hook: collapses numeric, UUID and long hex path segments into a placeholder,
+    so "/api/users/42/orders" and "/api/users/43/orders" are aggregated as "/api/users/{id}/orders".
+    """
+    placeholder: str = "{id}"
+    _normalize: Callable[[str], str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_normalize", lru_cache(maxsize=CACHE_SIZE)(self._normalize_uncached))
+
+    def _normalize_uncached(self, url: str) -> str:
+        return sys.intern(ID_SEGMENT.sub(self.placeholder, url))
+
+    def __call__(self, url: str) -> str:
+        return self._normalize(url)
+
+    def __getstate__(self) -> dict:
+        return {"placeholder": self.placeholder}
+
+    def __setstate__(self, state: dict) -> None:
+        object.__setattr__(self, "placeholder", state["placeholder"])
+        self.__post_init__()
@@ -0,0 +1,91 @@
+from functools import partial
+from math import isfinite
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .base import Report, ranked
+from .sketches import LogHistogram, SpaceSaving, TOP_CAPACITY_FACTOR
+
+
+class Percentiles(Report):
+    """
+    Latency percentiles per handler.
+
+    Response times are kept in fixed-memory `LogHistogram` sketches, not as lists, so the percentiles
+    are estimated with a relative error of at most `ALPHA`. Min and max are exact.
+    With `top_k`, only the top handlers are tracked, see `AvgResponseTime`. Lines whose response time is
+    not a finite number are skipped and counted by `invalid_lines`.
+    """
+    HEADERS = ["handler", "total", "min", "p50", "p90", "p99", "p99.9", "max"]
+    TOP_HEADERS = HEADERS + ["count_error"]
+    REQUIRED_FIELDS = ["url", "response_time"]
+    QUANTILES = [0.5, 0.9, 0.99, 0.999]
+    ALPHA = 0.01
+
+    def __init__(self, top_k: Optional[int] = None, url_normalizer: Optional[Callable[[str], str]] = None) -> None:
+        self.report: Dict[str, LogHistogram] = {}
+        self.top_k = top_k
+        self.url_normalizer = url_normalizer
+        self.heavy_hitters = SpaceSaving(top_k * TOP_CAPACITY_FACTOR, partial(LogHistogram, self.ALPHA)) if top_k is not None else None
+        self.invalid = 0
+
+    def invalid_lines(self) -> int:
+        return self.invalid
+
+    def process_line(self, line: Dict[str, Any]) -> None:
+        url = line["url"]
+        try:
+            response_time = float(line["response_time"])
+        except (TypeError, ValueError):
+            response_time = None
+        if response_time is None or not isfinite(response_time):
+            self.invalid += 1
+            return
+
+        if self.url_normalizer is not None:
+            url = self.url_normalizer(url)
+
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.increment(url).add(response_time)
+            return
+
+        sketch = self.report.get(url)
+        if sketch is None:
+            sketch = self.report[url] = LogHistogram(self.ALPHA)
+        sketch.add(response_time)
+
+    def merge(self, other: "Percentiles") -> None:
+        self.invalid += other.invalid
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.merge(other.heavy_hitters, LogHistogram.merge)
+            return
+
+        for url, other_sketch in other.report.items():
+            sketch = self.report.get(url)
+            if sketch is None:
+                sketch = self.report[url] = LogHistogram(self.ALPHA)
+            sketch.merge(other_sketch)
+
+    @classmethod
+    def _row(cls, url: str, total: int, sketch: LogHistogram) -> List[Any]:
+        return (
+            [url, total, round(sketch.min, 6)]
+            + [round(sketch.quantile(q), 6) for q in cls.QUANTILES]
+            + [round(sketch.max, 6)]
+        )
+
+    def generate_table(self) -> List[List[Any]]:
+        return list(self.iter_table())
+
+    def iter_table(self, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        if self.heavy_hitters is not None:
+            top = self.heavy_hitters.top(self.top_k if limit is None else min(self.top_k, limit))
+            return (self._row(url, count, sketch) + [error] for url, count, error, sketch in top)
+
+        sorted_report = ranked(self.report.items(), key=lambda item: item[1].count, limit=limit)
+        return (self._row(url, sketch.count, sketch) for url, sketch in sorted_report)
+
+    def get_headers(self) -> List[str]:
+        return self.TOP_HEADERS if self.heavy_hitters is not None else self.HEADERS
+
+    def get_required_fields(self) -> List[str]:
+        return self.REQUIRED_FIELDS
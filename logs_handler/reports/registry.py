@@ -0,0 +1,88 @@
+"""
+Registry of the report types, by the name they are requested with on the command line.
+
+Built-in reports are listed by module and class name instead of registering themselves on import,
+so a run imports only the report modules it uses. Other packages add report classes to the command line
+through an entry point of the `logs_handler.reports` group, found without importing them:
+
+    [project.entry-points."logs_handler.reports"]
+    slow-queries = "my_package.reports:SlowQueries"
+
+The `register_report` decorator only registers a class once its module is imported, which the command line never does:
+it is meant for programs that import their reports before using the registry, e.g. before calling `get_report_class`.
+"""
+from functools import cache
+from importlib import import_module
+from typing import TYPE_CHECKING, Callable, Dict, List, Type, TypeVar
+
+from .base import Report
+
+if TYPE_CHECKING:
+    from importlib.metadata import EntryPoint
+
+ENTRY_POINT_GROUP = "logs_handler.reports"
+
+BUILTIN_REPORTS: Dict[str, str] = {
+    "average": "logs_handler.reports.average_response_time:AvgResponseTime",
+    "user-agent": "logs_handler.reports.user_agent:UserAgent",
+    "percentiles": "logs_handler.reports.percentiles:Percentiles",
+    "timeseries": "logs_handler.reports.timeseries:TimeSeries",
+    "groupby": "logs_handler.reports.groupby:GroupBy"
+}
+# Compact variants of the built-in reports, picked by `--compact`.
+COMPACT_REPORTS: Dict[str, str] = {
+    "average": "logs_handler.reports.average_response_time:CompactAvgResponseTime"
+}
+
+_registered: Dict[str, Type[Report]] = {}
+
+T = TypeVar("T", bound=Type[Report])
+
+
+def register_report(name: str) -> Callable[[T], T]:
+    """Class decorator that makes the report class available under the given name, once its module is imported."""
+    def decorator(report_class: T) -> T:
+        if name in BUILTIN_REPORTS or _registered.get(name, report_class) is not report_class:
+            raise ValueError(f"report <{name}> is already registered")
+        _registered[name] = report_class
+        return report_class
+    return decorator
+
+
+@cache
+def _entry_points() -> Dict[str, "EntryPoint"]:
+    # Scanning the installed distributions is only needed once a name is not built-in.
+    from importlib.metadata import entry_points
+    return {entry_point.name: entry_point for entry_point in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def _load(target: str) -> Type[Report]:
+    module, _, name = target.partition(":")
+    return getattr(import_module(module), name)
+
+
+def report_names() -> List[str]:
+    """Returns the names of all the available reports: built-in, registered, then from entry points."""
+    names = list(BUILTIN_REPORTS) + list(_registered)
+    return names + [name for name in _entry_points() if name not in names]
+
+
+def is_report(name: str) -> bool:
+    """Returns whether a report is available under the name, importing none of them."""
+    return name in BUILTIN_REPORTS or name in _registered or name in _entry_points()
+
+
+def get_report_class(name: str, compact: bool = False) -> Type[Report]:
+    """
+    Returns the report class of the name, importing its module on first use.
+    With `compact`, the compact variant of the report when it has one. Raises ValueError for unknown names.
+    """
+    if compact and name in COMPACT_REPORTS:
+        return _load(COMPACT_REPORTS[name])
+    if name in BUILTIN_REPORTS:
+        return _load(BUILTIN_REPORTS[name])
+    if name in _registered:
+        return _registered[name]
+    if name in _entry_points():
+        return _entry_points()[name].load()
+    raise ValueError(f"unknown report <{name}>, expected one of: {', '.join(report_names())}")
@@ -0,0 +1,201 @@
+from array import array
+import heapq
+import math
+import sys
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Positions in a `SpaceSaving` entry.
+COUNT, ERROR, SERIAL, PAYLOAD = range(4)
+# Keys monitored per requested top key: a larger summary keeps the top more accurate.
+TOP_CAPACITY_FACTOR = 4
+
+
+class LogHistogram:
+    """
+    Fixed-memory, mergeable quantile sketch with log-spaced buckets (the DDSketch scheme).
+
+    A positive value x falls into bucket ceil(log(x) / log(gamma)), gamma = (1 + alpha) / (1 - alpha),
+    so any quantile is estimated with a relative error of at most `alpha` (1% by default).
+    Zeros are counted apart, min, max and count are exact.
+
+    Counts are stored densely between the lowest and the highest bucket, 8 bytes each. When there are more than
+    `max_buckets` of them (a value range wider than ~10^17 at 1% accuracy), the lowest buckets are collapsed,
+    which only degrades the accuracy of the lowest quantiles. Merging sketches with the same alpha is lossless.
+    """
+    __slots__ = ("alpha", "gamma_log", "max_buckets", "offset", "counts", "zero_count", "count", "min", "max")
+
+    def __init__(self, alpha: float = 0.01, max_buckets: int = 2048) -> None:
+        self.alpha = alpha
+        self.gamma_log = math.log((1 + alpha) / (1 - alpha))
+        self.max_buckets = max_buckets
+        self.offset = 0
+        self.counts = array("q")
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _add_to_bucket(self, index: int, count: int) -> None:
+        if not self.counts:
+            self.offset = index
+            self.counts.append(0)
+        elif index < self.offset:
+            self.counts[0:0] = array("q", bytes(8 * (self.offset - index)))
+            self.offset = index
+        elif index >= self.offset + len(self.counts):
+            self.counts.extend(array("q", bytes(8 * (index - self.offset - len(self.counts) + 1))))
+
+        self.counts[index - self.offset] += count
+
+        if len(self.counts) > self.max_buckets:
+            collapsed = len(self.counts) - self.max_buckets + 1
+            total = sum(self.counts[:collapsed])
+            del self.counts[:collapsed - 1]
+            self.counts[0] = total
+            self.offset += collapsed - 1
+
+    def add(self, value: float) -> None:
+        """Adds a single non-negative value."""
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value <= 0:
+            self.zero_count += 1
+            return
+        self._add_to_bucket(math.ceil(math.log(value) / self.gamma_log), 1)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Adds the values of another sketch with the same accuracy."""
+        if other.alpha != self.alpha:
+            raise ValueError(f"Cannot merge sketches with different accuracy: {self.alpha} and {other.alpha}")
+
+        for position, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self._add_to_bucket(other.offset + position, bucket_count)
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the estimated q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+
+        seen = self.zero_count
+        for position, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen > rank:
+                estimate = 2 * math.exp((self.offset + position) * self.gamma_log) / (1 + math.exp(self.gamma_log))
+                return min(max(estimate, self.min), self.max)
+
+        return self.max
+
+
+class SpaceSaving:
+    """
+    Bounded-memory heavy hitters (the Space-Saving algorithm).
+
+    At most `capacity` keys are monitored. A new key evicts the one with the smallest count and inherits
+    that count as its possible overestimation (`error`), so for every key `count - error <= true count <= count`,
+    and every key with a true count above total / capacity is guaranteed to be monitored.
+    Each key may carry a payload (e.g. an aggregate), built by `payload_factory` when the key starts being monitored.
+    """
+    def __init__(self, capacity: int, payload_factory: Optional[Callable[[], Any]] = None) -> None:
+        self.capacity = capacity
+        self.payload_factory = payload_factory
+        self.entries: Dict[str, List[Any]] = {}
+        # Lazy min-heap of (count, serial, key); entries with an outdated serial or count are skipped or refreshed.
+        self.heap: List[Tuple[int, int, str]] = []
+        self.serial = 0
+        self.total = 0
+
+    def _evict_min(self) -> int:
+        """Stops monitoring the key with the smallest count, returns that count."""
+        while True:
+            count, serial, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+
+            if entry is None or entry[SERIAL] != serial:
+                continue
+            if entry[COUNT] != count:
+                heapq.heappush(self.heap, (entry[COUNT], serial, key))
+                continue
+
+            del self.entries[key]
+            return count
+
+    def _insert(self, key: str, count: int, error: int, payload: Any) -> List[Any]:
+        self.serial += 1
+        key = sys.intern(key)
+        entry = self.entries[key] = [count, error, self.serial, payload]
+        heapq.heappush(self.heap, (count, self.serial, key))
+        return entry
+
+    def increment(self, key: str, count: int = 1) -> Any:
+        """Counts the key, returns its payload."""
+        self.total += count
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            entry[COUNT] += count
+            return entry[PAYLOAD]
+
+        payload = self.payload_factory() if self.payload_factory is not None else None
+        min_count = self._evict_min() if len(self.entries) >= self.capacity else 0
+        self._insert(key, min_count + count, min_count, payload)
+        return payload
+
+    def min_count(self) -> int:
+        """Returns the bound on the count of any key that is not monitored."""
+        if len(self.entries) < self.capacity:
+            return 0
+        return min(entry[COUNT] for entry in self.entries.values())
+
+    def items(self) -> Iterator[Tuple[str, int, int, Any]]:
+        """Yields (key, count, error, payload) of the monitored keys."""
+        for key, (count, error, _serial, payload) in self.entries.items():
+            yield key, count, error, payload
+
+    def top(self, k: int) -> List[Tuple[str, int, int, Any]]:
+        """Returns the k keys with the highest counts, highest first."""
+        return heapq.nlargest(k, self.items(), key=lambda item: item[1])
+
+    def merge(self, other: "SpaceSaving", merge_payload: Optional[Callable[[Any, Any], None]] = None) -> None:
+        """
+        Merges another summary (mergeable summaries, Agarwal et al.).
+
+        A key missing from one of the summaries may still have up to its min count there, which is added to both
+        its count and its error. The union is then cut back to the `capacity` keys with the highest counts.
+        """
+        self_min, other_min = self.min_count(), other.min_count()
+        merged: Dict[str, List[Any]] = {}
+
+        for key, (count, error, _serial, payload) in self.entries.items():
+            merged[key] = [count + other_min, error + other_min, 0, payload]
+
+        for key, (count, error, _serial, payload) in other.entries.items():
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [count + self_min, error + self_min, 0, payload]
+                continue
+
+            entry[COUNT] += count - other_min
+            entry[ERROR] += error - other_min
+            if merge_payload is not None:
+                merge_payload(entry[PAYLOAD], payload)
+
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][COUNT])
+        self.entries = {}
+        self.heap = []
+        self.total += other.total
+        for key, (count, error, _serial, payload) in kept:
+            self._insert(key, count, error, payload)
@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from logs_handler.utils.columns import ColumnBatch, float_column, remap_codes, np
+from logs_handler.utils.timestamps import BUCKETS, epoch_second
+from .base import Report, ranked
+
+@dataclass
+class BucketData:
+    count: int = 0
+    client_errors: int = 0
+    server_errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Share of the requests answered with a 4xx or 5xx status."""
+        return (self.client_errors + self.server_errors) / self.count if self.count else 0.0
+
+    @property
+    def average(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def merge(self, other: "BucketData") -> None:
+        """Adds the totals of another aggregate."""
+        self.count += other.count
+        self.client_errors += other.client_errors
+        self.server_errors += other.server_errors
+        self.total_time += other.total_time
+        self.max_time = max(self.max_time, other.max_time)
+
+
+class TimeSeries(Report):
+    """
+    Traffic per time bucket (`1s`, `1m` or `1h`, aligned to UTC), optionally split by handler.
+
+    Every bucket reports its request count, 4xx and 5xx counts, error rate and mean/max response time.
+    Timestamps are parsed once per distinct second, see `epoch_second`. Statuses are compared as numbers,
+    so `"404"` counts like `404`; entries with an unparsable timestamp, status or response time are skipped and counted.
+    """
+    HEADERS = ["bucket", "count", "4xx", "5xx", "error_rate", "avg_response_time", "max_response_time"]
+    HANDLER_HEADERS = HEADERS[:1] + ["handler"] + HEADERS[1:]
+    REQUIRED_FIELDS = ["@timestamp", "status", "response_time"]
+
+    def __init__(self, bucket: str = "1m", by_handler: bool = False, url_normalizer: Optional[Callable[[str], str]] = None) -> None:
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket <{bucket}>, expected one of: {', '.join(BUCKETS)}")
+
+        self.report: Dict[Any, BucketData] = {}
+        self.bucket = bucket
+        self.width = BUCKETS[bucket]
+        self.by_handler = by_handler
+        self.url_normalizer = url_normalizer
+        self.invalid = 0
+        self._last_timestamp: Optional[str] = None
+        self._last_bucket = 0
+
+    def _bucket_of(self, timestamp: str) -> int:
+        second = epoch_second(timestamp)
+        return second - second % self.width
+
+    def _valid_bucket_of(self, timestamp: Any) -> Optional[int]:
+        try:
+            return self._bucket_of(timestamp)
+        except (TypeError, ValueError):
+            return None
+
+    def invalid_lines(self) -> int:
+        return self.invalid
+
+    def process_line(self, line: Dict[str, Any]) -> None:
+        try:
+            timestamp = line["@timestamp"]
+            # Consecutive lines mostly share their second, skip even the cache lookup then.
+            if timestamp != self._last_timestamp:
+                self._last_bucket = self._bucket_of(timestamp)
+                self._last_timestamp = timestamp
+            status = float(line["status"])
+            response_time = float(line["response_time"])
+        except (TypeError, ValueError):
+            self.invalid += 1
+            return
+        key: Any = self._last_bucket
+
+        if self.by_handler:
+            url = line["url"]
+            key = (key, self.url_normalizer(url) if self.url_normalizer is not None else url)
+
+        data = self.report.get(key)
+        if data is None:
+            data = self.report[key] = BucketData()
+
+        data.count += 1
+        if 400 <= status < 500:
+            data.client_errors += 1
+        elif status >= 500:
+            data.server_errors += 1
+        data.total_time += response_time
+        if response_time > data.max_time:
+            data.max_time = response_time
+
+    def process_batch(self, batch: ColumnBatch) -> None:
+        """Maps the distinct timestamps of the batch onto buckets and aggregates the keys with `np.bincount`."""
+        codes, timestamps = batch.factorize("@timestamp")
+        codes, buckets = remap_codes(codes, timestamps, self._valid_bucket_of)
+        statuses, valid = float_column(batch, "status")
+        response_times, valid_times = float_column(batch, "response_time")
+        valid &= valid_times
+        if None in buckets:
+            valid &= codes != buckets.index(None)
+        keys: List[Any] = buckets
+
+        if self.by_handler:
+            url_codes, urls = batch.factorize("url")
+            if self.url_normalizer is not None:
+                url_codes, urls = remap_codes(url_codes, urls, self.url_normalizer)
+            combined, codes = np.unique(codes * len(urls) + url_codes, return_inverse=True)
+            keys = [(buckets[key // len(urls)], urls[key % len(urls)]) for key in combined.tolist()]
+
+        if not valid.all():
+            self.invalid += len(valid) - int(valid.sum())
+            codes, statuses, response_times = codes[valid], statuses[valid], response_times[valid]
+
+        size = len(keys)
+        counts = np.bincount(codes, minlength=size).tolist()
+        client_errors = np.bincount(codes, weights=(statuses >= 400) & (statuses < 500), minlength=size).tolist()
+        server_errors = np.bincount(codes, weights=statuses >= 500, minlength=size).tolist()
+        totals = np.bincount(codes, weights=response_times, minlength=size).tolist()
+        maxes = np.zeros(size)
+        np.maximum.at(maxes, codes, response_times)
+
+        for key, count, client, server, total, max_time in zip(keys, counts, client_errors, server_errors, totals, maxes.tolist()):
+            if not count:
+                continue
+            data = self.report.get(key)
+            if data is None:
+                data = self.report[key] = BucketData()
+            data.merge(BucketData(count, int(client), int(server), total, max_time))
+
+    def merge(self, other: "TimeSeries") -> None:
+        self.invalid += other.invalid
+        for key, other_data in other.report.items():
+            data = self.report.get(key)
+            if data is None:
+                data = self.report[key] = BucketData()
+            data.merge(other_data)
+
+    def _label(self, bucket: int) -> str:
+        return datetime.fromtimestamp(bucket, timezone.utc).isoformat()
+
+    @staticmethod
+    def _values(data: BucketData) -> List[Any]:
+        return [data.count, data.client_errors, data.server_errors, round(data.error_rate, 4), round(data.average, 6), round(data.max_time, 6)]
+
+    def generate_table(self) -> List[List[Any]]:
+        return list(self.iter_table())
+
+    def iter_table(self, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        """Yields the buckets chronologically, with `limit` only the earliest ones."""
+        if not self.by_handler:
+            buckets = ranked(self.report.items(), key=itemgetter(0), limit=limit, descending=False)
+            return ([self._label(bucket)] + self._values(data) for bucket, data in buckets)
+
+        # Chronological, the busiest handlers first within a bucket.
+        def order(item: Tuple[Tuple[int, str], BucketData]) -> Tuple[int, int, str]:
+            (bucket, url), data = item
+            return bucket, -data.count, url
+
+        buckets = ranked(self.report.items(), key=order, limit=limit, descending=False)
+        return ([self._label(bucket), url] + self._values(data) for (bucket, url), data in buckets)
+
+    def get_headers(self) -> List[str]:
+        return self.HANDLER_HEADERS if self.by_handler else self.HEADERS
+
+    def get_required_fields(self) -> List[str]:
+        return self.REQUIRED_FIELDS + ["url"] if self.by_handler else self.REQUIRED_FIELDS
@@ -1,24 +1,60 @@
-from typing import Any, Dict, List
-from .base import Report
+from typing import Any, Dict, Iterator, List, Optional
+from logs_handler.utils.columns import ColumnBatch, np
+from .base import Report, ranked
+from .sketches import SpaceSaving, TOP_CAPACITY_FACTOR
 
 class UserAgent(Report):
+    """Requests per user agent. With `top_k`, only the top agents are counted, in a bounded `SpaceSaving` summary."""
     HEADERS = ["browser", "count"]
+    TOP_HEADERS = HEADERS + ["count_error"]
     REQUIRED_FIELDS = ["http_user_agent"]
 
-    def __init__(self) -> None:
+    def __init__(self, top_k: Optional[int] = None) -> None:
         self.report: Dict[str, int] = {}
+        self.top_k = top_k
+        self.heavy_hitters = SpaceSaving(top_k * TOP_CAPACITY_FACTOR) if top_k is not None else None
 
     def process_line(self, line: Dict[str, Any]) -> None:
         user_agent = line["http_user_agent"]
 
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.increment(user_agent)
+            return
+
         self.report[user_agent] = self.report.get(user_agent, 0) + 1
 
+    def process_batch(self, batch: ColumnBatch) -> None:
+        """Counts the user agents of the batch with `np.bincount`."""
+        codes, user_agents = batch.factorize("http_user_agent")
+        counts = np.bincount(codes, minlength=len(user_agents)).tolist()
+
+        for user_agent, count in zip(user_agents, counts):
+            if self.heavy_hitters is not None:
+                self.heavy_hitters.increment(user_agent, count)
+            else:
+                self.report[user_agent] = self.report.get(user_agent, 0) + count
+
+    def merge(self, other: "UserAgent") -> None:
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.merge(other.heavy_hitters)
+            return
+
+        for user_agent, count in other.report.items():
+            self.report[user_agent] = self.report.get(user_agent, 0) + count
+
     def generate_table(self) -> List[List[Any]]:
-        sorted_report = sorted(self.report.items(), key=lambda item: item[1], reverse=True)
-        return [[user_agent, count] for user_agent, count in sorted_report]
+        return list(self.iter_table())
+
+    def iter_table(self, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        if self.heavy_hitters is not None:
+            top = self.heavy_hitters.top(self.top_k if limit is None else min(self.top_k, limit))
+            return ([user_agent, count, error] for user_agent, count, error, _payload in top)
+
+        sorted_report = ranked(self.report.items(), key=lambda item: item[1], limit=limit)
+        return ([user_agent, count] for user_agent, count in sorted_report)
     
     def get_headers(self) -> List[str]:
-        return self.HEADERS
+        return self.TOP_HEADERS if self.heavy_hitters is not None else self.HEADERS
     
     def get_required_fields(self) -> List[str]:
         return self.REQUIRED_FIELDS
\ No newline at end of file
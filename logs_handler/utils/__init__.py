@@ -1,6 +1,16 @@
-from .utils import load_json, print_table
+from .utils import load_json, print_table, read_json_lines, parse_lines, check_load_stats, LoadStats
+from .decoders import Decoder, make_decoder, available_decoders
+from .diagnostics import Diagnostics
 
 __all__ = [
     "load_json", 
-    "print_table"
+    "print_table",
+    "read_json_lines",
+    "parse_lines",
+    "check_load_stats",
+    "LoadStats",
+    "Decoder",
+    "make_decoder",
+    "available_decoders",
+    "Diagnostics"
 ]
\ No newline at end of file
@@ -0,0 +1,306 @@
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+import json
+import os
+import shutil
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from .columns import ColumnBatch, np
+from .decoders import make_decoder
+from .reader import is_stream, iter_lines
+from .utils import LoadStats, parse_lines
+
+CACHE_SUFFIX = ".cols"
+CACHE_VERSION = 1
+META_FILE = "meta.json"
+# Rows buffered in memory before the columns are appended to their files.
+FLUSH_ROWS = 65536
+
+CATEGORY = "category"
+NUMBER = "number"
+# Code of a missing value in the category columns. Missing numbers are stored as NaN.
+MISSING_CODE = -1
+# Placeholder of a missing value while the log entries are rebuilt.
+MISSING = object()
+
+
+@dataclass
+class ColumnMeta:
+    """
+    A single field of the log entries, stored in `file` as a flat little-endian array.
+
+    Category columns hold int32 codes into `dictionary` (stored next to the data as `<file>.json`),
+    number columns hold float64 values; `integral` ones only ever held integers.
+    """
+    name: str
+    file: str
+    kind: str
+    integral: bool = True
+    missing: int = 0
+
+
+@dataclass
+class CacheMeta:
+    """
+    Columnar cache of a log file, stored next to it as the `<file>.cols` directory.
+
+    The cache is only used while the log file keeps the `size` and `mtime_ns` it was converted at.
+    Every decodable line is a row; fields that are not strings or numbers, or mix both, are not cached.
+    """
+    size: int
+    mtime_ns: int
+    rows: int = 0
+    total_lines: int = 0
+    malformed_json: int = 0
+    columns: List[ColumnMeta] = field(default_factory=list)
+    skipped_fields: List[str] = field(default_factory=list)
+    version: int = CACHE_VERSION
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text: str) -> "CacheMeta":
+        data = json.loads(text)
+        data["columns"] = [ColumnMeta(**column) for column in data["columns"]]
+        return cls(**data)
+
+
+def cache_path(path: str) -> str:
+    """Returns the path of the columnar cache directory of the log file."""
+    return path + CACHE_SUFFIX
+
+
+class _ColumnWriter:
+    """Encodes the values of a single field and appends them to its file in blocks."""
+    def __init__(self, directory: str, number: int, name: str, first_value: Any, rows_before: int) -> None:
+        kind = CATEGORY if type(first_value) is str else NUMBER
+        self.meta = ColumnMeta(name, f"{number}.bin", kind)
+        self.valid = type(first_value) in (str, int, float)
+        self.dictionary: Dict[str, int] = {}
+        self.values: List[Any] = []
+        self.file: BinaryIO = open(os.path.join(directory, self.meta.file), "wb")
+        for _ in range(rows_before):
+            self.append(MISSING)
+        self.append(first_value)
+
+    def append(self, value: Any) -> None:
+        if value is MISSING:
+            self.meta.missing += 1
+            self.values.append(MISSING_CODE if self.meta.kind == CATEGORY else float("nan"))
+            return
+
+        value_type = type(value)
+        if self.meta.kind == CATEGORY and value_type is str:
+            self.values.append(self.dictionary.setdefault(value, len(self.dictionary)))
+        elif self.meta.kind == NUMBER and value_type in (int, float):
+            self.meta.integral = self.meta.integral and value_type is int
+            self.values.append(value)
+        else:
+            self.valid = False
+
+    def flush(self) -> None:
+        if self.valid and self.values:
+            dtype = "<i4" if self.meta.kind == CATEGORY else "<f8"
+            self.file.write(np.array(self.values, dtype=dtype).tobytes())
+        self.values.clear()
+
+    def close(self, directory: str) -> None:
+        self.flush()
+        self.file.close()
+
+        if not self.valid:
+            os.remove(os.path.join(directory, self.meta.file))
+        elif self.meta.kind == CATEGORY:
+            with open(os.path.join(directory, self.meta.file + ".json"), "w") as file:
+                json.dump(list(self.dictionary), file)
+
+
+def convert(path: str) -> CacheMeta:
+    """
+    Converts the log file into its columnar cache, replacing an existing one.
+
+    Lines are decoded once with floats as float; the rows keep the file order. Requires numpy.
+    """
+    if np is None:
+        raise ValueError("Converting logs to the columnar cache requires numpy to be installed.")
+    if is_stream(path):
+        raise ValueError("Only files can be converted, not the standard input or pipes.")
+
+    stat = os.stat(path)
+    meta = CacheMeta(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    stats = LoadStats()
+    directory = cache_path(path)
+    temp_directory = directory + ".tmp"
+    shutil.rmtree(temp_directory, ignore_errors=True)
+    os.makedirs(temp_directory)
+
+    writers: Dict[str, _ColumnWriter] = {}
+    decoder = make_decoder("auto", exact_decimals=False)
+
+    for data in parse_lines(iter_lines(path), path, [], stats, decoder=decoder):
+        if type(data) is not dict:
+            stats.malformed_json += 1
+            continue
+
+        for name, value in data.items():
+            if name not in writers:
+                writers[name] = _ColumnWriter(temp_directory, len(writers), name, value, meta.rows)
+            else:
+                writers[name].append(value)
+
+        if len(data) < len(writers):
+            for name, writer in writers.items():
+                if name not in data:
+                    writer.append(MISSING)
+
+        meta.rows += 1
+        if meta.rows % FLUSH_ROWS == 0:
+            for writer in writers.values():
+                writer.flush()
+
+    for writer in writers.values():
+        writer.close(temp_directory)
+
+    meta.total_lines = stats.total_lines
+    meta.malformed_json = stats.malformed_json
+    meta.columns = [writer.meta for writer in writers.values() if writer.valid]
+    meta.skipped_fields = [name for name, writer in writers.items() if not writer.valid]
+
+    with open(os.path.join(temp_directory, META_FILE), "w") as file:
+        file.write(meta.to_json())
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temp_directory, directory)
+    return meta
+
+
+class CachedColumn:
+    """A column of the cache, memory-mapped read-only."""
+    def __init__(self, directory: str, meta: ColumnMeta, rows: int) -> None:
+        self.meta = meta
+        dtype = np.dtype("<i4" if meta.kind == CATEGORY else "<f8")
+        file_path = os.path.join(directory, meta.file)
+        self.data = np.memmap(file_path, dtype=dtype, mode="r", shape=(rows,)) if rows else np.empty(0, dtype=dtype)
+        self.dictionary: List[str] = []
+
+        if meta.kind == CATEGORY:
+            with open(file_path + ".json", "r") as file:
+                self.dictionary = json.load(file)
+
+    def present(self) -> "np.ndarray":
+        """Returns the mask of the rows that have the field."""
+        if self.meta.kind == CATEGORY:
+            return self.data != MISSING_CODE
+        return ~np.isnan(self.data)
+
+    def values(self, rows: "np.ndarray", exact_decimals: bool = False) -> List[Any]:
+        """Returns the values of the rows as decoded from json, `MISSING` where the field is absent."""
+        if self.meta.kind == CATEGORY:
+            codes = self.data[rows].tolist()
+            if not self.meta.missing:
+                return list(map(self.dictionary.__getitem__, codes))
+            return [self.dictionary[code] if code != MISSING_CODE else MISSING for code in codes]
+
+        values = self.data[rows].tolist()
+        if self.meta.integral:
+            convert_value = int
+        elif exact_decimals:
+            convert_value = lambda value: Decimal(repr(value))
+        else:
+            return [value if value == value else MISSING for value in values] if self.meta.missing else values
+
+        if not self.meta.missing:
+            return list(map(convert_value, values))
+        return [convert_value(value) if value == value else MISSING for value in values]
+
+
+class ColumnCache:
+    """Reader of a fresh columnar cache. Columns are mapped from disk only when they are loaded."""
+    def __init__(self, path: str, meta: CacheMeta) -> None:
+        self.path = path
+        self.meta = meta
+        self.columns = {column.name: column for column in meta.columns}
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    def has_fields(self, fields: Optional[List[str]]) -> bool:
+        """Returns whether all the fields are cached. None stands for all the fields of the log entries."""
+        if fields is None:
+            return not self.meta.skipped_fields
+        return all(field in self.columns for field in fields)
+
+    def load(self, field: str) -> CachedColumn:
+        return CachedColumn(cache_path(self.path), self.columns[field], self.meta.rows)
+
+
+def load_cache(path: str) -> Optional[ColumnCache]:
+    """Returns the columnar cache of the file if there is one matching its current size and mtime, None otherwise."""
+    if np is None or is_stream(path):
+        return None
+
+    try:
+        with open(os.path.join(cache_path(path), META_FILE), "r") as file:
+            meta = CacheMeta.from_json(file.read())
+        stat = os.stat(path)
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+    if meta.version != CACHE_VERSION or (meta.size, meta.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+        return None
+    return ColumnCache(path, meta)
+
+
+class CachedBatch(ColumnBatch):
+    """
+    A batch of cache rows. Reports aggregating columns read them straight from the mapped arrays;
+    the log entries are only rebuilt when a report or the filter needs them.
+    """
+    def __init__(self, columns: Dict[str, CachedColumn], rows: "np.ndarray", exact_decimals: bool = False) -> None:
+        self.columns = columns
+        self.rows = rows
+        self.exact_decimals = exact_decimals
+        self._lines: Optional[List[Dict[str, Any]]] = None
+        self._factorized = {}
+        self._floats = {}
+
+    @property
+    def lines(self) -> List[Dict[str, Any]]:
+        if self._lines is None:
+            self._lines = build_lines(self.columns, self.rows, self.exact_decimals)
+        return self._lines
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def values(self, field: str) -> List[Any]:
+        return self.columns[field].values(self.rows, self.exact_decimals)
+
+    def factorize(self, field: str) -> Any:
+        column = self.columns[field]
+        if field not in self._factorized and column.meta.kind == CATEGORY:
+            codes, first_rows, inverse = np.unique(column.data[self.rows], return_index=True, return_inverse=True)
+            # Distinct values in order of first appearance in the batch, like a parsed batch, so tied rows keep the same order.
+            order = np.argsort(first_rows, kind="stable")
+            positions = np.empty(len(order), dtype=np.intp)
+            positions[order] = np.arange(len(order))
+            self._factorized[field] = (positions[inverse], [column.dictionary[code] for code in codes[order].tolist()])
+        return super().factorize(field)
+
+    def floats(self, field: str) -> "np.ndarray":
+        column = self.columns[field]
+        if field not in self._floats and column.meta.kind == NUMBER:
+            self._floats[field] = np.asarray(column.data[self.rows], dtype=np.float64)
+        return super().floats(field)
+
+
+def build_lines(columns: Dict[str, CachedColumn], rows: "np.ndarray", exact_decimals: bool = False) -> List[Dict[str, Any]]:
+    """Rebuilds the log entries of the rows, limited to the given columns."""
+    names = list(columns)
+    values = zip(*(column.values(rows, exact_decimals) for column in columns.values()))
+
+    if not any(column.meta.missing for column in columns.values()):
+        return [dict(zip(names, row)) for row in values]
+    return [{name: value for name, value in zip(names, row) if value is not MISSING} for row in values]
@@ -0,0 +1,89 @@
+from functools import cache
+import importlib
+import importlib.util
+from operator import itemgetter
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Tuple
+
+
+@cache
+def _import_numpy() -> ModuleType:
+    return importlib.import_module("numpy")
+
+class _LazyNumpy:
+    """Stands for the numpy module, imported on first use: runs that never build columns do not pay for its import."""
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_import_numpy(), name)
+
+# None when numpy is not installed.
+np = _LazyNumpy() if importlib.util.find_spec("numpy") is not None else None
+
+# Lines gathered into a single batch by default.
+BATCH_SIZE = 8192
+
+
+def numpy_available() -> bool:
+    """Returns whether the batch columns can be built."""
+    return np is not None
+
+
+class ColumnBatch:
+    """
+    Decoded log entries of a batch, with numpy columns of their fields built on demand.
+
+    Columns are cached, so several reports grouping by the same field factorize it only once.
+    The entries themselves stay available for the reports that only process lines one by one.
+    """
+    def __init__(self, lines: List[Dict[str, Any]]) -> None:
+        self.lines = lines
+        self._factorized: Dict[str, Tuple["np.ndarray", List[Any]]] = {}
+        self._floats: Dict[str, "np.ndarray"] = {}
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def values(self, field: str) -> List[Any]:
+        """Returns the raw values of the field, in line order."""
+        return list(map(itemgetter(field), self.lines))
+
+    def factorize(self, field: str) -> Tuple["np.ndarray", List[Any]]:
+        """Returns the codes of the field's values and the distinct values, in order of first appearance."""
+        if field not in self._factorized:
+            values = self.values(field)
+            positions = {value: code for code, value in enumerate(dict.fromkeys(values))}
+            codes = np.fromiter(map(positions.__getitem__, values), dtype=np.intp, count=len(values))
+            self._factorized[field] = (codes, list(positions))
+        return self._factorized[field]
+
+    def floats(self, field: str) -> "np.ndarray":
+        """Returns the field's values as a float64 column."""
+        if field not in self._floats:
+            self._floats[field] = np.fromiter(map(float, self.values(field)), dtype=np.float64, count=len(self.lines))
+        return self._floats[field]
+
+
+def remap_codes(codes: "np.ndarray", uniques: List[Any], mapper: Callable[[Any], Any]) -> Tuple["np.ndarray", List[Any]]:
+    """Applies the mapper to the distinct values, merging the codes of the values it maps together."""
+    mapped = [mapper(value) for value in uniques]
+    positions = {value: code for code, value in enumerate(dict.fromkeys(mapped))}
+    lookup = np.fromiter(map(positions.__getitem__, mapped), dtype=np.intp, count=len(mapped))
+    return lookup[codes], list(positions)
+
+
+def float_column(batch: ColumnBatch, field: str) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Returns the field's values as floats and the mask of the values that are numbers, 0.0 standing for the others."""
+    try:
+        values = batch.floats(field)
+        return values, np.ones(len(values), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+
+    floats, valid = [], []
+    for value in batch.values(field):
+        try:
+            floats.append(float(value))
+            valid.append(True)
+        except (TypeError, ValueError):
+            floats.append(0.0)
+            valid.append(False)
+    return np.array(floats, dtype=np.float64), np.array(valid, dtype=bool)
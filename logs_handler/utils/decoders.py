@@ -0,0 +1,147 @@
+from abc import ABC, abstractmethod
+from decimal import Decimal
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class Decoder(ABC):
+    """
+    An abstract base class for the json line decoders.
+
+    `fields` limits the decoding to the given keys when the backend is able to skip the rest of the line,
+    None means the whole entry is needed. `exact_decimals` makes float values come out as `Decimal`.
+    """
+    NAME = ""
+    ERRORS: Tuple[Type[Exception], ...] = (json.JSONDecodeError,)
+
+    def __init__(self, fields: Optional[Sequence[str]] = None, exact_decimals: bool = True) -> None:
+        self.fields = list(fields) if fields is not None else None
+        self.exact_decimals = exact_decimals
+
+    @abstractmethod
+    def decode(self, line: bytes) -> Dict[str, Any]:
+        """Decodes a single log line. Raises one of `ERRORS` on malformed input."""
+        pass
+
+
+class JsonDecoder(Decoder):
+    """Standard library decoder, always available."""
+    NAME = "json"
+
+    def __init__(self, fields: Optional[Sequence[str]] = None, exact_decimals: bool = True) -> None:
+        super().__init__(fields, exact_decimals)
+        self.parse_float = Decimal if exact_decimals else float
+
+    def decode(self, line: bytes) -> Dict[str, Any]:
+        return json.loads(line, parse_float=self.parse_float)
+
+
+class OrjsonDecoder(Decoder):
+    """
+    Decoder backed by orjson.
+
+    orjson has no float hook, so exact decimals are restored from the shortest float repr,
+    which gives back the original literal for values with up to 15 significant digits.
+    """
+    NAME = "orjson"
+    ERRORS = (orjson.JSONDecodeError,) if orjson is not None else ()
+
+    def decode(self, line: bytes) -> Dict[str, Any]:
+        data = orjson.loads(line)
+
+        if self.exact_decimals and type(data) is dict:
+            keys = self.fields if self.fields is not None else list(data)
+            for key in keys:
+                value = data.get(key)
+                if type(value) is float:
+                    data[key] = Decimal(repr(value))
+
+        return data
+
+
+class MsgspecDecoder(Decoder):
+    """
+    Decoder backed by msgspec.
+
+    When the fields are known, lines are decoded into a struct limited to them and everything else is skipped
+    without being materialised.
+    """
+    NAME = "msgspec"
+    ERRORS = (msgspec.DecodeError,) if msgspec is not None else ()
+
+    def __init__(self, fields: Optional[Sequence[str]] = None, exact_decimals: bool = True) -> None:
+        super().__init__(fields, exact_decimals)
+        float_hook = Decimal if exact_decimals else None
+
+        if self.fields is None:
+            self.attributes: List[Tuple[str, str]] = []
+            self.decoder = msgspec.json.Decoder(Dict[str, Any], float_hook=float_hook)
+            return
+
+        # Field names like "@timestamp" are not identifiers, so struct attributes are renamed back to them.
+        self.attributes = [(f"field_{i}", field) for i, field in enumerate(self.fields)]
+        struct = msgspec.defstruct(
+            "LogLine",
+            [(attribute, Any, msgspec.UNSET) for attribute, _field in self.attributes],
+            rename=dict(self.attributes)
+        )
+        self.decoder = msgspec.json.Decoder(struct, float_hook=float_hook)
+
+    def decode(self, line: bytes) -> Dict[str, Any]:
+        data = self.decoder.decode(line)
+        if not self.attributes:
+            return data
+
+        unset = msgspec.UNSET
+        return {
+            field: value
+            for attribute, field in self.attributes
+            if (value := getattr(data, attribute)) is not unset
+        }
+
+
+DECODERS: Dict[str, Type[Decoder]] = {
+    JsonDecoder.NAME: JsonDecoder,
+    OrjsonDecoder.NAME: OrjsonDecoder,
+    MsgspecDecoder.NAME: MsgspecDecoder
+}
+
+def available_decoders() -> List[str]:
+    """Returns the names of the decoders whose backends are installed."""
+    available = [JsonDecoder.NAME]
+    if orjson is not None:
+        available.append(OrjsonDecoder.NAME)
+    if msgspec is not None:
+        available.append(MsgspecDecoder.NAME)
+    return available
+
+def make_decoder(backend: str = "auto", fields: Optional[Sequence[str]] = None, exact_decimals: bool = True) -> Decoder:
+    """
+    Builds a decoder for the given backend name.
+
+    "auto" picks msgspec when the fields are known (it skips the rest of the line), then orjson, falling back to the standard library.
+    """
+    available = available_decoders()
+
+    if backend == "auto":
+        if MsgspecDecoder.NAME in available and fields is not None:
+            backend = MsgspecDecoder.NAME
+        elif OrjsonDecoder.NAME in available:
+            backend = OrjsonDecoder.NAME
+        else:
+            backend = JsonDecoder.NAME
+
+    if backend not in available:
+        raise ValueError(f"json decoder <{backend}> is not available. Installed decoders: {available}")
+
+    return DECODERS[backend](fields, exact_decimals)
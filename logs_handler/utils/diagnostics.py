@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+import os
+import shutil
+from typing import Dict, List, Optional
+import uuid
+
+# Offending lines kept, with their line numbers, to be shown in the summary.
+SAMPLE_SIZE = 10
+# Characters of a sampled line shown in the summary.
+SAMPLE_CHARS = 160
+# Rejected lines buffered in memory before they are appended to the quarantine file at once.
+QUARANTINE_BATCH = 4096
+
+MALFORMED_JSON = "malformed json"
+MISSING_FIELDS = "missing fields"
+INVALID_VALUES = "invalid values"
+
+
+@dataclass
+class Sample:
+    """A rejected line kept for the summary."""
+    category: str
+    line_num: int
+    text: str
+    detail: str = ""
+    location: str = ""
+
+
+@dataclass
+class Diagnostics:
+    """
+    Collects the lines of a file rejected while loading it, instead of printing every one of them.
+
+    Rejections are counted by category (and missing fields by field name), the first `sample_size` lines are kept
+    with their line numbers, and with a `quarantine_path` the raw rejected lines are appended to that file in bulk.
+    Diagnostics of chunks processed by workers are merged back in file order, see `for_chunk`.
+    """
+    file_path: str = ""
+    sample_size: int = SAMPLE_SIZE
+    quarantine_path: Optional[str] = None
+    counts: Dict[str, int] = field(default_factory=dict)
+    missing_by_field: Dict[str, int] = field(default_factory=dict)
+    samples: List[Sample] = field(default_factory=list)
+    pending: List[bytes] = field(default_factory=list, repr=False)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def reject(self, category: str, line_num: int, line: bytes, detail: str = "", location: str = "") -> None:
+        """Records a rejected raw line."""
+        self.counts[category] = self.counts.get(category, 0) + 1
+
+        if len(self.samples) < self.sample_size:
+            text = line[:SAMPLE_CHARS].decode(errors="replace")
+            self.samples.append(Sample(category, line_num, text, detail, location))
+
+        if self.quarantine_path is not None:
+            self.pending.append(line)
+            if len(self.pending) >= QUARANTINE_BATCH:
+                self.flush()
+
+    def reject_missing(self, line_num: int, line: bytes, missing: List[str], location: str = "") -> None:
+        """Records a line that lacks some of the required fields."""
+        for name in missing:
+            self.missing_by_field[name] = self.missing_by_field.get(name, 0) + 1
+        self.reject(MISSING_FIELDS, line_num, line, str(missing), location)
+
+    def count(self, category: str, amount: int) -> None:
+        """Records rejections known only by their amount, e.g. from a columnar cache."""
+        if amount:
+            self.counts[category] = self.counts.get(category, 0) + amount
+
+    def flush(self) -> None:
+        """Appends the buffered rejected lines to the quarantine file."""
+        if not self.pending or self.quarantine_path is None:
+            return
+        with open(self.quarantine_path, "ab") as file:
+            file.write(b"\n".join(self.pending) + b"\n")
+        self.pending.clear()
+
+    def for_chunk(self) -> "Diagnostics":
+        """Returns empty diagnostics for a chunk of the file, quarantining into a part file of their own."""
+        part_path = f"{self.quarantine_path}.{uuid.uuid4().hex}.part" if self.quarantine_path is not None else None
+        return Diagnostics(self.file_path, self.sample_size, part_path)
+
+    def merge(self, other: "Diagnostics") -> None:
+        """Adds the diagnostics of the next chunk of the file, moving its quarantined lines into this quarantine file."""
+        for category, amount in other.counts.items():
+            self.count(category, amount)
+        for name, amount in other.missing_by_field.items():
+            self.missing_by_field[name] = self.missing_by_field.get(name, 0) + amount
+        self.samples.extend(other.samples[:max(0, self.sample_size - len(self.samples))])
+
+        other.flush()
+        if other.quarantine_path is None or not os.path.exists(other.quarantine_path):
+            return
+        if self.quarantine_path is not None:
+            self.flush()
+            with open(other.quarantine_path, "rb") as source, open(self.quarantine_path, "ab") as target:
+                shutil.copyfileobj(source, target)
+        os.remove(other.quarantine_path)
+
+    def summary(self) -> str:
+        """Returns a human readable summary."""
+        counts = ", ".join(f"{amount:,} {category}" for category, amount in self.counts.items())
+        lines = [f"--- Rejected lines in: {self.file_path} ---", f"{self.total:,} rejected: {counts}"]
+
+        if self.missing_by_field:
+            lines.append("missing: " + ", ".join(f"{name} {amount:,}" for name, amount in self.missing_by_field.items()))
+        if self.quarantine_path is not None:
+            lines.append(f"quarantined to {self.quarantine_path}")
+        if self.samples:
+            lines.append(f"first {len(self.samples)}:")
+            lines += [
+                f"  line {sample.line_num}{sample.location}: {sample.category}{' ' + sample.detail if sample.detail else ''}: {sample.text}"
+                for sample in self.samples
+            ]
+        return "\n".join(lines)
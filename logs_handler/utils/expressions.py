@@ -0,0 +1,347 @@
+"""
+The `--where` expression language.
+
+    status >= 500 and request_method in ("POST", "PUT")
+    url ~ "^/api/users/" and not http_user_agent ~ "bot"
+    (status == 404 or response_time > 1.5) and request_method != "HEAD"
+
+Comparisons (`==`, `!=`, `<`, `<=`, `>`, `>=`) take a string, number, `true`, `false` or `null` literal.
+Number literals compare the field as a number, so `status == 200` and `response_time > 0.5` work whatever way
+the values were decoded. `in`/`not in` take a parenthesized list of literals, `~`/`!~` a regular expression searched in the value.
+A missing field equals `null` only; ordering comparisons and regexes are false for missing or mistyped values.
+
+An expression is parsed once into a tree of nodes, then compiled into the source of a single lambda,
+so a line is checked without walking the tree. Conjunctions of string equalities, memberships and
+anchored regex prefixes are also compiled into a raw-byte check of the undecoded line.
+"""
+import ast
+from dataclasses import dataclass
+import json
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<operator>==|!=|<=|>=|!~|<|>|~|\(|\)|,)
+      | (?P<name>[A-Za-z_@][\w@.\-]*)
+    )""", re.VERBOSE)
+KEYWORDS = {"and", "or", "not", "in", "true", "false", "null"}
+LITERALS = {"true": True, "false": False, "null": None}
+COMPARISONS = {"==", "!=", "<", "<=", ">", ">="}
+# Characters that make the rest of a regex something else than a literal prefix.
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+NAN = math.nan
+
+
+@dataclass(frozen=True)
+class Compare:
+    field: str
+    operator: str
+    value: Any
+
+@dataclass(frozen=True)
+class Membership:
+    field: str
+    values: Tuple[Any, ...]
+    negated: bool = False
+
+@dataclass(frozen=True)
+class Match:
+    field: str
+    pattern: str
+    negated: bool = False
+
+@dataclass(frozen=True)
+class And:
+    items: Tuple[Any, ...]
+
+@dataclass(frozen=True)
+class Or:
+    items: Tuple[Any, ...]
+
+@dataclass(frozen=True)
+class Not:
+    item: Any
+
+
+def _tokenize(expression: str) -> List[Tuple[str, Any, int]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"unexpected character at position {position}: {expression[position:position + 10]!r}")
+
+        kind = match.lastgroup
+        text = match.group(kind)
+        start = match.start(kind)
+        if kind == "number":
+            tokens.append(("literal", float(text) if any(c in text for c in ".eE") else int(text), start))
+        elif kind == "string":
+            tokens.append(("literal", ast.literal_eval(text), start))
+        elif kind == "name" and text.lower() in KEYWORDS:
+            keyword = text.lower()
+            tokens.append(("literal", LITERALS[keyword], start) if keyword in LITERALS else ("keyword", keyword, start))
+        else:
+            tokens.append((kind, text, start))
+        position = match.end()
+
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser: `or` binds weaker than `and`, which binds weaker than `not`."""
+    def __init__(self, expression: str) -> None:
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def peek(self) -> Tuple[str, Any, int]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return ("end", None, -1)
+
+    def accept(self, kind: str, value: Any = None) -> bool:
+        token_kind, token_value, _ = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Any = None) -> Any:
+        token_kind, token_value, start = self.peek()
+        if not self.accept(kind, value):
+            found = "end of expression" if token_kind == "end" else f"{token_value!r} at position {start}"
+            raise ValueError(f"expected {value or kind}, found {found}")
+        return token_value
+
+    def parse(self) -> Any:
+        node = self.parse_or()
+        self.expect("end")
+        return node
+
+    def parse_or(self) -> Any:
+        items = [self.parse_and()]
+        while self.accept("keyword", "or"):
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else Or(tuple(items))
+
+    def parse_and(self) -> Any:
+        items = [self.parse_not()]
+        while self.accept("keyword", "and"):
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else And(tuple(items))
+
+    def parse_not(self) -> Any:
+        if self.accept("keyword", "not"):
+            return Not(self.parse_not())
+        if self.accept("operator", "("):
+            node = self.parse_or()
+            self.expect("operator", ")")
+            return node
+        return self.parse_clause()
+
+    def parse_clause(self) -> Any:
+        field = self.expect("name")
+        kind, operator, start = self.peek()
+
+        if kind == "operator" and operator in COMPARISONS:
+            self.position += 1
+            value = self.expect("literal")
+            if operator not in ("==", "!=") and (value is None or isinstance(value, bool)):
+                raise ValueError(f"{operator} cannot compare with {json.dumps(value)}")
+            return Compare(field, operator, value)
+
+        if kind == "operator" and operator in ("~", "!~"):
+            self.position += 1
+            pattern = self.expect("literal")
+            if not isinstance(pattern, str):
+                raise ValueError(f"expected a regular expression string after {operator}")
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"invalid regular expression {pattern!r}: {e}")
+            return Match(field, pattern, operator == "!~")
+
+        negated = self.accept("keyword", "not")
+        if negated or kind == "keyword" and operator == "in":
+            self.expect("keyword", "in")
+            self.expect("operator", "(")
+            values = [self.expect("literal")]
+            while self.accept("operator", ","):
+                values.append(self.expect("literal"))
+            self.expect("operator", ")")
+            return Membership(field, tuple(values), negated)
+
+        found = "end of expression" if kind == "end" else f"{operator!r} at position {start}"
+        raise ValueError(f"expected an operator after {field!r}, found {found}")
+
+
+def parse_expression(expression: str) -> Any:
+    """Parses the expression into its tree of nodes. Raises ValueError describing the first syntax error."""
+    return _Parser(expression).parse()
+
+
+def _number(value: Any) -> Any:
+    """Returns the value as a number, NaN (which fails every comparison) when it is not one."""
+    if type(value) is int or type(value) is float:
+        return value
+    if value is None or isinstance(value, bool):
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _Compiler:
+    """Compiles nodes into python source over the `line` dict, with the literals bound as constants."""
+    def __init__(self) -> None:
+        self.constants: Dict[str, Any] = {"_number": _number}
+
+    def constant(self, value: Any) -> str:
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def compile(self, node: Any) -> str:
+        if isinstance(node, And):
+            return "(" + " and ".join(self.compile(item) for item in node.items) + ")"
+        if isinstance(node, Or):
+            return "(" + " or ".join(self.compile(item) for item in node.items) + ")"
+        if isinstance(node, Not):
+            return f"(not {self.compile(node.item)})"
+
+        value = f"line.get({node.field!r})"
+        if isinstance(node, Match):
+            search = self.constant(re.compile(node.pattern).search)
+            matched = f"(type(_v := {value}) is str and {search}(_v) is not None)"
+            return f"(not {matched})" if node.negated else matched
+
+        if isinstance(node, Membership):
+            numbers = [item for item in node.values if _is_number(item)]
+            others = frozenset(item for item in node.values if not _is_number(item))
+            checks = []
+            if numbers:
+                checks.append(f"_number({value}) in {self.constant(frozenset(numbers))}")
+            if others:
+                checks.append(f"{value} in {self.constant(others)}")
+            member = "(" + " or ".join(checks) + ")"
+            return f"(not {member})" if node.negated else member
+
+        if _is_number(node.value):
+            return f"(_number({value}) {node.operator} {self.constant(node.value)})"
+        if isinstance(node.value, str) and node.operator not in ("==", "!="):
+            return f"(type(_v := {value}) is str and _v {node.operator} {self.constant(node.value)})"
+        return f"({value} {node.operator} {self.constant(node.value)})"
+
+
+def compile_predicate(node: Any) -> Callable[[Dict[str, Any]], bool]:
+    """Compiles the node tree into a single predicate over decoded log entries."""
+    compiler = _Compiler()
+    source = f"lambda line: {compiler.compile(node)}"
+    return eval(compile(source, "<where>", "eval"), compiler.constants)
+
+
+def expression_fields(node: Any) -> List[str]:
+    """Returns the fields read by the node tree, in order of appearance."""
+    if isinstance(node, (And, Or)):
+        fields: List[str] = []
+        for item in node.items:
+            fields.extend(field for field in expression_fields(item) if field not in fields)
+        return fields
+    if isinstance(node, Not):
+        return expression_fields(node.item)
+    return [node.field]
+
+
+def _raw_string(value: Any) -> Optional[bytes]:
+    """Returns the json encoding of a string as it appears in the raw line, None if encoders may write it differently."""
+    if not isinstance(value, str):
+        return None
+    encoded = json.dumps(value)
+    if encoded[1:-1] != value:
+        return None
+    return encoded.encode()
+
+def _regex_prefix(pattern: str) -> str:
+    """Returns the literal text an anchored regex requires at the start of the value, "" if there is none."""
+    if not pattern.startswith("^") or "|" in pattern:
+        return ""
+    prefix = []
+    for char in pattern[1:]:
+        if char in REGEX_SPECIAL:
+            break
+        prefix.append(char)
+    # A quantifier applies to the preceding character, which is then not required.
+    if len(prefix) < len(pattern) - 1 and pattern[len(prefix) + 1] in "*?{" and prefix:
+        prefix.pop()
+    return "".join(prefix)
+
+def raw_requirements(node: Any) -> List[List[bytes]]:
+    """
+    Returns byte strings the raw line must contain for the node to hold: every group needs any of its needles.
+
+    Only string equalities, memberships and anchored regex prefixes contribute. A line that satisfies the node
+    always contains the needles, as long as the log writer does not escape characters that json leaves as is.
+    """
+    if isinstance(node, And):
+        return [group for item in node.items for group in raw_requirements(item)]
+
+    if isinstance(node, Or):
+        needles: List[bytes] = []
+        for item in node.items:
+            groups = raw_requirements(item)
+            if len(groups) != 1:
+                return []
+            needles.extend(groups[0])
+        return [needles]
+
+    if isinstance(node, Compare) and node.operator == "==":
+        needle = _raw_string(node.value)
+        return [[needle]] if needle is not None else []
+
+    if isinstance(node, Membership) and not node.negated:
+        needles = [_raw_string(value) for value in node.values]
+        return [needles] if all(needle is not None for needle in needles) else []
+
+    if isinstance(node, Match) and not node.negated:
+        prefix = _regex_prefix(node.pattern)
+        needle = _raw_string(prefix) if prefix else None
+        # The needle is the opening quote and the prefix, without the closing quote.
+        return [[needle[:-1]]] if needle is not None else []
+
+    return []
+
+
+def compile_prefilter(node: Any) -> Optional[Callable[[bytes], Any]]:
+    """
+    Compiles the raw requirements of the node tree into a check on raw lines, None when there are none.
+
+    A single group becomes the `search` of a bytes regex, which runs without a python frame per line.
+    """
+    groups = raw_requirements(node)
+    if not groups:
+        return None
+
+    if len(groups) == 1:
+        return re.compile(b"|".join(map(re.escape, groups[0]))).search
+
+    constants: Dict[str, Any] = {}
+    checks = []
+    for group in groups:
+        names = []
+        for needle in group:
+            name = f"_c{len(constants)}"
+            constants[name] = needle
+            names.append(f"{name} in line")
+        checks.append("(" + " or ".join(names) + ")")
+
+    return eval(compile(f"lambda line: {' and '.join(checks)}", "<where-prefilter>", "eval"), constants)
@@ -0,0 +1,222 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .expressions import compile_predicate, compile_prefilter, expression_fields, parse_expression
+from .index import LogIndex
+from .reader import is_sequential
+from .timestamps import datetime_key, find_time_offset, parse_timestamp, timestamp_key
+
+Prefilter = Callable[[bytes], bool]
+
+
+class LineFilter(ABC):
+    """
+    A base class for the filters that know which fields of a log entry they read.
+
+    Unlike lambdas, filters are picklable, so they can be sent to worker processes.
+    """
+    FIELDS: List[str] = []
+
+    @abstractmethod
+    def __call__(self, line: Dict[str, Any]) -> bool:
+        """Returns whether the log entry should be processed."""
+        pass
+
+    def get_fields(self) -> List[str]:
+        """Returns the list of the fields the filter reads."""
+        return self.FIELDS
+
+    def get_prefilter(self) -> Optional[Prefilter]:
+        """
+        Returns a check on the raw line that runs before the json is decoded, if the filter has one.
+
+        The check may let through lines the filter rejects, but never rejects a line the filter keeps.
+        """
+        return None
+
+    def find_byte_range(self, path: str, index: Optional[LogIndex] = None) -> Tuple[int, int | None]:
+        """Returns the byte range of the file that can contain matching lines. The whole file by default."""
+        return 0, None
+
+
+@dataclass(frozen=True)
+class AcceptAll(LineFilter):
+    """Filter that lets every line through."""
+
+    def __call__(self, line: Dict[str, Any]) -> bool:
+        return True
+
+
+@dataclass(frozen=True)
+class DateFilter(LineFilter):
+    """
+    Filter that keeps the lines with the timestamp in the [start, end) range. Both bounds are optional.
+
+    Lines out of the range are rejected on raw bytes, before decoding. When the file is known to be time-ordered,
+    the range is also located by binary search, so the rest of the file is not even read.
+    """
+    FIELDS = ["@timestamp"]
+
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    time_ordered: bool = False
+    start_key: Optional[bytes] = field(init=False, repr=False, compare=False)
+    end_key: Optional[bytes] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "start_key", datetime_key(self.start) if self.start is not None else None)
+        object.__setattr__(self, "end_key", datetime_key(self.end) if self.end is not None else None)
+
+    @classmethod
+    def for_day(cls, day: datetime, time_ordered: bool = False) -> "DateFilter":
+        """Builds the filter for the whole (UTC) day."""
+        start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        return cls(start, start + timedelta(days=1), time_ordered)
+
+    def __call__(self, line: Dict[str, Any]) -> bool:
+        value = line.get("@timestamp")
+        if not isinstance(value, str):
+            return False
+
+        try:
+            timestamp = parse_timestamp(value)
+        except ValueError:
+            return False
+
+        if self.start is not None and timestamp < self.start:
+            return False
+        if self.end is not None and timestamp >= self.end:
+            return False
+        return True
+
+    def prefilter(self, line: bytes) -> bool:
+        """Rejects the raw lines whose timestamp, truncated to seconds, is surely out of the range."""
+        key = timestamp_key(line)
+        if key is None:
+            return True
+
+        if self.start_key is not None and key < self.start_key:
+            return False
+        if self.end_key is not None and key > self.end_key:
+            return False
+        return True
+
+    def get_prefilter(self) -> Optional[Prefilter]:
+        if self.start is None and self.end is None:
+            return None
+        return self.prefilter
+
+    def find_byte_range(self, path: str, index: Optional[LogIndex] = None) -> Tuple[int, int | None]:
+        if self.start is None and self.end is None:
+            return 0, None
+
+        if index is not None and index.time_ordered:
+            return index.find_range(self.start_key, self.end_key)
+
+        if not self.time_ordered or is_sequential(path):
+            return 0, None
+
+        start = find_time_offset(path, self.start_key) if self.start_key is not None else 0
+        end = None
+
+        if self.end is not None:
+            # Lines within the last second of the range can still match, unless the bound is a whole second.
+            end_bound = self.end if self.end.microsecond == 0 else self.end + timedelta(seconds=1)
+            end = find_time_offset(path, datetime_key(end_bound))
+
+        return start, end
+
+
+@dataclass(frozen=True)
+class WhereFilter(LineFilter):
+    """
+    Filter compiled from a `--where` expression, see `logs_handler.utils.expressions`.
+
+    The expression is parsed once; lines are checked by a single compiled predicate, and string equality,
+    membership and prefix clauses are also checked on the raw bytes before decoding. Only the expression is pickled,
+    workers compile it again.
+    """
+    expression: str
+    predicate: Callable[[Dict[str, Any]], bool] = field(init=False, repr=False, compare=False)
+    fields: List[str] = field(init=False, repr=False, compare=False)
+    raw_check: Optional[Prefilter] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        node = parse_expression(self.expression)
+        object.__setattr__(self, "predicate", compile_predicate(node))
+        object.__setattr__(self, "fields", expression_fields(node))
+        object.__setattr__(self, "raw_check", compile_prefilter(node))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self), (self.expression,)
+
+    def __call__(self, line: Dict[str, Any]) -> bool:
+        return self.predicate(line)
+
+    def get_fields(self) -> List[str]:
+        return self.fields
+
+    def get_prefilter(self) -> Optional[Prefilter]:
+        return self.raw_check
+
+
+@dataclass(frozen=True)
+class AllFilters(LineFilter):
+    """Filter that keeps the lines kept by all of its filters, combining their prefilters and byte ranges."""
+    filters: Tuple[LineFilter, ...]
+
+    @classmethod
+    def of(cls, *filters: LineFilter) -> LineFilter:
+        """Combines the filters, dropping the ones that accept everything."""
+        kept = tuple(line_filter for line_filter in filters if not isinstance(line_filter, AcceptAll))
+        if not kept:
+            return AcceptAll()
+        return kept[0] if len(kept) == 1 else cls(kept)
+
+    def __call__(self, line: Dict[str, Any]) -> bool:
+        for line_filter in self.filters:
+            if not line_filter(line):
+                return False
+        return True
+
+    def get_fields(self) -> List[str]:
+        fields: List[str] = []
+        for line_filter in self.filters:
+            fields.extend(field for field in line_filter.get_fields() if field not in fields)
+        return fields
+
+    def get_prefilter(self) -> Optional[Prefilter]:
+        prefilters = [prefilter for prefilter in (line_filter.get_prefilter() for line_filter in self.filters) if prefilter is not None]
+        if len(prefilters) <= 1:
+            return prefilters[0] if prefilters else None
+        return lambda line: all(prefilter(line) for prefilter in prefilters)
+
+    def find_byte_range(self, path: str, index: Optional[LogIndex] = None) -> Tuple[int, int | None]:
+        start, end = 0, None
+        for line_filter in self.filters:
+            filter_start, filter_end = line_filter.find_byte_range(path, index)
+            start = max(start, filter_start)
+            if filter_end is not None:
+                end = filter_end if end is None else min(end, filter_end)
+        return start, end
+
+
+def get_filter_fields(filter_func: Callable[[Dict[str, Any]], bool]) -> Optional[List[str]]:
+    """Returns the fields read by the filter, or None if the filter is an arbitrary callable."""
+    if isinstance(filter_func, LineFilter):
+        return filter_func.get_fields()
+    return None
+
+def get_prefilter(filter_func: Callable[[Dict[str, Any]], bool]) -> Optional[Prefilter]:
+    """Returns the raw-line check of the filter, if it has one."""
+    if isinstance(filter_func, LineFilter):
+        return filter_func.get_prefilter()
+    return None
+
+def get_byte_range(filter_func: Callable[[Dict[str, Any]], bool], path: str, index: Optional[LogIndex] = None) -> Tuple[int, int | None]:
+    """Returns the byte range of the file that can contain lines matching the filter, using the index when given."""
+    if isinstance(filter_func, LineFilter):
+        return filter_func.find_byte_range(path, index)
+    return 0, None
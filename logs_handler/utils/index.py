@@ -0,0 +1,173 @@
+from dataclasses import asdict, dataclass, field
+import hashlib
+import json
+import os
+from typing import List, Optional, Tuple
+
+from .reader import is_sequential, iter_lines
+from .timestamps import timestamp_key
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+# Length of the "YYYY-MM-DDTHH" prefix of a timestamp key, the granularity of the index.
+BUCKET_KEY_LENGTH = 13
+# Distance between the line offsets recorded for planning parallel chunks.
+CHECKPOINT_BYTES = 8 * 1024 * 1024
+# Size of the file head used to tell an appended file from a rotated one.
+HEAD_BYTES = 4096
+
+
+@dataclass
+class Bucket:
+    """Lines of a single hour: the offset of the first one and their amount."""
+    hour: str
+    offset: int
+    lines: int = 0
+
+
+@dataclass
+class LogIndex:
+    """
+    Sidecar index of a log file, stored next to it as `<file>.idx`.
+
+    Covers the file up to `indexed_bytes` (the end of the last complete line). Bucket offsets can only
+    be used for seeking when the file is `time_ordered`; checkpoints are line offsets usable in any file.
+    """
+    size: int
+    mtime_ns: int
+    head_digest: str
+    indexed_bytes: int = 0
+    line_count: int = 0
+    time_ordered: bool = True
+    buckets: List[Bucket] = field(default_factory=list)
+    checkpoints: List[int] = field(default_factory=list)
+    version: int = INDEX_VERSION
+
+    def find_range(self, start_key: Optional[bytes], end_key: Optional[bytes]) -> Tuple[int, int | None]:
+        """
+        Returns the byte range holding the lines with keys in [start_key, end_key], widened to whole hours.
+
+        Must only be called for time-ordered files.
+        """
+        start, end = 0, None
+
+        if start_key is not None:
+            start_hour = start_key[:BUCKET_KEY_LENGTH].decode()
+            start = next((bucket.offset for bucket in self.buckets if bucket.hour >= start_hour), self.indexed_bytes)
+
+        if end_key is not None:
+            end_hour = end_key[:BUCKET_KEY_LENGTH].decode()
+            end = next((bucket.offset for bucket in self.buckets if bucket.hour > end_hour), None)
+
+        return start, end
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text: str) -> "LogIndex":
+        data = json.loads(text)
+        data["buckets"] = [Bucket(**bucket) for bucket in data["buckets"]]
+        return cls(**data)
+
+
+def index_path(path: str) -> str:
+    """Returns the path of the sidecar index of the log file."""
+    return path + INDEX_SUFFIX
+
+def _head_digest(path: str, size: int) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read(min(size, HEAD_BYTES))).hexdigest()
+
+def _scan(path: str, index: LogIndex) -> None:
+    """Extends the index with the complete lines after `indexed_bytes`."""
+    offset = index.indexed_bytes
+    next_checkpoint = (index.checkpoints[-1] if index.checkpoints else 0) + CHECKPOINT_BYTES
+    last_bucket = index.buckets[-1] if index.buckets else None
+    buckets = {bucket.hour: bucket for bucket in index.buckets}
+
+    for line in iter_lines(path, offset, index.size):
+        line_end = offset + len(line) + 1
+        if line_end > index.size:
+            # Last line without a newline is still being written.
+            break
+
+        if offset >= next_checkpoint:
+            index.checkpoints.append(offset)
+            next_checkpoint = offset + CHECKPOINT_BYTES
+
+        key = timestamp_key(line) if line else None
+        if key is not None:
+            hour = key[:BUCKET_KEY_LENGTH].decode()
+
+            if last_bucket is None or hour != last_bucket.hour:
+                if last_bucket is not None and hour < last_bucket.hour:
+                    index.time_ordered = False
+
+                last_bucket = buckets.get(hour)
+                if last_bucket is None:
+                    last_bucket = Bucket(hour, offset)
+                    buckets[hour] = last_bucket
+                    index.buckets.append(last_bucket)
+                else:
+                    index.time_ordered = False
+
+            last_bucket.lines += 1
+
+        index.line_count += 1
+        offset = line_end
+
+    index.indexed_bytes = offset
+
+def load_index(path: str) -> Optional[LogIndex]:
+    """Loads the sidecar index of the file. Returns None if there is none or it is unreadable."""
+    try:
+        with open(index_path(path), "r") as file:
+            index = LogIndex.from_json(file.read())
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+    if index.version != INDEX_VERSION:
+        return None
+    return index
+
+def ensure_index(path: str) -> Optional[LogIndex]:
+    """
+    Returns an up to date index of the file, building or refreshing the sidecar if needed.
+
+    Files are expected to be append-only: a grown file with the same head is indexed from where the
+    index stopped, while a shrunk or rotated one is indexed from scratch. Compressed files and streams are not indexed.
+    """
+    if is_sequential(path):
+        return None
+
+    stat = os.stat(path)
+    index = load_index(path)
+
+    if index is not None and index.size == stat.st_size and index.mtime_ns == stat.st_mtime_ns:
+        return index
+
+    appended = (
+        index is not None
+        and stat.st_size >= index.size
+        and index.head_digest == _head_digest(path, index.size)
+    )
+
+    if not appended:
+        index = LogIndex(size=stat.st_size, mtime_ns=stat.st_mtime_ns, head_digest="")
+
+    index.size = stat.st_size
+    index.mtime_ns = stat.st_mtime_ns
+    index.head_digest = _head_digest(path, stat.st_size)
+    _scan(path, index)
+
+    temp_path = index_path(path) + ".tmp"
+    try:
+        with open(temp_path, "w") as file:
+            file.write(index.to_json())
+        os.replace(temp_path, index_path(path))
+    except OSError:
+        # Read-only location: the index is still usable for this run.
+        pass
+
+    return index
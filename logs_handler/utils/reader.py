@@ -0,0 +1,114 @@
+import gzip
+import os
+import stat
+import sys
+from typing import BinaryIO, Iterator, List, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Size of the blocks read from disk (or from the decompressor) at once.
+BLOCK_SIZE = 1024 * 1024
+
+GZIP_SUFFIX = ".gz"
+ZSTD_SUFFIX = ".zst"
+# Input path standing for the standard input.
+STDIN = "-"
+
+
+def is_compressed(path: str) -> bool:
+    """Returns whether the file is a compressed (rotated) log, which can only be read from the start."""
+    return path.endswith((GZIP_SUFFIX, ZSTD_SUFFIX))
+
+def is_stream(path: str) -> bool:
+    """Returns whether the input is the standard input or a pipe (e.g. a named pipe or `<(zcat ...)`), readable only once."""
+    if path == STDIN:
+        return True
+    try:
+        return not stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+def is_sequential(path: str) -> bool:
+    """Returns whether the input can only be read from its start, without seeking: compressed logs and streams."""
+    return is_compressed(path) or is_stream(path)
+
+def open_log(path: str) -> BinaryIO:
+    """Opens the log for binary reading, transparently decompressing .gz and .zst files as a stream."""
+    if path == STDIN:
+        return open(sys.stdin.fileno(), "rb", closefd=False)
+
+    if path.endswith(GZIP_SUFFIX):
+        return gzip.open(path, "rb")
+
+    if path.endswith(ZSTD_SUFFIX):
+        if zstandard is None:
+            raise ValueError(f"File {path} is zstd compressed, but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+
+    return open(path, "rb")
+
+def iter_blocks(path: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """
+    Yields the byte range [start, end) of the file in blocks of at most `BLOCK_SIZE` bytes.
+
+    Byte ranges are only supported for regular uncompressed files. Streams yield whatever a single read
+    returned, so lines written slowly into a pipe are not held back until a whole block is filled.
+    """
+    if is_sequential(path) and (start != 0 or end is not None):
+        raise ValueError(f"File {path} is compressed or a stream and cannot be read by byte ranges.")
+
+    remaining = end - start if end is not None else -1
+
+    with open_log(path) as file:
+        if start:
+            file.seek(start)
+        read = file.read1 if is_stream(path) else file.read
+
+        while remaining:
+            block = read(BLOCK_SIZE if remaining < 0 else min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            if remaining > 0:
+                remaining -= len(block)
+            yield block
+
+def split_block(tail: bytes, block: bytes) -> Tuple[List[bytes], bytes]:
+    """Splits the block into its complete lines, the first one prefixed with the `tail` left by the previous block."""
+    lines = block.split(b"\n")
+    lines[0] = tail + lines[0]
+    return lines, lines.pop()
+
+def iter_lines(path: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """
+    Yields the raw lines (without the trailing newline) of the byte range [start, end) of the file.
+
+    The file is read in large blocks which are split on newlines in one go, so there is neither
+    text decoding nor a read call per line. Byte ranges are only supported for uncompressed files.
+    """
+    tail = b""
+
+    for block in iter_blocks(path, start, end):
+        lines, tail = split_block(tail, block)
+        yield from lines
+
+    if tail:
+        yield tail
+
+def find_last_line_end(path: str, start: int, size: int) -> int:
+    """Returns the offset right after the last newline in [start, size), or start if there is none."""
+    with open(path, "rb") as file:
+        block_end = size
+
+        while block_end > start:
+            block_start = max(start, block_end - BLOCK_SIZE)
+            file.seek(block_start)
+            newline = file.read(block_end - block_start).rfind(b"\n")
+
+            if newline != -1:
+                return block_start + newline + 1
+            block_end = block_start
+
+    return start
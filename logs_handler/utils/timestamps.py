@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+import os
+import re
+from typing import BinaryIO, Optional
+
+# Raw-byte lookup of the timestamp, used before (and instead of) decoding the whole line.
+TIMESTAMP_PATTERN = re.compile(rb'"@timestamp"\s*:\s*"([^"]+)"')
+# Length of the "YYYY-MM-DDTHH:MM:SS" prefix, which orders lexicographically for timestamps in the same offset.
+KEY_LENGTH = 19
+UTC_SUFFIXES = (b"+00:00", b"Z")
+FRACTION_CHARS = ".0123456789"
+# Supported bucket widths of the timeseries report, in seconds.
+BUCKETS = {"1s": 1, "1m": 60, "1h": 3600}
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str) -> datetime:
+    """Parses an ISO 8601 timestamp into an aware datetime. Naive timestamps are considered UTC."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+@lru_cache(maxsize=65536)
+def _epoch_second(prefix: str, offset: str) -> int:
+    return int(parse_timestamp(prefix + offset).timestamp())
+
+def epoch_second(value: str) -> int:
+    """
+    Returns the Unix second of an ISO 8601 timestamp, dropping fractions of a second.
+
+    Parsing is cached on the "YYYY-MM-DDTHH:MM:SS" prefix and the offset, so all the lines logged
+    within the same second share a single `datetime.fromisoformat` call.
+    """
+    offset = value[KEY_LENGTH:]
+    if offset[:1] == ".":
+        offset = offset.lstrip(FRACTION_CHARS)
+    return _epoch_second(value[:KEY_LENGTH], offset)
+
+def datetime_key(value: datetime) -> bytes:
+    """Returns the UTC "YYYY-MM-DDTHH:MM:SS" key of a datetime, truncated to seconds."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S").encode()
+
+@lru_cache(maxsize=65536)
+def _convert_key(raw_timestamp: bytes) -> Optional[bytes]:
+    try:
+        return datetime_key(parse_timestamp(raw_timestamp.decode()))
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def timestamp_key(line: bytes) -> Optional[bytes]:
+    """
+    Extracts the UTC "YYYY-MM-DDTHH:MM:SS" key of the raw line's timestamp without decoding the json.
+
+    UTC timestamps in the "YYYY-MM-DDTHH:MM:SS" form are sliced as is; other offsets, separators
+(a space, a lowercase `t`) and precisions are converted (and cached).
+    Returns None when the line has no recognizable timestamp.
+    """
+    match = TIMESTAMP_PATTERN.search(line)
+    if match is None:
+        return None
+
+    raw_timestamp = match.group(1)
+    if raw_timestamp.endswith(UTC_SUFFIXES) and raw_timestamp[10:11] == b"T" and raw_timestamp[16:17] == b":":
+        return raw_timestamp[:KEY_LENGTH]
+    return _convert_key(raw_timestamp)
+
+
+def _line_start(file: BinaryIO, position: int) -> int:
+    """Returns the offset of the first line starting at or after the position."""
+    if position == 0:
+        return 0
+    file.seek(position - 1)
+    file.readline()
+    return file.tell()
+
+def _key_at(file: BinaryIO, position: int, file_size: int) -> Optional[bytes]:
+    """Returns the key of the first line with a timestamp starting at the position, None at the end of file."""
+    file.seek(position)
+    while file.tell() < file_size:
+        key = timestamp_key(file.readline())
+        if key is not None:
+            return key
+    return None
+
+def find_time_offset(path: str, key: bytes) -> int:
+    """
+    Binary searches a time-ordered file for the offset of the first line with a timestamp key >= the given key.
+
+    Lines without a timestamp are attributed to the next line that has one.
+    """
+    file_size = os.path.getsize(path)
+
+    with open(path, "rb") as file:
+        low, high = 0, file_size
+
+        while low < high:
+            middle = (low + high) // 2
+            line_key = _key_at(file, _line_start(file, middle), file_size)
+
+            if line_key is not None and line_key < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return _line_start(file, low)
@@ -1,55 +1,140 @@
-from decimal import Decimal
-import json
-import sys
-from typing import Any, Dict, Iterator, List
+from dataclasses import dataclass, replace
+from itertools import zip_longest
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
 
-from tabulate import tabulate
+from .decoders import Decoder, JsonDecoder
+from .diagnostics import Diagnostics, MALFORMED_JSON
+from .reader import iter_lines
 
-def load_json(path: str, required_fields: List[str]) -> Iterator[Dict[str, Any]]:
+# Default amount of lines with missing fields after which a file is considered to have a wrong structure.
+MAX_MISSING_FIELDS = 15
 
-    total_lines = 0
-    valid_lines = 0
-    malformed_json = 0
-    missing_fields_counter = 0
+@dataclass
+class LoadStats:
+    """
+    Counters collected while loading a log file (or a chunk of it).
 
-    with open(path, "r") as file:
-        
-        for line_num, line in enumerate(file, 1):
+    When reports requiring different fields share the pass (see `parse_lines`), `missing_fields` counts the lines
+    none of them could take and `group_missing` the lines lacking the fields of every group, as the group alone would.
+    """
+    total_lines: int = 0
+    valid_lines: int = 0
+    malformed_json: int = 0
+    missing_fields: int = 0
+    skipped_lines: int = 0
+    group_missing: Tuple[int, ...] = ()
+
+    def merge(self, other: "LoadStats") -> None:
+        """Adds the counters of another chunk of the same file."""
+        self.total_lines += other.total_lines
+        self.valid_lines += other.valid_lines
+        self.malformed_json += other.malformed_json
+        self.missing_fields += other.missing_fields
+        self.skipped_lines += other.skipped_lines
+        self.group_missing = tuple(a + b for a, b in zip_longest(self.group_missing, other.group_missing, fillvalue=0))
+
+
+def check_load_stats(path: str, stats: LoadStats, required_fields: List[str], max_missing_fields: int = MAX_MISSING_FIELDS, field_groups: Optional[Sequence[List[str]]] = None) -> None:
+    """
+    Raises ValueError if the collected counters show that the file is not a valid log.
+
+    A file with `max_missing_fields` lines lacking the required fields has a wrong structure; 0 disables the check.
+    With `field_groups`, every group is judged on its own counters, as if it had been loaded alone.
+    """
+    if field_groups:
+        for fields, missing in zip_longest(field_groups, stats.group_missing[:len(field_groups)], fillvalue=0):
+            valid_lines = stats.total_lines - stats.malformed_json - missing
+            check_load_stats(path, replace(stats, valid_lines=valid_lines, missing_fields=missing, group_missing=()), fields, max_missing_fields)
+        return
+
+    if max_missing_fields and stats.missing_fields >= max_missing_fields:
+        raise ValueError(
+            f"File {path} appears to have wrong structure\nExpected fields {required_fields} not found in the first {stats.total_lines} lines."
+        )
+
+    if stats.total_lines > 0 and stats.valid_lines == 0:
+        raise ValueError(
+            f"No valid log entries was found in {path}\nFile might be in wrong format or corrupted.\n({stats.malformed_json} JSON parser errors, {stats.missing_fields} missing required fields.)"
+        )
+
+def read_json_lines(path: str, required_fields: List[str], stats: LoadStats, start: int = 0, end: int | None = None, strict: bool = False, decoder: Optional[Decoder] = None, prefilter: Optional[Callable[[bytes], bool]] = None, diagnostics: Optional[Diagnostics] = None, max_missing_fields: int = MAX_MISSING_FIELDS, field_groups: Optional[Sequence[List[str]]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields parsed log entries from the byte range [start, end) of the file, updating the stats.
+    Raw lines are handed to the decoder as bytes, compressed files are decompressed on the fly.
+
+    The range must be aligned to line boundaries. Unless `strict` is set, the file is not judged as a whole,
+    so chunks of the same file can be checked together with `check_load_stats` afterwards.
+    Lines are decoded with the standard library (floats as `Decimal`) unless another decoder is given.
+    Lines rejected by the prefilter are skipped before decoding and are not judged at all.
+    Malformed and incomplete lines are only counted, and recorded in `diagnostics` when it is given.
+    """
+    location = "" if start == 0 else f" (chunk at byte {start})"
+    yield from parse_lines(iter_lines(path, start, end), path, required_fields, stats, strict, decoder, prefilter, location, diagnostics=diagnostics, max_missing_fields=max_missing_fields, field_groups=field_groups)
+
+def parse_lines(lines: Iterable[bytes], path: str, required_fields: List[str], stats: LoadStats, strict: bool = False, decoder: Optional[Decoder] = None, prefilter: Optional[Callable[[bytes], bool]] = None, location: str = "", first_line_num: int = 1, diagnostics: Optional[Diagnostics] = None, max_missing_fields: int = MAX_MISSING_FIELDS, field_groups: Optional[Sequence[List[str]]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Decodes and validates raw lines of the file, see `read_json_lines`. Used directly for lines that do not come from `iter_lines`.
+
+    With `field_groups` (the required fields of reports sharing the pass, `required_fields` being their union),
+    a line lacking some of the fields is still yielded as long as one of the groups has all of its fields,
+    and it is counted as missing for every group it does not satisfy.
+    """
+    decoder = decoder if decoder is not None else JsonDecoder()
+    decode = decoder.decode
+    decode_errors = decoder.ERRORS + (UnicodeDecodeError,)
+
+    for line_num, line in enumerate(lines, first_line_num):
+
+        if not line or line.isspace():
+            continue
+
+        if prefilter is not None and not prefilter(line):
+            stats.skipped_lines += 1
+            continue
+
+        stats.total_lines += 1
+
+        try:
+            data: Dict[str, Any] = decode(line)
+            missing = [f for f in required_fields if f not in data.keys()]
+
+            if missing:
+                if diagnostics is not None:
+                    diagnostics.reject_missing(line_num, line, missing, location)
+
+                if field_groups:
+                    group_missing = stats.group_missing or (0,) * len(field_groups)
+                    stats.group_missing = tuple(amount + any(f in missing for f in fields) for amount, fields in zip(group_missing, field_groups))
+                    if strict and max_missing_fields and max(stats.group_missing) >= max_missing_fields:
+                        check_load_stats(path, stats, required_fields, max_missing_fields, field_groups)
+                    if any(amount == before for amount, before in zip(stats.group_missing, group_missing)):
+                        stats.valid_lines += 1
+                        yield data
+                        continue
+
+                stats.missing_fields += 1
+                if strict and max_missing_fields and stats.missing_fields >= max_missing_fields and not field_groups:
+                    check_load_stats(path, stats, required_fields, max_missing_fields)
 
-            if not line.strip():
                 continue
 
-            total_lines += 1
-
-            try:
-                data: Dict[str, Any] = json.loads(line, parse_float=Decimal)
-                missing = [f for f in required_fields if f not in data.keys()]
-
-                if missing:
-                    missing_fields_counter += 1
-                    print(f"line {line_num} missing {missing} feilds", file=sys.stderr)
-
-                    if total_lines >= 15 and missing_fields_counter == 15:
-                        raise ValueError(
-                            f"File {path} appears to have wrong structure\nExpected fields {required_fields} not found in the first {total_lines} lines."
-                        )
-                    
-                    continue
-                
-                valid_lines += 1
-                yield data
-
-            except json.JSONDecodeError:
-                malformed_json += 1
-                print(f"malformed json line: {line}", file=sys.stderr)
-        
-        if total_lines > 0 and valid_lines == 0:
-            raise ValueError(
-                f"No valid log entries was found in {file}\nFile might be in wrong format or corrupted.\n({malformed_json} JSON parser errors, {missing_fields_counter} missing required fields.)"
-            )
-        
-
-def print_table(table: List[Any], headers: List[str], file: str) -> None:
+            stats.valid_lines += 1
+            yield data
+
+        except decode_errors:
+            stats.malformed_json += 1
+            if diagnostics is not None:
+                diagnostics.reject(MALFORMED_JSON, line_num, line, location=location)
+
+def load_json(path: str, required_fields: List[str], decoder: Optional[Decoder] = None, prefilter: Optional[Callable[[bytes], bool]] = None, start: int = 0, end: int | None = None, diagnostics: Optional[Diagnostics] = None) -> Iterator[Dict[str, Any]]:
+    stats = LoadStats()
+    yield from read_json_lines(path, required_fields, stats, start, end, strict=True, decoder=decoder, prefilter=prefilter, diagnostics=diagnostics)
+    check_load_stats(path, stats, required_fields)
+
+
+def print_table(table: List[Any], headers: List[str], file: str, stream: Optional[TextIO] = None) -> None:
     header = f"            --- Report for: {file} ---"
-    print("\n" + header)
-    print(tabulate(table, headers, showindex="always"))
\ No newline at end of file
+    print("\n" + header, file=stream)
+    # Imported only when a table is printed, machine readable formats never load it.
+    from tabulate import tabulate
+    print(tabulate(table, headers, showindex="always"), file=stream)
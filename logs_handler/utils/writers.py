@@ -0,0 +1,113 @@
+from abc import ABC, abstractmethod
+import csv
+from decimal import Decimal
+from itertools import islice
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Type
+
+from .utils import print_table
+
+TABLE = "table"
+CSV = "csv"
+NDJSON = "ndjson"
+JSON = "json"
+# Rows serialized before they are written to the stream at once.
+WRITE_BATCH = 4096
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not json serializable")
+
+# Compact json of the rows; Decimals are written as floats.
+encode_json = json.JSONEncoder(default=_json_default, ensure_ascii=False, separators=(",", ":")).encode
+
+
+class ReportWriter(ABC):
+    """
+    Writes the tables of the reports to a stream, one report at a time.
+
+    Rows are consumed from an iterator as they are written, so machine readable formats never hold the whole
+    table in memory. `begin` and `end` enclose all the reports of a run.
+    """
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+
+    def begin(self) -> None:
+        pass
+
+    @abstractmethod
+    def write(self, file: str, headers: List[str], rows: Iterable[List[Any]]) -> None:
+        """Writes the table of a single report over the given file."""
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+class TableWriter(ReportWriter):
+    """Human readable tables. `tabulate` needs all the rows to align the columns, so they are collected first."""
+    def write(self, file: str, headers: List[str], rows: Iterable[List[Any]]) -> None:
+        print_table(list(rows), headers, file, self.stream)
+
+
+class CsvWriter(ReportWriter):
+    """Csv with a header row per report; the reports are separated by an empty line."""
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        super().__init__(stream)
+        self.written = 0
+
+    def write(self, file: str, headers: List[str], rows: Iterable[List[Any]]) -> None:
+        if self.written:
+            self.stream.write("\n")
+        writer = csv.writer(self.stream, lineterminator="\n")
+        writer.writerow(headers)
+        writer.writerows(rows)
+        self.written += 1
+
+
+class NdjsonWriter(ReportWriter):
+    """A json object per row, keyed by the headers, with the file it was built over."""
+    def write(self, file: str, headers: List[str], rows: Iterable[List[Any]]) -> None:
+        rows = iter(rows)
+        keys = ["file"] + headers
+        while batch := list(islice(rows, WRITE_BATCH)):
+            self.stream.write("".join(encode_json(dict(zip(keys, [file] + row))) + "\n" for row in batch))
+
+
+class JsonWriter(ReportWriter):
+    """A single json array of `{"file", "headers", "rows"}` objects, written as the rows come."""
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        super().__init__(stream)
+        self.written = 0
+
+    def begin(self) -> None:
+        self.stream.write("[")
+
+    def write(self, file: str, headers: List[str], rows: Iterable[List[Any]]) -> None:
+        separator = "," if self.written else ""
+        self.stream.write(f'{separator}\n{{"file":{encode_json(file)},"headers":{encode_json(headers)},"rows":[')
+
+        rows = iter(rows)
+        first = True
+        while batch := list(islice(rows, WRITE_BATCH)):
+            self.stream.write(("" if first else ",") + ",".join(map(encode_json, batch)))
+            first = False
+        self.stream.write("]}")
+        self.written += 1
+
+    def end(self) -> None:
+        self.stream.write("\n]\n")
+
+
+WRITERS: Dict[str, Type[ReportWriter]] = {TABLE: TableWriter, CSV: CsvWriter, NDJSON: NdjsonWriter, JSON: JsonWriter}
+
+
+def make_writer(output_format: str, stream: Optional[TextIO] = None) -> ReportWriter:
+    """Returns the writer of the output format: table, csv, ndjson or json."""
+    try:
+        return WRITERS[output_format](stream)
+    except KeyError:
+        raise ValueError(f"unknown output format <{output_format}>, expected one of: {', '.join(WRITERS)}")
@@ -1,55 +1,303 @@
+from contextlib import nullcontext
+from datetime import datetime
+from functools import partial
+import os
 import sys
-from typing import Callable, Dict, Type, Tuple, List, Any
+import time
+from typing import Callable, Dict, Iterator, Optional, Sequence, Type, Tuple, List, Any
 
-from logs_handler.cli import init_parser, parse_args, ReportType
-from logs_handler.reports import Report, AvgResponseTime, UserAgent
-from logs_handler.utils import load_json, print_table
+from logs_handler.cli import init_parser, parse_args, init_convert_parser, parse_convert_args, init_serve_parser, parse_serve_args, ParsedArgs, ParsedServeArgs, ReportType, CONVERT_COMMAND, SERVE_COMMAND
+from logs_handler.engine import run_reports, run_incremental, RunOptions, Follower, FileStats, Stopwatch, emit_stats
+from logs_handler.reports import Report, ReportFactory, get_report_class
+from logs_handler.reports.registry import BUILTIN_REPORTS
+from logs_handler.utils import Diagnostics
+from logs_handler.utils.diagnostics import SAMPLE_SIZE
+from logs_handler.utils.writers import ReportWriter, TABLE, make_writer
 
-def build_report(file_path: str, ReportClass: Type[Report], filter_func: Callable[[Dict[str, Any]], bool] = lambda x: True) -> Tuple[List[List[Any]], List[str]]:
-    """Builds the table and headers for tabulate to print."""
-    report = ReportClass()
+# Functions listed on stderr after a profiled run.
+PROFILE_TOP_FUNCTIONS = 25
+
+def get_report_factory(report_type: str, top_k: Optional[int] = None, normalize_urls: bool = False, bucket: str = "1m", by_handler: bool = False, group_by: Optional[Sequence[str]] = None, aggregations: Optional[Sequence[str]] = None, compact: bool = False) -> ReportFactory:
+    """
+    Maps the report name onto a factory of reports with the requested options, importing only that report.
+
+    The timeseries report is ordered by time, so `top_k` does not apply to it. The groupby report aggregates
+    all the groups exactly and `top_k` only limits its output. `compact` picks the compact average report.
+    Reports from plugins are built without options.
+    """
+    ReportClass = get_report_class(report_type, compact)
+    if report_type not in BUILTIN_REPORTS:
+        return ReportClass
+    options: Dict[str, Any] = {}
+
+    if report_type == ReportType.TIMESERIES:
+        options["bucket"] = bucket
+        options["by_handler"] = by_handler
+    elif report_type == ReportType.GROUPBY:
+        options["keys"] = tuple(group_by or ())
+        options["aggregations"] = tuple(aggregations or ("count",))
+        options["limit"] = top_k
+    elif top_k is not None:
+        options["top_k"] = top_k
+    if normalize_urls and report_type != ReportType.USERAGENT:
+        from logs_handler.reports.normalizers import UrlNormalizer
+        options["url_normalizer"] = UrlNormalizer()
+
+    return partial(ReportClass, **options) if options else ReportClass
+
+def build_tables(reports: Sequence[Report], file_stats: Optional[FileStats] = None, limit: Optional[int] = None) -> List[Tuple[List[List[Any]], List[str]]]:
+    """Generates the tables and headers of the reports, timed as rendering when stats are collected."""
+    with Stopwatch(file_stats.stages["render"]) if file_stats is not None else nullcontext():
+        return [(list(report.iter_table(limit)), report.get_headers()) for report in reports]
+
+def collect_reports(file_path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool] = lambda x: True, options: RunOptions = RunOptions(), file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None) -> List[Report]:
+    """
+    Builds several reports, reading and parsing the file only once.
+
+    With a state directory in the options, only the lines appended since the previous run are processed.
+    Counters and per-stage timings of the run are added to `file_stats`, rejected lines to `diagnostics`, when they are given.
+    """
     try:
-        lines_iter = filter(filter_func, load_json(file_path, report.get_required_fields()))
+        if options.state_dir is not None:
+            return run_incremental(file_path, report_classes, filter_func, options, file_stats, diagnostics)
 
-        for line in lines_iter:
-            report.process_line(line)
-        
-        table = report.generate_table()
-        headers = report.get_headers()
+        reports = [ReportClass() for ReportClass in report_classes]
+        run_reports(file_path, reports, filter_func, options, file_stats, diagnostics)
+        return reports
 
-        return (table, headers)
-    
     except ValueError as e:
         raise ValueError(f"Failed to process {file_path}: {e}")
 
+def build_reports(file_path: str, report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool] = lambda x: True, options: RunOptions = RunOptions(), file_stats: Optional[FileStats] = None, diagnostics: Optional[Diagnostics] = None) -> List[Tuple[List[List[Any]], List[str]]]:
+    """Builds the tables and headers of several reports, see `collect_reports`."""
+    return build_tables(collect_reports(file_path, report_classes, filter_func, options, file_stats, diagnostics), file_stats)
+
+def build_reports_parallel(file_paths: Sequence[str], report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], workers: int, options: RunOptions = RunOptions(), file_stats: Optional[Sequence[FileStats]] = None, diagnostics: Optional[Sequence[Diagnostics]] = None) -> Iterator[Tuple[str, List[Tuple[List[List[Any]], List[str]]] | ValueError]]:
+    """Builds the tables and headers of several files on a process pool, see `collect_reports_parallel`."""
+    all_stats = file_stats if file_stats is not None else [None] * len(file_paths)
+    results = collect_reports_parallel(file_paths, report_classes, filter_func, workers, options, file_stats, diagnostics)
+
+    for (file_path, reports), stats in zip(results, all_stats):
+        yield file_path, reports if isinstance(reports, ValueError) else build_tables(reports, stats)
+
+def collect_reports_parallel(file_paths: Sequence[str], report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], workers: int, options: RunOptions = RunOptions(), file_stats: Optional[Sequence[FileStats]] = None, diagnostics: Optional[Sequence[Diagnostics]] = None) -> Iterator[Tuple[str, List[Report] | ValueError]]:
+    """
+    Builds the reports of several files on a process pool, splitting each file into chunks.
+
+    Yields the results in the order of the files. A file that failed yields the error instead of the reports.
+    `file_stats` and `diagnostics`, one per file, get the counters, timings and rejected lines merged from all the chunks.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from logs_handler.engine.parallel import submit_file
+
+    all_stats = file_stats if file_stats is not None else [None] * len(file_paths)
+    all_diagnostics = diagnostics if diagnostics is not None else [None] * len(file_paths)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [
+            submit_file(executor, file_path, report_classes, filter_func, workers, options, stats, file_diagnostics)
+            for file_path, stats, file_diagnostics in zip(file_paths, all_stats, all_diagnostics)
+        ]
+
+        for job in jobs:
+            try:
+                yield job.file_path, job.result()
+            except ValueError as e:
+                yield job.file_path, ValueError(f"Failed to process {job.file_path}: {e}")
+
+def collect_reports_concurrent(file_paths: Sequence[str], report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], concurrency: int, options: RunOptions = RunOptions(), diagnostics: Optional[Sequence[Diagnostics]] = None) -> Iterator[Tuple[str, List[Report] | ValueError]]:
+    """
+    Builds the reports of several files, reading up to `concurrency` of them at once, see `logs_handler.engine.multisource`.
+    Yields the results in the order of the files. A file that failed yields the error instead of the reports.
+    """
+    from logs_handler.engine.multisource import collect_sources
+
+    for file_path, reports in zip(file_paths, collect_sources(file_paths, report_classes, filter_func, options, concurrency, diagnostics)):
+        yield file_path, ValueError(f"Failed to process {file_path}: {reports}") if isinstance(reports, ValueError) else reports
+
+def follow_reports(file_paths: Sequence[str], report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], interval: float, options: RunOptions = RunOptions(), quarantine_path: Optional[str] = None, error_samples: int = SAMPLE_SIZE, output_format: str = TABLE, limit: Optional[int] = None) -> None:
+    """
+    Follows the files until interrupted, printing the reports every `interval` seconds and the rejected lines at the end.
+    Every refresh is a complete output of its own in machine readable formats.
+    """
+    follower = Follower(file_paths, report_classes, filter_func, options, quarantine_path=quarantine_path, sample_size=error_samples)
+    follower.start()
+
+    try:
+        while True:
+            time.sleep(interval)
+            if output_format == TABLE:
+                print(f"\n=== {datetime.now().isoformat(timespec='seconds')} ===")
+
+            writer = make_writer(output_format)
+            writer.begin()
+            for file, results in follower.snapshot(limit):
+                for table, headers in results:
+                    writer.write(file, headers, table)
+            writer.end()
+            sys.stdout.flush()
+    finally:
+        follower.stop()
+        print_diagnostics([followed.diagnostics for followed in follower.files])
+
+def serve_reports(args: ParsedServeArgs) -> None:
+    """Follows the files and serves all the report types until interrupted, see `logs_handler.engine.server`."""
+    from logs_handler.engine.server import serve
+
+    reports = [
+        (report_type, get_report_factory(report_type, args.top_k, args.normalize_urls, args.bucket, args.by_handler, args.group_by, args.aggregations, args.compact))
+        for report_type in args.report_types
+    ]
+    options = RunOptions(decoder_backend=args.decoder, batch_size=args.batch_size, max_missing_fields=args.max_missing_fields)
+
+    if args.quarantine is not None:
+        open(args.quarantine, "wb").close()
+
+    follower = Follower(args.input_files, [report_class for _, report_class in reports], args.line_filter, options, quarantine_path=args.quarantine, sample_size=args.error_samples)
+    try:
+        serve(follower, reports, args.line_filter, args.socket, args.port)
+    finally:
+        print_diagnostics([followed.diagnostics for followed in follower.files])
+
+def query_server(address: str, file_paths: Sequence[str], report_types: Sequence[str], report_classes: Sequence[ReportFactory], filter_func: Callable[[Dict[str, Any]], bool], limit: Optional[int] = None) -> List[Tuple[str, List[str], List[List[Any]]]]:
+    """
+    Fetches the tables of every file and report from the report server, in the order they are printed.
+
+    The server must follow the files with the same report options and filter, checked by their signatures.
+    All the tables are fetched before any is printed, so a failed query leaves nothing half written.
+    Raises OSError when the server is not running, ValueError when it cannot answer.
+    """
+    from logs_handler.engine.client import query_report
+    from logs_handler.engine.server import report_signature
+
+    signatures = [report_signature(report_class, filter_func) for report_class in report_classes]
+    results = []
+    for file in file_paths:
+        for report_type, signature in zip(report_types, signatures):
+            response = query_report(address, report_type, os.path.abspath(file), limit, signature)
+            table = response["files"][0]
+            results.append((file, table["headers"], table["rows"]))
+    return results
+
+def build_report(file_path: str, ReportClass: Type[Report], filter_func: Callable[[Dict[str, Any]], bool] = lambda x: True) -> Tuple[List[List[Any]], List[str]]:
+    """Builds the table and headers for tabulate to print."""
+    return build_reports(file_path, [ReportClass], filter_func)[0]
+
+def convert_files(file_paths: Sequence[str]) -> None:
+    """Converts the files into columnar caches, reporting the failed ones."""
+    from logs_handler.utils.cache import convert
+
+    for file in file_paths:
+        try:
+            meta = convert(file)
+            print(f"Converted {file}: {meta.rows} rows, {meta.malformed_json} malformed lines skipped, columns {[column.name for column in meta.columns]}")
+        except (OSError, ValueError) as e:
+            print(f"Error while converting <{file}> file: {e}", file=sys.stderr)
+
+def print_results(file: str, reports: Sequence[Report], writer: ReportWriter, limit: Optional[int] = None, file_stats: Optional[FileStats] = None) -> None:
+    """Streams the rows of the reports of a file to the writer, timed as rendering when stats are collected."""
+    with Stopwatch(file_stats.stages["render"]) if file_stats is not None else nullcontext():
+        for report in reports:
+            writer.write(file, report.get_headers(), report.iter_table(limit))
+
+def print_diagnostics(diagnostics: Sequence[Diagnostics]) -> None:
+    """Prints the summaries of the files that had rejected lines to stderr."""
+    for file_diagnostics in diagnostics:
+        file_diagnostics.flush()
+        if file_diagnostics.total:
+            print(file_diagnostics.summary(), file=sys.stderr)
+
+def run(args: ParsedArgs) -> None:
+    """Builds and prints the reports requested on the command line."""
+    report_classes = [get_report_factory(report_type, args.top_k, args.normalize_urls, args.bucket, args.by_handler, args.group_by, args.aggregations, args.compact) for report_type in args.report_types]
+    options = RunOptions(decoder_backend=args.decoder, use_index=args.use_index, state_dir=args.state_dir, batch_size=args.batch_size, use_cache=args.use_cache, max_missing_fields=args.max_missing_fields)
+    file_stats = [FileStats(file) for file in args.input_files] if args.stats else None
+    diagnostics = [Diagnostics(file, args.error_samples, args.quarantine) for file in args.input_files]
+
+    if args.quarantine is not None:
+        # Every run starts a new quarantine file, rejected lines of all the files are appended to it.
+        open(args.quarantine, "wb").close()
+
+    if args.follow:
+        follow_reports(args.input_files, report_classes, args.line_filter, args.interval, options, args.quarantine, args.error_samples, args.output_format, args.limit)
+        return
+
+    writer = make_writer(args.output_format)
+
+    if args.server is not None:
+        try:
+            results = query_server(args.server, args.input_files, args.report_types, report_classes, args.line_filter, args.limit)
+        except (OSError, ValueError) as e:
+            print(f"Report server <{args.server}> not used ({e}), processing the files locally", file=sys.stderr)
+        else:
+            writer.begin()
+            for file, headers, rows in results:
+                writer.write(file, headers, rows)
+            writer.end()
+            sys.stdout.flush()
+            return
+
+    writer.begin()
+
+    if args.workers > 1 or args.read_concurrency > 1:
+        if args.workers > 1:
+            reports_by_file = collect_reports_parallel(args.input_files, report_classes, args.line_filter, args.workers, options, file_stats, diagnostics)
+        else:
+            reports_by_file = collect_reports_concurrent(args.input_files, report_classes, args.line_filter, args.read_concurrency, options, diagnostics)
+        for i, (file, reports) in enumerate(reports_by_file):
+            if isinstance(reports, ValueError):
+                print(f"Error while handling <{file}> file: {reports}", file=sys.stderr)
+                continue
+            print_results(file, reports, writer, args.limit, file_stats[i] if file_stats is not None else None)
+
+    else:
+        for i, file in enumerate(args.input_files):
+            stats = file_stats[i] if file_stats is not None else None
+            try:
+                print_results(file, collect_reports(file, report_classes, args.line_filter, options, stats, diagnostics[i]), writer, args.limit, stats)
+            except ValueError as e:
+                print(f"Error while handling <{file}> file: {e}", file=sys.stderr)
+                continue
+
+    writer.end()
+    sys.stdout.flush()
+    print_diagnostics(diagnostics)
+    if file_stats is not None:
+        emit_stats(file_stats, args.stats_json)
+
 def main():
+    if sys.argv[1:2] == [CONVERT_COMMAND]:
+        convert_files(parse_convert_args(init_convert_parser(), sys.argv[2:]).input_files)
+        return
+
+    if sys.argv[1:2] == [SERVE_COMMAND]:
+        try:
+            serve_reports(parse_serve_args(init_serve_parser(), sys.argv[2:]))
+        except KeyboardInterrupt:
+            print("\nServer stopped")
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     parser = init_parser()
     
     try:
         args = parse_args(parser)
 
-        match args.report_type:
-            case ReportType.AVERAGE:
-                for file in args.input_files:
-                    try:
-                        # For filtering: 
-                        # filter_func = lambda line: line.get("request_method") == "GET"
-                        table, headers = build_report(file, AvgResponseTime, args.date_filter)
-                        print_table(table, headers, file)
-                    except ValueError as e:
-                        print(f"Error while handling <{file}> file: {e}", file=sys.stderr)
-                        continue
-
-            case ReportType.USERAGENT:
-                for file in args.input_files:
-                    try:
-                        # For filtering: 
-                        # filter_func = lambda line: line.get("@timestamp") == "2025-06-22T13:57:32+00:00"
-                        table, headers = build_report(file, UserAgent)
-                        print_table(table, headers, file)
-                    except ValueError as e:
-                        print(f"Error while handling <{file}> file: {e}", file=sys.stderr)
-                        continue
+        if args.profile is None:
+            run(args)
+            return
+
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run, args)
+        finally:
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
         
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
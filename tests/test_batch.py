@@ -0,0 +1,90 @@
+from decimal import Decimal
+from functools import partial
+import json
+from pathlib import Path
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from main import build_reports
+from logs_handler.engine import RunOptions
+from logs_handler.reports import AvgResponseTime, CompactAvgResponseTime, UserAgent, Percentiles, UrlNormalizer
+from logs_handler.utils.columns import ColumnBatch
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+def random_lines(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        {
+            "url": f"/api/{rng.choice('abc')}/{rng.randint(1, 40)}",
+            "response_time": Decimal(str(round(rng.uniform(0.001, 2.0), 3))),
+            "http_user_agent": f"agent-{rng.randint(1, 9)}"
+        }
+        for _ in range(count)
+    ]
+
+def assert_tables_close(batch_table, line_table):
+    assert [row[:2] for row in batch_table] == [row[:2] for row in line_table]
+    for batch_row, line_row in zip(batch_table, line_table):
+        assert float(batch_row[2]) == pytest.approx(float(line_row[2]), rel=1e-9)
+
+def test_column_batch_factorize():
+    batch = ColumnBatch([{"url": "/a"}, {"url": "/b"}, {"url": "/a"}])
+
+    codes, uniques = batch.factorize("url")
+
+    assert codes.tolist() == [0, 1, 0]
+    assert uniques == ["/a", "/b"]
+    assert batch.factorize("url")[0] is codes
+
+def test_avg_batch_matches_line_path():
+    lines = random_lines(5000)
+    by_line, by_batch = AvgResponseTime(), AvgResponseTime()
+    for line in lines:
+        by_line.process_line(line)
+    for first in range(0, len(lines), 1024):
+        by_batch.process_batch(ColumnBatch(lines[first:first + 1024]))
+
+    assert_tables_close(by_batch.generate_table(), by_line.generate_table())
+
+def test_compact_avg_batch_is_exact():
+    lines = random_lines(5000, seed=2)
+    exact, by_batch = AvgResponseTime(), CompactAvgResponseTime()
+    for line in lines:
+        exact.process_line(line)
+    for first in range(0, len(lines), 1024):
+        by_batch.process_batch(ColumnBatch(lines[first:first + 1024]))
+
+    assert by_batch.generate_table() == exact.generate_table()
+
+def test_normalized_top_batch_matches_line_path():
+    lines = random_lines(3000, seed=4)
+    make_report = partial(AvgResponseTime, top_k=3, url_normalizer=UrlNormalizer())
+    by_line, by_batch = make_report(), make_report()
+    for line in lines:
+        by_line.process_line(line)
+    by_batch.process_batch(ColumnBatch(lines))
+
+    assert_tables_close(by_batch.generate_table(), by_line.generate_table())
+
+def test_user_agent_batch_matches_line_path():
+    lines = random_lines(2000, seed=2)
+    by_line, by_batch = UserAgent(), UserAgent()
+    for line in lines:
+        by_line.process_line(line)
+    by_batch.process_batch(ColumnBatch(lines))
+
+    assert by_batch.generate_table() == by_line.generate_table()
+
+def test_build_reports_batched():
+    log_file = FIXTURES_DIR / "valid.log"
+    report_classes = [AvgResponseTime, UserAgent, Percentiles]
+
+    by_batch = build_reports(str(log_file), report_classes, options=RunOptions(batch_size=7))
+    by_line = build_reports(str(log_file), report_classes)
+
+    assert_tables_close(by_batch[0][0], by_line[0][0])
+    assert by_batch[1] == by_line[1]
+    assert by_batch[2] == by_line[2]
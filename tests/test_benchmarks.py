@@ -0,0 +1,61 @@
+import json
+import pathlib
+
+from benchmarks.generator import GeneratorConfig, generate_lines, generate_log
+from benchmarks.harness import CaseResult, compare, measure_case
+
+def test_generator_is_deterministic(tmp_path: pathlib.Path):
+    config = GeneratorConfig(lines=3000, urls=30, user_agents=5, malformed_ratio=0.01, seed=3)
+    first, second, other = tmp_path / "first.log", tmp_path / "second.log", tmp_path / "other.log"
+
+    generate_log(str(first), config)
+    generate_log(str(second), config)
+    generate_log(str(other), GeneratorConfig(lines=3000, urls=30, user_agents=5, malformed_ratio=0.01, seed=4))
+
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != other.read_bytes()
+
+def test_generator_shape():
+    config = GeneratorConfig(lines=20000, urls=50, user_agents=7, malformed_ratio=0.02, span_seconds=3600)
+    entries, malformed = [], 0
+    for line in generate_lines(config):
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            malformed += 1
+
+    assert len(entries) + malformed == 20000
+    assert 300 < malformed < 500
+    assert len({entry["url"] for entry in entries}) <= 50
+    assert len({entry["http_user_agent"] for entry in entries}) == 7
+    timestamps = [entry["@timestamp"] for entry in entries]
+    assert timestamps == sorted(timestamps)
+    assert timestamps[0] == "2025-06-22T00:00:00+00:00" and timestamps[-1] < "2025-06-22T01:00:00+00:00"
+
+def test_compare_detects_regressions():
+    baseline = {
+        "load_json": {"name": "load_json", "lines": 1000, "seconds": 1.0, "first_output_seconds": 0.01, "peak_rss_kb": 1000},
+        "main": {"name": "main", "lines": 1000, "seconds": 1.0, "first_output_seconds": 0.5, "peak_rss_kb": 1000}
+    }
+    results = [
+        CaseResult("load_json", 1000, 1.1, 0.01, 1100),
+        CaseResult("main", 1000, 2.0, 0.5, 1500),
+        CaseResult("report:average", 1000, 5.0, 5.0, 9000)
+    ]
+
+    regressions = compare(results, baseline, threshold=0.2)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("main:") for regression in regressions)
+
+def test_measure_case(tmp_path: pathlib.Path):
+    log_file = tmp_path / "bench.log"
+    generate_log(str(log_file), GeneratorConfig(lines=2000))
+
+    result = measure_case("report:user-agent", str(log_file), 2000)
+
+    assert result.lines == 2000
+    assert result.lines_per_sec > 0
+    assert result.peak_rss_kb > 0
+    assert result.groups > 0
+    assert result.bytes_per_group > 0
@@ -0,0 +1,123 @@
+import json
+import os
+import pathlib
+import shutil
+from pathlib import Path
+from unittest import mock
+import pytest
+
+pytest.importorskip("numpy")
+
+from main import build_reports, build_reports_parallel
+from logs_handler.engine import RunOptions
+from logs_handler.reports import AvgResponseTime, UserAgent, Percentiles
+from logs_handler.utils.cache import convert, load_cache, cache_path
+from logs_handler.utils.filters import AcceptAll, DateFilter
+from logs_handler.utils.timestamps import parse_timestamp
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+REPORT_CLASSES = [AvgResponseTime, UserAgent, Percentiles]
+
+def copy_fixture(tmp_path: pathlib.Path, name: str) -> str:
+    path = tmp_path / name
+    shutil.copy(FIXTURES_DIR / name, path)
+    return str(path)
+
+def test_cached_run_matches_parsed_run(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    expected = build_reports(log_file, REPORT_CLASSES)
+
+    convert(log_file)
+    with mock.patch("logs_handler.engine.pipeline.read_json_lines") as read_mock:
+        results = build_reports(log_file, REPORT_CLASSES)
+
+    read_mock.assert_not_called()
+    assert results == expected
+
+def test_cached_run_with_filter_and_batches(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    date_filter = DateFilter(parse_timestamp("2025-06-22T13:57:30+00:00"), parse_timestamp("2025-06-22T13:57:33+00:00"))
+    options = RunOptions(batch_size=4)
+    expected = build_reports(log_file, [UserAgent], date_filter, options)
+
+    convert(log_file)
+
+    assert build_reports(log_file, [UserAgent], date_filter, options) == expected
+    assert build_reports(log_file, [UserAgent], date_filter) == expected
+
+def test_cache_loads_only_needed_columns(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    convert(log_file)
+    cache = load_cache(log_file)
+
+    with mock.patch.object(type(cache), "load", autospec=True, side_effect=type(cache).load) as load_mock:
+        with mock.patch("logs_handler.engine.pipeline.load_cache", return_value=cache):
+            build_reports(log_file, [UserAgent], AcceptAll())
+
+    assert [call.args[1] for call in load_mock.call_args_list] == ["http_user_agent"]
+
+def test_stale_cache_is_ignored(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    convert(log_file)
+
+    with open(log_file, "a") as file:
+        file.write("\n" + json.dumps({"url": "/new", "response_time": 1.5, "http_user_agent": "new-agent"}) + "\n")
+
+    assert load_cache(log_file) is None
+    assert ["new-agent", 1] in build_reports(log_file, [UserAgent])[0][0]
+
+def test_cache_of_invalid_log_fails_like_the_log(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "all_missing_fields.log")
+    with pytest.raises(ValueError) as parsed_error:
+        build_reports(log_file, [AvgResponseTime])
+
+    convert(log_file)
+    with pytest.raises(ValueError) as cached_error:
+        build_reports(log_file, [AvgResponseTime])
+
+    assert str(cached_error.value) == str(parsed_error.value)
+
+def test_convert_missing_and_mixed_fields(tmp_path: pathlib.Path):
+    log_file = tmp_path / "mixed.log"
+    lines = [
+        {"url": "/a", "status": 200, "extra": "x"},
+        {"url": "/b", "status": 404.5},
+        {"url": "/c", "status": 500, "extra": 1},
+        "not json"
+    ]
+    log_file.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n")
+
+    meta = convert(str(log_file))
+
+    assert (meta.rows, meta.total_lines, meta.malformed_json) == (3, 4, 1)
+    assert [column.name for column in meta.columns] == ["url", "status"]
+    assert meta.skipped_fields == ["extra"]
+    assert not meta.columns[1].integral
+    assert os.path.isdir(cache_path(str(log_file)))
+
+def test_cached_batches_keep_first_appearance_order(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ties.log"
+    log_file.write_text("\n".join([
+        '{"@timestamp": "2025-06-22T10:00:00+00:00", "url": "/a", "response_time": 0.1}',
+        '{"@timestamp": "2025-06-22T11:00:00+00:00", "url": "/b", "response_time": 0.1}',
+        '{"@timestamp": "2025-06-22T11:30:00+00:00", "url": "/a", "response_time": 0.1}',
+    ]) + "\n")
+    date_filter = DateFilter(parse_timestamp("2025-06-22T11:00:00+00:00"), None)
+    options = RunOptions(batch_size=100)
+    expected = build_reports(str(log_file), [AvgResponseTime], date_filter, RunOptions(batch_size=100, use_cache=False))
+
+    convert(str(log_file))
+
+    assert [row[0] for row in expected[0][0]] == ["/b", "/a"]
+    assert build_reports(str(log_file), [AvgResponseTime], date_filter, options) == expected
+
+def test_workers_read_the_cache(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    expected = build_reports(log_file, REPORT_CLASSES, options=RunOptions(use_cache=False))
+
+    convert(log_file)
+    with mock.patch("logs_handler.engine.parallel.process_chunk") as chunk_mock:
+        results = list(build_reports_parallel([log_file], REPORT_CLASSES, AcceptAll(), 2))
+
+    chunk_mock.assert_not_called()
+    assert results == [(log_file, expected)]
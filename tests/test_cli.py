@@ -3,7 +3,7 @@ import pathlib
 import pytest
 from unittest import mock
 
-from logs_handler.cli.parser import validate_path, validate_report_type, init_parser, parse_args, ReportType, ParsedArgs
+from logs_handler.cli.parser import validate_path, validate_report_type, validate_top, validate_max_missing_fields, validate_port, validate_read_concurrency, init_parser, parse_args, init_serve_parser, parse_serve_args, ReportType, ParsedArgs
 
 def test_validate_path_invalid():
     path = "./path/doesnt/exist.txt"
@@ -43,7 +43,7 @@ def test_parse_args_valid(tmp_path: pathlib.Path):
     assert isinstance(parsed_args, ParsedArgs)
     assert len(parsed_args.input_files) == 1
     assert parsed_args.input_files[0] == input_file_path
-    assert parsed_args.report_type == ReportType.AVERAGE
+    assert parsed_args.report_types == [ReportType.AVERAGE]
 
 def test_pars_args_multiple_files(tmp_path: pathlib.Path):
     test_file1 = tmp_path / "test_file1.txt"
@@ -61,7 +61,7 @@ def test_pars_args_multiple_files(tmp_path: pathlib.Path):
     
     assert len(parsed_args.input_files) == 2
     assert parsed_args.input_files == [str(test_file1), str(test_file2)]
-    assert parsed_args.report_type == ReportType.USERAGENT
+    assert parsed_args.report_types == [ReportType.USERAGENT]
 
 def test_parse_args_empty(capsys: pytest.CaptureFixture[str]):
     parser = init_parser()
@@ -103,4 +103,209 @@ def test_parse_args_invalid_report_type(capsys: pytest.CaptureFixture[str], tmp_
         
         assert excinfo.value.code == 2
         captured_error = capsys.readouterr().err
-        assert invalid_report_type in captured_error
\ No newline at end of file
+        assert invalid_report_type in captured_error
+
+def test_parse_args_multiple_report_types(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "user-agent", "average"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.report_types == [ReportType.AVERAGE, ReportType.USERAGENT]
+def test_parse_args_top(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--top", "10", "--normalize-urls"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.top_k == 10
+    assert parsed_args.normalize_urls
+
+def test_validate_top_invalid():
+    with pytest.raises(argparse.ArgumentTypeError):
+        validate_top("0")
+
+def test_parse_args_stats_json_implies_stats(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--stats-json", "-"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.stats
+    assert parsed_args.stats_json == "-"
+    assert parsed_args.profile is None
+
+def test_parse_args_stats_with_follow(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--follow", "--stats"]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
+
+def test_parse_args_diagnostics(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--quarantine", "rejected.log", "--max-missing-fields", "0", "--error-samples", "3"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.quarantine == "rejected.log"
+    assert parsed_args.max_missing_fields == 0
+    assert parsed_args.error_samples == 3
+
+def test_validate_max_missing_fields_invalid():
+    with pytest.raises(argparse.ArgumentTypeError):
+        validate_max_missing_fields("-1")
+
+def test_parse_args_format_and_limit(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--format", "csv", "--limit", "5"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.output_format == "csv"
+    assert parsed_args.limit == 5
+
+def test_parse_args_invalid_format(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--format", "xml"]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
+
+def test_parse_serve_args(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parsed_args = parse_serve_args(init_serve_parser(), ["-f", str(test_file), "--port", "0", "--group-by", "status", "--max-missing-fields", "0"])
+
+    assert parsed_args.port == 0
+    assert parsed_args.max_missing_fields == 0
+    assert parsed_args.socket is None
+    assert parsed_args.report_types == list(ReportType)
+
+def test_parse_serve_args_requires_one_address(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    for address in ([], ["--port", "8080", "--socket", "reports.sock"]):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_serve_args(init_serve_parser(), ["-f", str(test_file)] + address)
+        assert excinfo.value.code == 2
+
+def test_validate_port_invalid():
+    for port in ("-1", "65536", "http"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            validate_port(port)
+
+def test_parse_args_server_with_workers(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--server", "reports.sock", "-w", "2"]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
+
+def test_validate_path_standard_input():
+    assert validate_path("-") == "-"
+
+def test_parse_args_standard_input_twice(tmp_path: pathlib.Path):
+    parser = init_parser()
+    args = ["main.py", "-f", "-", "-", "-r", "average"]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
+
+def test_parse_args_standard_input_with_follow():
+    parser = init_parser()
+    args = ["main.py", "-f", "-", "-r", "average", "--follow"]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
+
+def test_follow_rejects_compressed_files(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]):
+    compressed_file = tmp_path / "access.log.gz"
+    compressed_file.write_bytes(b"")
+
+    with mock.patch("sys.argv", ["main.py", "-f", str(compressed_file), "-r", "average", "--follow"]):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(init_parser())
+    assert excinfo.value.code == 2
+    assert "Compressed files cannot be followed by --follow" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit) as excinfo:
+        parse_serve_args(init_serve_parser(), ["-f", str(compressed_file), "--port", "0"])
+    assert excinfo.value.code == 2
+
+def test_parse_args_read_concurrency(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-", "-r", "average", "--read-concurrency", "4"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.read_concurrency == 4
+    assert parsed_args.input_files == [str(test_file), "-"]
+
+def test_validate_read_concurrency_invalid():
+    for value in ("0", "-2", "many"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            validate_read_concurrency(value)
+
+def test_parse_args_read_concurrency_with_workers(tmp_path: pathlib.Path):
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("test content")
+
+    parser = init_parser()
+    args = ["main.py", "-f", str(test_file), "-r", "average", "--read-concurrency", "2", "-w", "2"]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
@@ -0,0 +1,41 @@
+from decimal import Decimal
+import pytest
+
+from logs_handler.utils import make_decoder, available_decoders
+from logs_handler.utils.decoders import MsgspecDecoder
+
+LINE = b'{"@timestamp": "2025-06-22T13:57:32+00:00", "status": 200, "url": "/api/context/...", "request_method": "GET", "response_time": 0.024, "http_user_agent": "..."}'
+
+@pytest.mark.parametrize("backend", available_decoders())
+def test_decode_exact_decimals(backend: str):
+    decoder = make_decoder(backend, exact_decimals=True)
+    data = decoder.decode(LINE)
+
+    assert data["response_time"] == Decimal("0.024")
+    assert data["status"] == 200
+    assert data["url"] == "/api/context/..."
+
+@pytest.mark.parametrize("backend", available_decoders())
+def test_decode_floats(backend: str):
+    decoder = make_decoder(backend, fields=["http_user_agent", "response_time"], exact_decimals=False)
+    data = decoder.decode(LINE)
+
+    assert type(data["response_time"]) is float
+    assert data["http_user_agent"] == "..."
+
+@pytest.mark.parametrize("backend", available_decoders())
+def test_decode_malformed(backend: str):
+    decoder = make_decoder(backend)
+
+    with pytest.raises(decoder.ERRORS):
+        decoder.decode(LINE[:-1])
+
+def test_msgspec_decodes_only_requested_fields():
+    pytest.importorskip("msgspec")
+    decoder = make_decoder(MsgspecDecoder.NAME, fields=["url", "@timestamp", "missing"])
+
+    assert decoder.decode(LINE) == {"url": "/api/context/...", "@timestamp": "2025-06-22T13:57:32+00:00"}
+
+def test_make_decoder_unknown_backend():
+    with pytest.raises(ValueError):
+        make_decoder("gibberish")
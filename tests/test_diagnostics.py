@@ -0,0 +1,110 @@
+import json
+import os
+import pathlib
+from unittest import mock
+import pytest
+
+from main import build_reports, build_reports_parallel
+from logs_handler.engine import RunOptions
+from logs_handler.reports import AvgResponseTime
+from logs_handler.utils import Diagnostics
+from logs_handler.utils.diagnostics import MALFORMED_JSON, MISSING_FIELDS
+from logs_handler.utils.filters import AcceptAll
+
+MALFORMED_EVERY = 100
+MISSING_EVERY = 150
+
+def write_log(path: pathlib.Path, lines_count: int) -> None:
+    """Writes a log with a malformed line every MALFORMED_EVERY lines and an incomplete one every MISSING_EVERY lines otherwise."""
+    with open(path, "w") as file:
+        for i in range(1, lines_count + 1):
+            line = {
+                "@timestamp": f"2025-06-22T13:57:{i % 60:02d}+00:00",
+                "url": f"/api/handler/{i % 7}",
+                "response_time": 0.017
+            }
+            if i % MALFORMED_EVERY == 0:
+                file.write(f"{{broken {i}\n")
+                continue
+            if i % MISSING_EVERY == 0:
+                del line["url"]
+            file.write(json.dumps(line) + "\n")
+
+def expected_rejected(lines_count: int) -> list:
+    return [i for i in range(1, lines_count + 1) if i % MALFORMED_EVERY == 0 or i % MISSING_EVERY == 0]
+
+def test_counts_and_bounded_samples(tmp_path: pathlib.Path):
+    log_file = tmp_path / "mixed.log"
+    write_log(log_file, 2000)
+    diagnostics = Diagnostics(str(log_file), sample_size=4)
+
+    build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=0), diagnostics=diagnostics)
+
+    assert diagnostics.counts == {MALFORMED_JSON: 20, MISSING_FIELDS: 7}
+    assert diagnostics.missing_by_field == {"url": 7}
+    assert [sample.line_num for sample in diagnostics.samples] == [100, 150, 200, 300]
+    assert diagnostics.samples[0].text == "{broken 100"
+    assert "27 rejected" in diagnostics.summary()
+
+def test_quarantine_keeps_rejected_lines(tmp_path: pathlib.Path):
+    log_file = tmp_path / "mixed.log"
+    write_log(log_file, 2000)
+    quarantine = tmp_path / "rejected.log"
+    diagnostics = Diagnostics(str(log_file), quarantine_path=str(quarantine))
+
+    build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=0), diagnostics=diagnostics)
+    diagnostics.flush()
+
+    lines = log_file.read_text().splitlines()
+    assert quarantine.read_text().splitlines() == [lines[i - 1] for i in expected_rejected(2000)]
+
+def test_parallel_quarantine_merged_in_file_order(tmp_path: pathlib.Path):
+    log_file = tmp_path / "mixed.log"
+    write_log(log_file, 3000)
+    quarantine = tmp_path / "rejected.log"
+    diagnostics = Diagnostics(str(log_file), quarantine_path=str(quarantine))
+
+    with mock.patch("logs_handler.engine.parallel.MIN_CHUNK_SIZE", 4096):
+        results = list(build_reports_parallel([str(log_file)], [AvgResponseTime], AcceptAll(), 4, RunOptions(max_missing_fields=0), diagnostics=[diagnostics]))
+    diagnostics.flush()
+
+    assert not isinstance(results[0][1], ValueError)
+    assert diagnostics.counts == {MALFORMED_JSON: 30, MISSING_FIELDS: 10}
+    lines = log_file.read_text().splitlines()
+    assert quarantine.read_text().splitlines() == [lines[i - 1] for i in expected_rejected(3000)]
+    # The part files of the chunks are removed once merged.
+    assert sorted(os.listdir(tmp_path)) == ["mixed.log", "rejected.log"]
+
+def test_missing_fields_threshold(tmp_path: pathlib.Path):
+    log_file = tmp_path / "mixed.log"
+    write_log(log_file, 2000)
+
+    with pytest.raises(ValueError, match="wrong structure"):
+        build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=5))
+
+    build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=8))
+    build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=0))
+
+def test_missing_fields_threshold_on_cache(tmp_path: pathlib.Path):
+    pytest.importorskip("numpy")
+    from logs_handler.utils.cache import convert
+
+    log_file = tmp_path / "mixed.log"
+    write_log(log_file, 2000)
+    convert(str(log_file))
+    diagnostics = Diagnostics(str(log_file))
+
+    with pytest.raises(ValueError, match="wrong structure"):
+        build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=5))
+
+    build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=0), diagnostics=diagnostics)
+    assert diagnostics.counts == {MALFORMED_JSON: 20, MISSING_FIELDS: 7}
+    assert diagnostics.samples == []
+
+def test_no_output_per_rejected_line(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]):
+    log_file = tmp_path / "mixed.log"
+    write_log(log_file, 2000)
+
+    build_reports(str(log_file), [AvgResponseTime], options=RunOptions(max_missing_fields=0), diagnostics=Diagnostics(str(log_file)))
+
+    assert capsys.readouterr().err == ""
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+import json
+import pathlib
+from pathlib import Path
+from unittest import mock
+import pytest
+
+from main import build_reports
+from logs_handler.cli.parser import init_parser, parse_args
+from logs_handler.reports import AvgResponseTime, UserAgent
+from logs_handler.utils.filters import DateFilter
+from logs_handler.utils.timestamps import find_time_offset, timestamp_key
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+START = datetime(2025, 6, 20, 22, 0, tzinfo=timezone.utc)
+
+def write_ordered_log(path: pathlib.Path, hours: int) -> None:
+    with open(path, "w") as file:
+        for i in range(hours * 6):
+            timestamp = START + timedelta(minutes=10 * i)
+            line = {"@timestamp": timestamp.isoformat(), "url": f"/api/{i % 4}", "response_time": 0.5, "http_user_agent": "curl"}
+            file.write(json.dumps(line) + "\n")
+            if i % 5 == 0:
+                file.write("not a json line\n")
+
+def test_parse_args_date_day(tmp_path: pathlib.Path):
+    parser = init_parser()
+    args = ["main.py", "-f", str(FIXTURES_DIR / "valid.log"), "-r", "average", "--date", "2025-06-22"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.date_filter == DateFilter(datetime(2025, 6, 22, tzinfo=timezone.utc), datetime(2025, 6, 23, tzinfo=timezone.utc))
+
+def test_parse_args_date_with_range(capsys: pytest.CaptureFixture[str]):
+    parser = init_parser()
+    args = ["main.py", "-f", str(FIXTURES_DIR / "valid.log"), "-r", "average", "--date", "2025-06-22", "--from", "2025-06-21"]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
+    assert "--from" in capsys.readouterr().err
+
+def test_date_filter_bounds():
+    date_filter = DateFilter(datetime(2025, 6, 22, 13, 0, tzinfo=timezone.utc), datetime(2025, 6, 22, 14, 0, tzinfo=timezone.utc))
+
+    assert date_filter({"@timestamp": "2025-06-22T13:00:00+00:00"})
+    assert date_filter({"@timestamp": "2025-06-22T15:30:00+02:00"})
+    assert not date_filter({"@timestamp": "2025-06-22T14:00:00+00:00"})
+    assert not date_filter({"url": "/api/..."})
+
+def test_prefilter_rejects_raw_lines():
+    date_filter = DateFilter.for_day(datetime(2025, 6, 22, tzinfo=timezone.utc))
+    prefilter = date_filter.get_prefilter()
+
+    assert prefilter(b'{"@timestamp": "2025-06-22T13:57:32+00:00", "url": "/"}')
+    assert not prefilter(b'{"@timestamp": "2025-06-21T13:57:32+00:00", "url": "/"}')
+    assert prefilter(b'{"@timestamp":"2025-06-23T01:00:00+02:00"}')
+    assert prefilter(b'{"url": "/"}')
+
+@pytest.mark.parametrize("timestamp", ["2025-06-22 13:57:32+00:00", "2025-06-22t13:57:32Z", "2025-06-22T13:57Z", "2025-06-22 13:57:32.250Z", "2025-06-22 15:57:32+02:00"])
+def test_prefilter_keeps_other_timestamp_forms(timestamp: str):
+    date_filter = DateFilter(datetime(2025, 6, 22, 13, tzinfo=timezone.utc), datetime(2025, 6, 22, 14, tzinfo=timezone.utc))
+    line = f'{{"@timestamp": "{timestamp}", "url": "/"}}'.encode()
+
+    assert date_filter(json.loads(line))
+    assert date_filter.get_prefilter()(line)
+    assert timestamp_key(line) in (b"2025-06-22T13:57:32", b"2025-06-22T13:57:00")
+
+def test_timestamp_key_converts_offsets():
+    assert timestamp_key(b'{"@timestamp": "2025-06-22T01:00:00+02:00"}') == b"2025-06-21T23:00:00"
+    assert timestamp_key(b'{"@timestamp": "garbage"}') is None
+
+def test_find_time_offset(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    write_ordered_log(log_file, 10)
+    content = log_file.read_bytes()
+
+    offset = find_time_offset(str(log_file), b"2025-06-21T00:00:00")
+
+    assert content[offset:].startswith(b'{"@timestamp": "2025-06-21T00:00:00+00:00"')
+    assert find_time_offset(str(log_file), b"2000-01-01T00:00:00") == 0
+    assert find_time_offset(str(log_file), b"2100-01-01T00:00:00") == len(content)
+
+def test_time_ordered_range_same_as_full_scan(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    write_ordered_log(log_file, 30)
+    day = datetime(2025, 6, 21, tzinfo=timezone.utc)
+    report_classes = [AvgResponseTime, UserAgent]
+
+    scanned = build_reports(str(log_file), report_classes, DateFilter.for_day(day))
+    searched = build_reports(str(log_file), report_classes, DateFilter.for_day(day, time_ordered=True))
+
+    assert searched == scanned
+    assert scanned[1][0] == [["curl", 24 * 6]]
@@ -0,0 +1,146 @@
+import json
+import os
+import pathlib
+import time
+from typing import Any, Dict
+from unittest import mock
+
+from logs_handler.engine import Follower
+from logs_handler.engine.follow import FileTailer
+from main import get_report_factory
+from logs_handler.reports import UserAgent
+from logs_handler.reports.registry import BUILTIN_REPORTS
+from logs_handler.utils.filters import AcceptAll
+
+def log_line(user_agent: str) -> str:
+    return json.dumps({"@timestamp": "2025-06-22T13:57:32+00:00", "url": "/api/...", "response_time": 0.1, "http_user_agent": user_agent}) + "\n"
+
+def test_tailer_returns_complete_lines(tmp_path: pathlib.Path):
+    log_file = tmp_path / "tailed.log"
+    log_file.write_text("first\nsec")
+    tailer = FileTailer(str(log_file))
+
+    assert tailer.poll() == [b"first"]
+
+    with open(log_file, "a") as file:
+        file.write("ond\nthird\n")
+
+    assert tailer.poll() == [b"second", b"third"]
+    assert tailer.poll() == []
+    tailer.close()
+
+def test_tailer_flushes_idle_last_line(tmp_path: pathlib.Path):
+    log_file = tmp_path / "tailed.log"
+    log_file.write_text("first\nlast")
+    tailer = FileTailer(str(log_file))
+
+    assert tailer.poll() == [b"first"]
+    assert tailer.poll() == []
+    assert tailer.poll() == [b"last"]
+    assert tailer.poll() == []
+    tailer.close()
+
+def test_tailer_handles_truncation(tmp_path: pathlib.Path):
+    log_file = tmp_path / "tailed.log"
+    log_file.write_text("first line\nsecond line\n")
+    tailer = FileTailer(str(log_file))
+    tailer.poll()
+
+    log_file.write_text("new\n")
+
+    assert tailer.poll() == [b"new"]
+    tailer.close()
+
+def test_tailer_handles_rotation(tmp_path: pathlib.Path):
+    log_file = tmp_path / "tailed.log"
+    log_file.write_text("first\n")
+    tailer = FileTailer(str(log_file))
+    tailer.poll()
+
+    with open(log_file, "a") as file:
+        file.write("last of old\n")
+    os.rename(log_file, tmp_path / "tailed.log.1")
+    log_file.write_text("first of new\n")
+
+    assert tailer.poll() == [b"last of old", b"first of new"]
+    tailer.close()
+
+def test_tailer_keeps_partial_line_on_rotation_and_truncation(tmp_path: pathlib.Path):
+    log_file = tmp_path / "tailed.log"
+    log_file.write_text("first\nunfinished")
+    tailer = FileTailer(str(log_file))
+    assert tailer.poll() == [b"first"]
+
+    os.rename(log_file, tmp_path / "tailed.log.1")
+    log_file.write_text("first of new\nhalf")
+    assert tailer.poll() == [b"unfinished", b"first of new"]
+
+    log_file.write_text("new\n")
+    assert tailer.poll() == [b"half", b"new"]
+    assert tailer.poll() == []
+    tailer.close()
+
+def test_follower_updates_reports(tmp_path: pathlib.Path):
+    log_file = tmp_path / "followed.log"
+    log_file.write_text(log_line("curl") + "not json\n")
+    follower = Follower([str(log_file)], [UserAgent], AcceptAll())
+
+    follower.poll_once()
+    with open(log_file, "a") as file:
+        file.write(log_line("curl") + log_line("firefox"))
+    follower.poll_once()
+
+    [(path, [(table, headers)])] = follower.snapshot()
+    assert path == str(log_file)
+    assert table == [["curl", 2], ["firefox", 1]]
+    assert headers == UserAgent.HEADERS
+
+def test_follower_background_thread(tmp_path: pathlib.Path):
+    log_file = tmp_path / "followed.log"
+    log_file.write_text(log_line("curl"))
+    follower = Follower([str(log_file)], [UserAgent], AcceptAll(), poll_interval=0.01)
+
+    follower.start()
+    try:
+        deadline = time.monotonic() + 5
+        while follower.snapshot()[0][1][0][0] != [["curl", 1]] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        follower.stop()
+
+    assert follower.snapshot()[0][1][0][0] == [["curl", 1]]
+
+def test_follower_decodes_and_renders_outside_the_lock(tmp_path: pathlib.Path):
+    log_file = tmp_path / "followed.log"
+    log_file.write_text(log_line("curl") * 3)
+    follower = Follower([str(log_file)], [UserAgent], AcceptAll())
+    followed = follower.files[0]
+    locked_while = []
+
+    def keep_line(line: Dict[str, Any]) -> bool:
+        locked_while.append(followed.lock.locked())
+        return True
+
+    def render(report: UserAgent, limit: Any = None) -> Any:
+        locked_while.append(followed.lock.locked())
+        return iter([])
+
+    followed.filter_func = keep_line
+    follower.poll_once()
+    with mock.patch.object(UserAgent, "iter_table", autospec=True, side_effect=render):
+        follower.snapshot()
+
+    assert locked_while == [False] * 4
+    assert follower.snapshot()[0][1][0][0] == [["curl", 3]]
+
+def test_follower_copies_every_builtin_report(tmp_path: pathlib.Path):
+    log_file = tmp_path / "followed.log"
+    with open(log_file, "w") as file:
+        for i in range(20):
+            file.write(json.dumps({"@timestamp": "2025-06-22T13:57:32+00:00", "url": f"/api/{i % 3}", "status": 200, "response_time": 0.1, "http_user_agent": "curl"}) + "\n")
+    factories = [get_report_factory(name, group_by=["url"], aggregations=["count"]) for name in BUILTIN_REPORTS]
+    follower = Follower([str(log_file)], factories, AcceptAll())
+
+    follower.poll_once()
+
+    assert [table for table, _ in follower.snapshot()[0][1]] == [list(report.iter_table()) for report in follower.files[0].reports]
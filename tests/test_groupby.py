@@ -0,0 +1,171 @@
+from functools import partial
+import pathlib
+from pathlib import Path
+import json
+import random
+from unittest import mock
+import pytest
+
+from main import build_reports, build_reports_parallel, get_report_factory
+from logs_handler.cli.parser import init_parser, parse_args, ReportType
+from logs_handler.engine import RunOptions
+from logs_handler.reports import GroupBy, UrlNormalizer
+from logs_handler.reports.groupby import Aggregation
+from logs_handler.utils.diagnostics import Diagnostics, INVALID_VALUES
+from logs_handler.utils.filters import AcceptAll
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+def random_lines(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        {
+            "url": f"/api/{rng.choice('abc')}/{rng.randint(1, 9)}",
+            "status": rng.choice([200, 404, 500]),
+            "request_method": rng.choice(["GET", "POST"]),
+            "response_time": round(rng.uniform(0.001, 2.0), 3)
+        }
+        for _ in range(count)
+    ]
+
+def test_aggregation_parse():
+    assert Aggregation.parse("count") == Aggregation("count")
+    assert Aggregation.parse(" avg:response_time") == Aggregation("avg", "response_time")
+    assert Aggregation.parse("max:response_time").header == "max_response_time"
+    for spec in ["median:response_time", "avg", "count:url"]:
+        with pytest.raises(ValueError):
+            Aggregation.parse(spec)
+
+def test_groupby_aggregates():
+    report = GroupBy(["url", "status"], ["count", "avg:response_time", "min:response_time", "max:response_time", "sum:response_time"])
+    for line in [
+        {"url": "/a", "status": 200, "response_time": 0.5},
+        {"url": "/a", "status": 200, "response_time": 1.5},
+        {"url": "/a", "status": 500, "response_time": 3.0},
+    ]:
+        report.process_line(line)
+
+    assert report.get_headers() == ["url", "status", "count", "avg_response_time", "min_response_time", "max_response_time", "sum_response_time"]
+    assert report.generate_table() == [["/a", 200, 2, 1.0, 0.5, 1.5, 2.0], ["/a", 500, 1, 3.0, 3.0, 3.0, 3.0]]
+    assert report.get_required_fields() == ["url", "status", "response_time"]
+
+def test_groupby_single_key_orders_by_first_aggregation():
+    report = GroupBy(["url"], ["max:response_time", "count"])
+    report.process_line({"url": "/slow", "response_time": 2.0})
+    report.process_line({"url": "/fast", "response_time": 0.1})
+    report.process_line({"url": "/fast", "response_time": 0.2})
+
+    assert report.generate_table() == [["/slow", 2.0, 1], ["/fast", 0.2, 2]]
+
+def test_groupby_limit_selects_top():
+    lines = random_lines(3000)
+    full, limited = GroupBy(["url", "request_method"]), GroupBy(["url", "request_method"], limit=5)
+    for line in lines:
+        full.process_line(line)
+        limited.process_line(line)
+
+    assert [row[-1] for row in limited.generate_table()] == [row[-1] for row in full.generate_table()[:5]]
+
+def test_groupby_merge():
+    lines = random_lines(2000, seed=2)
+    make_report = partial(GroupBy, ["url", "status"], ["count", "avg:response_time", "max:response_time", "min:response_time"])
+    whole, first, second = make_report(), make_report(), make_report()
+    for line in lines:
+        whole.process_line(line)
+    for line in lines[:500]:
+        first.process_line(line)
+    for line in lines[500:]:
+        second.process_line(line)
+
+    first.merge(second)
+
+    merged_table, whole_table = sorted(first.generate_table()), sorted(whole.generate_table())
+    assert [row[:3] for row in merged_table] == [row[:3] for row in whole_table]
+    for merged_row, whole_row in zip(merged_table, whole_table):
+        assert merged_row[3:] == pytest.approx(whole_row[3:])
+
+def test_groupby_normalizes_urls():
+    report = GroupBy(["url"], url_normalizer=UrlNormalizer())
+    report.process_line({"url": "/api/users/1"})
+    report.process_line({"url": "/api/users/2"})
+
+    assert report.generate_table() == [["/api/users/{id}", 2]]
+
+def test_groupby_batch_matches_line_path():
+    pytest.importorskip("numpy")
+    from logs_handler.utils.columns import ColumnBatch
+
+    lines = random_lines(5000, seed=3)
+    make_report = partial(GroupBy, ["url", "status", "request_method"], ["count", "avg:response_time", "min:response_time", "max:response_time"], url_normalizer=UrlNormalizer())
+    by_line, by_batch = make_report(), make_report()
+    for line in lines:
+        by_line.process_line(line)
+    for first in range(0, len(lines), 1024):
+        by_batch.process_batch(ColumnBatch(lines[first:first + 1024]))
+
+    line_table, batch_table = sorted(by_line.generate_table()), sorted(by_batch.generate_table())
+    assert [row[:4] for row in batch_table] == [row[:4] for row in line_table]
+    for batch_row, line_row in zip(batch_table, line_table):
+        assert batch_row[4:] == pytest.approx(line_row[4:])
+
+def test_groupby_parallel_matches_serial():
+    log_file = str(FIXTURES_DIR / "valid.log")
+    factory = get_report_factory(ReportType.GROUPBY, group_by=["url", "status"], aggregations=["count", "max:response_time"])
+
+    serial = build_reports(log_file, [factory], AcceptAll(), RunOptions(use_cache=False))
+    parallel = list(build_reports_parallel([log_file], [factory], AcceptAll(), 3, RunOptions(use_cache=False)))
+
+    assert parallel == [(log_file, serial)]
+    assert sum(row[2] for row in serial[0][0]) == 20
+
+@pytest.mark.parametrize("batch_size", [0, 100])
+def test_groupby_sums_do_not_depend_on_chunking(tmp_path: pathlib.Path, batch_size: int):
+    rng = random.Random(4)
+    log_file = tmp_path / "big.log"
+    log_file.write_text("".join(
+        json.dumps({"url": line["url"], "status": line["status"], "response_time": round(rng.uniform(0, 100000), 6)}) + "\n"
+        for line in random_lines(20000, seed=4)
+    ))
+    factory = get_report_factory(ReportType.GROUPBY, group_by=["status"], aggregations=["count", "sum:response_time", "avg:response_time"])
+    options = RunOptions(batch_size=batch_size, use_cache=False)
+
+    serial = build_reports(str(log_file), [factory], AcceptAll(), options)
+    with mock.patch("logs_handler.engine.parallel.MIN_CHUNK_SIZE", 4096):
+        parallel = list(build_reports_parallel([str(log_file)], [factory], AcceptAll(), 4, options))
+
+    assert parallel == [(str(log_file), serial)]
+
+@pytest.mark.parametrize("batch_size", [0, 100])
+def test_groupby_skips_invalid_values(tmp_path: pathlib.Path, batch_size: int):
+    log_file = tmp_path / "mixed.log"
+    log_file.write_text("\n".join([
+        '{"url": "/a", "status": 200, "response_time": 0.5}',
+        '{"url": "/a", "status": 200, "response_time": null}',
+        '{"url": "/a", "status": 200, "response_time": "slow"}',
+        '{"url": ["/a", "/b"], "status": 200, "response_time": 0.1}',
+        '{"url": "/a", "status": 200, "response_time": "1.5"}',
+    ]) + "\n")
+    diagnostics = Diagnostics(str(log_file))
+    factory = get_report_factory(ReportType.GROUPBY, group_by=["url", "status"], aggregations=["count", "avg:response_time"])
+
+    results = build_reports(str(log_file), [factory], AcceptAll(), RunOptions(batch_size=batch_size, use_cache=False), diagnostics=diagnostics)
+
+    assert results[0][0] == [["/a", 200, 2, 1.0]]
+    assert diagnostics.counts == {INVALID_VALUES: 3}
+
+def test_parse_args_groupby(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]):
+    log_file = tmp_path / "access.log"
+    log_file.write_text("")
+    parser = init_parser()
+    args = ["main.py", "-f", str(log_file), "-r", "groupby", "--group-by", "url,status", "--agg", "count,avg:response_time"]
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.group_by == ["url", "status"]
+    assert parsed_args.aggregations == ["count", "avg:response_time"]
+
+    with mock.patch("sys.argv", args[:5]):
+        with pytest.raises(SystemExit):
+            parse_args(parser)
+    assert "requires --group-by" in capsys.readouterr().err
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+import json
+import pathlib
+from unittest import mock
+
+from main import build_reports
+from logs_handler.engine import RunOptions, plan_chunks
+from logs_handler.reports import AvgResponseTime, UserAgent
+from logs_handler.utils.filters import DateFilter
+from logs_handler.utils.index import ensure_index, load_index, index_path
+
+START = datetime(2025, 6, 20, 22, 0, tzinfo=timezone.utc)
+
+def log_lines(first: int, last: int, step_minutes: int = 10) -> str:
+    lines = []
+    for i in range(first, last):
+        timestamp = START + timedelta(minutes=step_minutes * i)
+        line = {"@timestamp": timestamp.isoformat(), "url": f"/api/{i % 4}", "response_time": 0.5, "http_user_agent": "curl"}
+        lines.append(json.dumps(line) + "\n")
+    return "".join(lines)
+
+def test_ensure_index_builds_sidecar(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    log_file.write_text(log_lines(0, 60))
+
+    index = ensure_index(str(log_file))
+
+    assert index is not None
+    assert load_index(str(log_file)) == index
+    assert index.time_ordered
+    assert index.line_count == 60
+    assert [bucket.hour for bucket in index.buckets][:3] == ["2025-06-20T22", "2025-06-20T23", "2025-06-21T00"]
+    assert all(bucket.lines == 6 for bucket in index.buckets)
+    assert log_file.read_bytes()[index.buckets[2].offset:].startswith(b'{"@timestamp": "2025-06-21T00:00:00+00:00"')
+
+def test_ensure_index_reuses_fresh_index(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    log_file.write_text(log_lines(0, 60))
+    ensure_index(str(log_file))
+
+    with mock.patch("logs_handler.utils.index._scan") as scan_mock:
+        ensure_index(str(log_file))
+
+    scan_mock.assert_not_called()
+
+def test_ensure_index_extends_appended_file(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    full_file = tmp_path / "full.log"
+    log_file.write_text(log_lines(0, 40))
+    full_file.write_text(log_lines(0, 100))
+    ensure_index(str(log_file))
+
+    with open(log_file, "a") as file:
+        file.write(log_lines(40, 100))
+
+    extended = ensure_index(str(log_file))
+    rebuilt = ensure_index(str(full_file))
+
+    assert extended.buckets == rebuilt.buckets
+    assert extended.line_count == rebuilt.line_count == 100
+
+def test_ensure_index_rebuilds_rotated_file(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    log_file.write_text(log_lines(0, 60))
+    ensure_index(str(log_file))
+
+    log_file.write_text(log_lines(200, 206))
+    index = ensure_index(str(log_file))
+
+    assert index.line_count == 6
+    assert index.buckets[0].offset == 0
+
+def test_index_detects_unordered_file(tmp_path: pathlib.Path):
+    log_file = tmp_path / "unordered.log"
+    log_file.write_text(log_lines(30, 60) + log_lines(0, 30))
+
+    assert not ensure_index(str(log_file)).time_ordered
+
+def test_build_reports_with_index(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    log_file.write_text(log_lines(0, 30 * 6))
+    date_filter = DateFilter(datetime(2025, 6, 21, 3, 30, tzinfo=timezone.utc), datetime(2025, 6, 21, 17, 0, tzinfo=timezone.utc))
+    report_classes = [AvgResponseTime, UserAgent]
+
+    indexed = build_reports(str(log_file), report_classes, date_filter, RunOptions(use_index=True))
+
+    assert pathlib.Path(index_path(str(log_file))).exists()
+    assert indexed == build_reports(str(log_file), report_classes, date_filter)
+    assert indexed[1][0] == [["curl", 81]]
+
+def test_plan_chunks_with_index(tmp_path: pathlib.Path):
+    log_file = tmp_path / "ordered.log"
+    log_file.write_text(log_lines(0, 30 * 6))
+    index = ensure_index(str(log_file))
+
+    chunks = plan_chunks(str(log_file), 4000, index=index)
+    offsets = {bucket.offset for bucket in index.buckets}
+
+    assert len(chunks) > 1
+    assert chunks[-1][1] == log_file.stat().st_size
+    assert all(start in offsets for start, _end in chunks[1:])
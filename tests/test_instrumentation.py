@@ -0,0 +1,111 @@
+import json
+import pathlib
+from pathlib import Path
+import shutil
+from unittest import mock
+import pytest
+
+import main
+from main import build_reports, build_reports_parallel
+from logs_handler.engine import FileStats, RunOptions, StageStats, Stopwatch, emit_stats
+from logs_handler.reports import AvgResponseTime, UserAgent
+from logs_handler.utils.filters import AcceptAll, DateFilter
+from logs_handler.utils.timestamps import parse_timestamp
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+REPORT_CLASSES = [AvgResponseTime, UserAgent]
+
+def copy_fixture(tmp_path: pathlib.Path, name: str) -> str:
+    path = tmp_path / name
+    shutil.copy(FIXTURES_DIR / name, path)
+    return str(path)
+
+def test_stats_are_collected(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    stats = FileStats(log_file)
+
+    results = build_reports(log_file, REPORT_CLASSES, AcceptAll(), RunOptions(use_cache=False), stats)
+
+    assert results == build_reports(log_file, REPORT_CLASSES, AcceptAll(), RunOptions(use_cache=False))
+    assert stats.bytes_read == Path(log_file).stat().st_size + 1
+    assert stats.load.total_lines == stats.load.valid_lines == stats.entries == stats.kept_entries
+    assert stats.wall > 0 and stats.lines_per_sec > 0
+    assert stats.stages["aggregate"].items == stats.kept_entries
+    assert stats.stages["render"].wall > 0
+    assert sum(stage.wall for name, stage in stats.stages.items() if name != "render") <= stats.wall
+
+def test_stats_count_filtered_entries(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    stats = FileStats(log_file)
+
+    build_reports(log_file, REPORT_CLASSES, lambda line: line["url"] == "/api/context/...", RunOptions(use_cache=False), stats)
+
+    assert 0 < stats.kept_entries < stats.entries
+    assert stats.stages["aggregate"].items == stats.kept_entries
+
+def test_stats_count_prefiltered_lines(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    date_filter = DateFilter(parse_timestamp("2025-06-22T13:57:30+00:00"), parse_timestamp("2025-06-22T13:57:33+00:00"))
+    stats = FileStats(log_file)
+
+    build_reports(log_file, REPORT_CLASSES, date_filter, RunOptions(use_cache=False), stats)
+
+    assert stats.load.skipped_lines > 0
+    assert stats.entries == stats.load.total_lines
+
+def test_parallel_stats_merge_chunks(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    serial = FileStats(log_file)
+    build_reports(log_file, REPORT_CLASSES, AcceptAll(), RunOptions(use_cache=False), serial)
+
+    parallel = FileStats(log_file)
+    results = list(build_reports_parallel([log_file], REPORT_CLASSES, AcceptAll(), 3, RunOptions(use_cache=False), [parallel]))
+
+    assert not isinstance(results[0][1], ValueError)
+    assert parallel.load == serial.load
+    assert (parallel.entries, parallel.kept_entries) == (serial.entries, serial.kept_entries)
+    assert parallel.wall > 0 and parallel.peak_memory_kb >= 0
+
+def test_disabled_stats_use_plain_reader(tmp_path: pathlib.Path):
+    log_file = copy_fixture(tmp_path, "valid.log")
+
+    with mock.patch("logs_handler.engine.pipeline.iter_lines") as iter_mock:
+        build_reports(log_file, REPORT_CLASSES, AcceptAll(), RunOptions(use_cache=False))
+
+    iter_mock.assert_not_called()
+
+def test_stopwatch_adds_up():
+    stage = StageStats()
+    with Stopwatch(stage):
+        sum(range(1000))
+    with Stopwatch(stage):
+        sum(range(1000))
+
+    assert stage.wall > 0 and stage.cpu >= 0
+
+def test_emit_stats_json(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]):
+    stats = FileStats("access.log", wall=2.0, bytes_read=10)
+    stats.load.total_lines = 100
+    json_path = tmp_path / "stats.json"
+
+    emit_stats([stats], str(json_path))
+
+    data = json.loads(json_path.read_text())
+    assert data["files"][0]["file_path"] == "access.log"
+    assert data["files"][0]["lines_per_sec"] == 50.0
+    assert set(data["files"][0]["stages"]) == {"read", "decode", "filter", "aggregate", "render"}
+    assert "--- Stats for: access.log ---" in capsys.readouterr().err
+
+def test_main_with_profile(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]):
+    log_file = copy_fixture(tmp_path, "valid.log")
+    profile_path = tmp_path / "run.prof"
+    args = ["main.py", "-f", log_file, "-r", "average", "--profile", str(profile_path), "--stats"]
+
+    with mock.patch("sys.argv", args):
+        main.main()
+
+    captured = capsys.readouterr()
+    assert profile_path.exists()
+    assert "cumulative" in captured.err
+    assert "--- Stats for:" in captured.err
+    assert "--- Report for:" in captured.out
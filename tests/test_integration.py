@@ -1,10 +1,15 @@
+from datetime import datetime, timezone
 from pathlib import Path
 import pathlib
 from typing import Any, Dict
 import pytest
+from unittest import mock
 
-from main import build_report
+from main import build_report, build_reports
+from logs_handler.engine import RunOptions
 from logs_handler.reports import AvgResponseTime, UserAgent
+from logs_handler.utils import read_json_lines, available_decoders
+from logs_handler.utils.filters import DateFilter
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
@@ -48,4 +53,65 @@ def test_build_empty_file(tmp_path: pathlib.Path):
     empty_file.write_text("")
 
     table, _headers = build_report(str(empty_file), AvgResponseTime)
-    assert len(table) == 0
\ No newline at end of file
+    assert len(table) == 0
+
+def test_build_reports_single_pass():
+    valid_log_file = FIXTURES_DIR / "valid.log"
+    results = build_reports(str(valid_log_file), [AvgResponseTime, UserAgent])
+
+    assert results == [
+        build_report(str(valid_log_file), AvgResponseTime),
+        build_report(str(valid_log_file), UserAgent)
+    ]
+
+def write_partial_log(path: pathlib.Path, without_agent: int = 1, without_url: int = 0) -> None:
+    """Writes complete lines, then lines lacking `http_user_agent` and lines lacking `url`."""
+    lines = ['{"url": "/a", "response_time": 0.1, "http_user_agent": "curl"}', '{"url": "/b", "response_time": 0.2, "http_user_agent": "wget"}']
+    lines += ['{"url": "/a", "response_time": 0.5}'] * without_agent
+    lines += ['{"response_time": 0.7, "http_user_agent": "curl"}'] * without_url
+    path.write_text("\n".join(lines) + "\n")
+
+@pytest.mark.parametrize("options", [RunOptions(), RunOptions(batch_size=2), RunOptions(use_cache=False)])
+def test_build_reports_partial_lines_match_single_reports(tmp_path: pathlib.Path, options: RunOptions):
+    log_file = tmp_path / "partial.log"
+    write_partial_log(log_file, without_agent=2, without_url=1)
+    if options.use_cache:
+        pytest.importorskip("numpy")
+        from logs_handler.utils.cache import convert
+        convert(str(log_file))
+
+    results = build_reports(str(log_file), [AvgResponseTime, UserAgent], options=options)
+
+    assert results[0] == build_report(str(log_file), AvgResponseTime)
+    assert results[1] == build_report(str(log_file), UserAgent)
+    assert results[0][0][0][:2] == ["/a", 3]
+
+def test_build_reports_missing_fields_threshold_per_report(tmp_path: pathlib.Path):
+    log_file = tmp_path / "partial.log"
+    write_partial_log(log_file, without_agent=3, without_url=3)
+
+    # Six lines lack a field of one report or the other, but only three lack the fields of either report.
+    build_reports(str(log_file), [AvgResponseTime, UserAgent], options=RunOptions(max_missing_fields=4))
+
+    with pytest.raises(ValueError, match="wrong structure"):
+        build_reports(str(log_file), [AvgResponseTime, UserAgent], options=RunOptions(max_missing_fields=3))
+
+def test_build_reports_parses_each_line_once():
+    valid_log_file = FIXTURES_DIR / "valid.log"
+
+    with mock.patch("logs_handler.engine.pipeline.read_json_lines", wraps=read_json_lines) as read_mock:
+        build_reports(str(valid_log_file), [AvgResponseTime, UserAgent])
+
+    assert read_mock.call_count == 1
+    _path, required_fields, *_rest = read_mock.call_args.args
+    assert set(required_fields) == set(AvgResponseTime.REQUIRED_FIELDS + UserAgent.REQUIRED_FIELDS)
+
+@pytest.mark.parametrize("backend", available_decoders())
+def test_build_reports_same_for_every_decoder(backend: str):
+    valid_log_file = FIXTURES_DIR / "valid.log"
+
+    date_filter = DateFilter(datetime(2025, 6, 22, 13, 57, 32, tzinfo=timezone.utc), datetime(2025, 6, 22, 13, 57, 33, tzinfo=timezone.utc))
+
+    results = build_reports(str(valid_log_file), [AvgResponseTime, UserAgent], date_filter, RunOptions(decoder_backend=backend))
+
+    assert results == build_reports(str(valid_log_file), [AvgResponseTime, UserAgent], date_filter, RunOptions(decoder_backend="json"))
@@ -0,0 +1,178 @@
+import gzip
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+import time
+from typing import Iterator, List
+from unittest import mock
+import pytest
+
+from main import build_reports, build_reports_parallel, collect_reports_concurrent
+from logs_handler.engine import RunOptions
+from logs_handler.engine.multisource import SourceJob, read_sources
+from logs_handler.engine.parallel import process_chunk
+from logs_handler.reports import AvgResponseTime, UserAgent
+from logs_handler.utils import Diagnostics
+from logs_handler.utils.filters import AcceptAll
+from logs_handler.utils.reader import iter_blocks, is_stream
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def log_lines(lines_count: int, offset: int = 0) -> List[str]:
+    return [
+        json.dumps({
+            "@timestamp": f"2025-06-22T13:57:{i % 60:02d}+00:00",
+            "url": f"/api/handler/{(i + offset) % 7}",
+            "response_time": round(0.001 * (i % 13) + 0.017, 3),
+            "http_user_agent": f"agent-{i % 3}"
+        })
+        for i in range(lines_count)
+    ]
+
+def write_log(path: pathlib.Path, lines_count: int, offset: int = 0) -> None:
+    path.write_text("\n".join(log_lines(lines_count, offset)) + "\n")
+
+def test_concurrent_reports_match_serial(tmp_path: pathlib.Path):
+    paths = []
+    for i in range(4):
+        paths.append(tmp_path / f"file{i}.log")
+        write_log(paths[-1], 3000 + i * 500, i)
+    # A compressed log, and a last line without a newline.
+    with gzip.open(tmp_path / "rotated.log.gz", "wt") as file:
+        file.write("\n".join(log_lines(2000, 5)))
+    paths.append(tmp_path / "rotated.log.gz")
+    files = [str(path) for path in paths]
+
+    with mock.patch("logs_handler.utils.reader.BLOCK_SIZE", 4096):
+        results = list(collect_reports_concurrent(files, [AvgResponseTime, UserAgent], AcceptAll(), 3))
+
+    assert [file for file, _ in results] == files
+    for file, reports in results:
+        assert [(list(report.iter_table()), report.get_headers()) for report in reports] == build_reports(file, [AvgResponseTime, UserAgent])
+
+def test_line_numbers_continue_across_blocks(tmp_path: pathlib.Path):
+    log_file = tmp_path / "mixed.log"
+    lines = log_lines(400)
+    lines[99] = "{broken"
+    lines[350] = "{broken"
+    log_file.write_text("\n".join(lines) + "\n")
+    diagnostics = Diagnostics(str(log_file))
+
+    with mock.patch("logs_handler.utils.reader.BLOCK_SIZE", 1000):
+        results = list(collect_reports_concurrent([str(log_file)], [AvgResponseTime], AcceptAll(), 2, diagnostics=[diagnostics]))
+
+    assert not isinstance(results[0][1], ValueError)
+    assert [sample.line_num for sample in diagnostics.samples] == [100, 351]
+
+def test_failed_input_does_not_stop_the_others(tmp_path: pathlib.Path):
+    good, wrong = tmp_path / "good.log", tmp_path / "wrong.log"
+    write_log(good, 500)
+    wrong.write_text("\n".join(json.dumps({"message": i}) for i in range(100)) + "\n")
+    missing = tmp_path / "missing.log"
+
+    results = dict(collect_reports_concurrent([str(wrong), str(missing), str(good)], [AvgResponseTime], AcceptAll(), 2))
+
+    assert "wrong structure" in str(results[str(wrong)])
+    assert isinstance(results[str(missing)], ValueError)
+    assert list(results[str(good)][0].iter_table()) == build_reports(str(good), [AvgResponseTime])[0][0]
+
+def test_bounded_queue_applies_backpressure(tmp_path: pathlib.Path):
+    files = []
+    for i in range(3):
+        files.append(tmp_path / f"file{i}.log")
+        write_log(files[-1], 2000)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def counted_blocks(path: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        for block in iter_blocks(path, start, end):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            yield block
+
+    class SlowJob(SourceJob):
+        def feed_block(self, block: bytes) -> None:
+            with lock:
+                in_flight[0] -= 1
+            time.sleep(0.001)
+            super().feed_block(block)
+
+    jobs = [SlowJob(str(path), [UserAgent], AcceptAll()) for path in files]
+    with mock.patch("logs_handler.utils.reader.BLOCK_SIZE", 1024), mock.patch("logs_handler.engine.multisource.iter_blocks", counted_blocks):
+        read_sources(jobs, AcceptAll(), RunOptions(), concurrency=3, queue_blocks=4)
+
+    assert [list(job.reports[0].iter_table()) for job in jobs] == [[["agent-0", 667], ["agent-1", 667], ["agent-2", 666]]] * 3
+    # The queue, a block being put by every reader and the one being aggregated.
+    assert peak[0] <= 4 + 3 + 1
+
+def test_reads_overlap_their_waits(tmp_path: pathlib.Path):
+    files = []
+    for i in range(6):
+        files.append(tmp_path / f"file{i}.log")
+        write_log(files[-1], 200)
+
+    def slow_blocks(path: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        for block in iter_blocks(path, start, end):
+            time.sleep(0.05)
+            yield block
+
+    with mock.patch("logs_handler.utils.reader.BLOCK_SIZE", 8192), mock.patch("logs_handler.engine.multisource.iter_blocks", slow_blocks):
+        started = time.perf_counter()
+        read_sources([SourceJob(str(path), [UserAgent], AcceptAll()) for path in files], AcceptAll(), concurrency=6)
+        elapsed = time.perf_counter() - started
+
+    # Two blocks per file: 0.6s when the files are read one after the other.
+    assert elapsed < 0.4
+
+def test_named_pipe(tmp_path: pathlib.Path):
+    pipe = tmp_path / "pipe"
+    os.mkfifo(pipe)
+    assert is_stream(str(pipe))
+
+    def write() -> None:
+        with open(pipe, "w") as file:
+            for line in log_lines(300):
+                file.write(line + "\n")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    results = list(collect_reports_concurrent([str(pipe)], [UserAgent], AcceptAll(), 2))
+    writer.join()
+
+    assert list(results[0][1][0].iter_table()) == [["agent-0", 100], ["agent-1", 100], ["agent-2", 100]]
+
+def test_named_pipe_with_workers(tmp_path: pathlib.Path):
+    pipe = tmp_path / "pipe"
+    os.mkfifo(pipe)
+
+    def write() -> None:
+        with open(pipe, "w") as file:
+            for line in log_lines(300):
+                file.write(line + "\n")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    with mock.patch("logs_handler.engine.parallel.process_chunk", wraps=process_chunk) as chunk_mock:
+        results = list(build_reports_parallel([str(pipe)], [UserAgent], AcceptAll(), 2))
+    writer.join()
+
+    # Called in this process: a mock is not called when the chunk runs on a worker.
+    chunk_mock.assert_called_once()
+    assert results == [(str(pipe), [([["agent-0", 100], ["agent-1", 100], ["agent-2", 100]], ["browser", "count"])])]
+
+@pytest.mark.parametrize("extra_args", [[], ["--read-concurrency", "2"], ["-w", "2"]])
+def test_standard_input(tmp_path: pathlib.Path, extra_args: List[str]):
+    log_file = tmp_path / "file.log"
+    write_log(log_file, 90)
+
+    result = subprocess.run(
+        [sys.executable, "main.py", "-f", "-", str(log_file), "-r", "user-agent", "--format", "csv"] + extra_args,
+        cwd=ROOT_DIR, input=log_file.read_text(), capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "browser,count\nagent-0,30\nagent-1,30\nagent-2,30\n\nbrowser,count\nagent-0,30\nagent-1,30\nagent-2,30\n"
@@ -0,0 +1,100 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import json
+import pathlib
+from pathlib import Path
+from unittest import mock
+from typing import Any, Dict, List
+import pytest
+
+from main import build_reports, build_reports_parallel
+from logs_handler.utils.filters import AcceptAll, DateFilter
+from logs_handler.engine import plan_chunks, submit_file
+from logs_handler.reports import AvgResponseTime, Report, UserAgent
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+class LineCount(Report):
+    """A third-party style report that does not implement `merge`."""
+    def __init__(self) -> None:
+        self.count = 0
+
+    def process_line(self, line: Dict[str, Any]) -> None:
+        self.count += 1
+
+    def generate_table(self) -> List[List[Any]]:
+        return [[self.count]]
+
+    def get_headers(self) -> List[str]:
+        return ["lines"]
+
+    def get_required_fields(self) -> List[str]:
+        return []
+
+def write_log(path: pathlib.Path, lines_count: int) -> None:
+    with open(path, "w") as file:
+        for i in range(lines_count):
+            line = {
+                "@timestamp": f"2025-06-22T13:57:{i % 60:02d}+00:00",
+                "status": 200,
+                "url": f"/api/handler/{i % 7}",
+                "request_method": "GET",
+                "response_time": round(0.001 * (i % 13) + 0.017, 3),
+                "http_user_agent": f"agent-{i % 3}"
+            }
+            file.write(json.dumps(line) + "\n")
+
+def test_plan_chunks_aligned_to_lines(tmp_path: pathlib.Path):
+    log_file = tmp_path / "big.log"
+    write_log(log_file, 500)
+    content = log_file.read_bytes()
+
+    chunks = plan_chunks(str(log_file), 1000)
+
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == len(content)
+    for (_start, end), (next_start, _end) in zip(chunks, chunks[1:]):
+        assert end == next_start
+        assert content[end - 1:end] == b"\n"
+
+def test_plan_chunks_empty_file(tmp_path: pathlib.Path):
+    empty_file = tmp_path / "empty.log"
+    empty_file.write_text("")
+
+    assert plan_chunks(str(empty_file), 1000) == [(0, 0)]
+
+def test_parallel_output_identical_to_serial(tmp_path: pathlib.Path):
+    log_file = tmp_path / "big.log"
+    write_log(log_file, 2000)
+    report_classes = [AvgResponseTime, UserAgent]
+    date_filter = DateFilter(datetime(2025, 6, 22, 13, 57, 5, tzinfo=timezone.utc), datetime(2025, 6, 22, 13, 57, 20, tzinfo=timezone.utc))
+
+    with mock.patch("logs_handler.engine.parallel.MIN_CHUNK_SIZE", 4096):
+        results = list(build_reports_parallel([str(log_file), str(FIXTURES_DIR / "valid.log")], report_classes, date_filter, 4))
+
+    assert results[0] == (str(log_file), build_reports(str(log_file), report_classes, date_filter))
+    assert results[1][1] == build_reports(str(FIXTURES_DIR / "valid.log"), report_classes, date_filter)
+
+def test_parallel_malformed_file():
+    malformed_log_file = str(FIXTURES_DIR / "malformed.log")
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        job = submit_file(executor, malformed_log_file, [AvgResponseTime], DateFilter.for_day(datetime(2025, 6, 22, tzinfo=timezone.utc)), 2)
+
+        with pytest.raises(ValueError):
+            job.result()
+
+def test_plan_chunks_compressed_file():
+    assert plan_chunks("rotated.log.gz", 1000) == [(0, None)]
+
+def test_report_without_merge_fails_only_when_merged(tmp_path: pathlib.Path):
+    log_file = tmp_path / "big.log"
+    write_log(log_file, 3000)
+
+    assert build_reports(str(log_file), [LineCount]) == [([[3000]], ["lines"])]
+    with mock.patch("logs_handler.engine.parallel.MIN_CHUNK_SIZE", 4096):
+        [(_, error)] = build_reports_parallel([str(log_file)], [LineCount], AcceptAll(), 2)
+
+    assert isinstance(error, ValueError)
+    assert "LineCount report does not implement merge" in str(error)
@@ -0,0 +1,64 @@
+import gzip
+import os
+import pathlib
+from unittest import mock
+import pytest
+
+from logs_handler.utils import load_json
+from logs_handler.utils.reader import is_stream, iter_blocks, iter_lines
+from logs_handler.reports import AvgResponseTime
+
+LINES = [b'{"url": "/a", "response_time": 0.1}', b"", b'{"url": "/b", "response_time": 0.2}', b'{"url": "/c", "response_time": 0.3}']
+
+def test_iter_lines_across_blocks(tmp_path: pathlib.Path):
+    log_file = tmp_path / "file.log"
+    log_file.write_bytes(b"\n".join(LINES))
+
+    with mock.patch("logs_handler.utils.reader.BLOCK_SIZE", 7):
+        assert list(iter_lines(str(log_file))) == LINES
+
+def test_iter_lines_range(tmp_path: pathlib.Path):
+    log_file = tmp_path / "file.log"
+    content = b"\n".join(LINES) + b"\n"
+    log_file.write_bytes(content)
+    start = len(LINES[0]) + 2
+
+    assert list(iter_lines(str(log_file), start, len(content))) == LINES[2:]
+    assert list(iter_lines(str(log_file), 0, start)) == LINES[:2]
+
+def test_load_json_gzip(tmp_path: pathlib.Path):
+    log_file = tmp_path / "file.log.gz"
+    with gzip.open(log_file, "wb") as file:
+        file.write(b"\n".join(LINES) + b"\n")
+
+    lines = list(load_json(str(log_file), AvgResponseTime.REQUIRED_FIELDS))
+
+    assert [line["url"] for line in lines] == ["/a", "/b", "/c"]
+
+def test_load_json_zstd(tmp_path: pathlib.Path):
+    zstandard = pytest.importorskip("zstandard")
+    log_file = tmp_path / "file.log.zst"
+    log_file.write_bytes(zstandard.ZstdCompressor().compress(b"\n".join(LINES)))
+
+    lines = list(load_json(str(log_file), AvgResponseTime.REQUIRED_FIELDS))
+
+    assert [line["url"] for line in lines] == ["/a", "/b", "/c"]
+
+def test_iter_lines_compressed_range(tmp_path: pathlib.Path):
+    log_file = tmp_path / "file.log.gz"
+    with gzip.open(log_file, "wb") as file:
+        file.write(b"\n".join(LINES))
+
+    with pytest.raises(ValueError):
+        list(iter_lines(str(log_file), 10))
+
+def test_stream_rejects_ranges(tmp_path: pathlib.Path):
+    log_file = tmp_path / "file.log"
+    log_file.write_bytes(b"\n".join(LINES))
+    pipe = tmp_path / "pipe"
+    os.mkfifo(pipe)
+
+    assert not is_stream(str(log_file))
+    assert is_stream(str(pipe)) and is_stream("-")
+    with pytest.raises(ValueError):
+        next(iter_blocks(str(pipe), 10))
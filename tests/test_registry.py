@@ -0,0 +1,47 @@
+import argparse
+from importlib.metadata import EntryPoint
+import pytest
+
+from main import get_report_factory
+from logs_handler.cli.parser import validate_report_type
+from logs_handler.reports import Report, register_report, get_report_class, report_names
+from logs_handler.reports import registry
+from logs_handler.reports.average_response_time import AvgResponseTime, CompactAvgResponseTime
+from logs_handler.reports.user_agent import UserAgent
+
+@pytest.fixture(autouse=True)
+def clean_registry(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(registry, "_registered", {})
+    monkeypatch.setattr(registry, "_entry_points", lambda: {})
+
+def test_builtin_reports():
+    assert report_names() == ["average", "user-agent", "percentiles", "timeseries", "groupby"]
+    assert get_report_class("average") is AvgResponseTime
+    assert get_report_class("average", compact=True) is CompactAvgResponseTime
+    assert get_report_class("user-agent", compact=True) is UserAgent
+
+    with pytest.raises(ValueError, match="unknown report"):
+        get_report_class("gibbresh")
+
+def test_registered_report():
+    @register_report("slow-requests")
+    class SlowRequests(UserAgent):
+        pass
+
+    assert "slow-requests" in report_names()
+    assert validate_report_type("slow-requests") == "slow-requests"
+    assert get_report_factory("slow-requests", top_k=3, normalize_urls=True) is SlowRequests
+
+    with pytest.raises(ValueError, match="already registered"):
+        register_report("average")(SlowRequests)
+
+def test_entry_point_report(monkeypatch: pytest.MonkeyPatch):
+    entry_point = EntryPoint(name="agents", value="logs_handler.reports.user_agent:UserAgent", group=registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry, "_entry_points", lambda: {"agents": entry_point})
+
+    assert report_names()[-1] == "agents"
+    assert issubclass(get_report_class("agents"), Report)
+
+def test_unknown_report_type():
+    with pytest.raises(argparse.ArgumentTypeError):
+        validate_report_type("gibbresh")
@@ -1,9 +1,11 @@
 from decimal import Decimal
+import pickle
 from typing import Any, Dict
 import pytest
 
-from logs_handler.reports import AvgResponseTime
+from logs_handler.reports import AvgResponseTime, CompactAvgResponseTime, UserAgent
 from logs_handler.reports.average_response_time import AggregatedData
+from logs_handler.utils.columns import ColumnBatch
 
 def test_avg_process_valid_line():
     avg = AvgResponseTime()
@@ -33,4 +35,99 @@ def test_aggr_data_average():
     aggr_data = AggregatedData(Decimal("25.0"), 0)
     avg = aggr_data.average
 
-    assert avg == Decimal("0.0")
\ No newline at end of file
+    assert avg == Decimal("0.0")
+
+def test_avg_merge():
+    first, second = AvgResponseTime(), AvgResponseTime()
+    first.process_line({"url": "/a", "response_time": Decimal("0.1")})
+    second.process_line({"url": "/a", "response_time": Decimal("0.3")})
+    second.process_line({"url": "/b", "response_time": Decimal("0.2")})
+
+    first.merge(second)
+
+    assert first.report == {
+        "/a": AggregatedData(Decimal("0.4"), 2),
+        "/b": AggregatedData(Decimal("0.2"), 1)
+    }
+
+def test_user_agent_merge():
+    first, second = UserAgent(), UserAgent()
+    first.process_line({"http_user_agent": "curl"})
+    second.process_line({"http_user_agent": "curl"})
+    second.process_line({"http_user_agent": "firefox"})
+
+    first.merge(second)
+
+    assert first.report == {"curl": 2, "firefox": 1}
+
+def test_avg_top_k():
+    report = AvgResponseTime(top_k=2)
+    for url, count in [("/a", 5), ("/b", 3), ("/c", 1)]:
+        for _ in range(count):
+            report.process_line({"url": url, "response_time": Decimal("0.5")})
+
+    assert report.get_headers() == AvgResponseTime.HEADERS + ["count_error"]
+    assert report.generate_table() == [["/a", 5, Decimal("0.5"), 0], ["/b", 3, Decimal("0.5"), 0]]
+
+def test_user_agent_top_k_merge():
+    first, second = UserAgent(top_k=1), UserAgent(top_k=1)
+    for agent in ["Chrome", "Chrome", "Safari"]:
+        first.process_line({"http_user_agent": agent})
+    for agent in ["Chrome", "Firefox"]:
+        second.process_line({"http_user_agent": agent})
+
+    first.merge(second)
+
+    assert first.generate_table() == [["Chrome", 3, 0]]
+
+def test_compact_avg_matches_decimal_avg():
+    lines = [("/a", "0.024"), ("/b", "0.1"), ("/a", "0.017"), ("/c", "1.000001"), ("/b", "0.2"), ("/a", "0.3")]
+    exact, compact = AvgResponseTime(), CompactAvgResponseTime()
+    for url, response_time in lines:
+        exact.process_line({"url": url, "response_time": Decimal(response_time)})
+        compact.process_line({"url": url, "response_time": float(response_time)})
+
+    assert compact.generate_table() == exact.generate_table()
+    assert not compact.needs_exact_decimals()
+
+def test_compact_avg_merge_and_pickle():
+    first, second = CompactAvgResponseTime(), CompactAvgResponseTime()
+    first.process_line({"url": "/a", "response_time": 0.1})
+    second.process_line({"url": "/a", "response_time": 0.3})
+    second.process_line({"url": "/b", "response_time": 0.2})
+
+    first.merge(pickle.loads(pickle.dumps(second)))
+
+    assert first.generate_table() == [["/a", 2, Decimal("0.2")], ["/b", 1, Decimal("0.2")]]
+    assert list(first.iter_table(1)) == [["/a", 2, Decimal("0.2")]]
+
+def test_compact_avg_top_k():
+    report = CompactAvgResponseTime(top_k=2)
+    for url, count in [("/a", 5), ("/b", 3), ("/c", 1)]:
+        for _ in range(count):
+            report.process_line({"url": url, "response_time": 0.5})
+
+    assert report.get_headers() == AvgResponseTime.HEADERS + ["count_error"]
+    assert report.generate_table() == [["/a", 5, Decimal("0.5"), 0], ["/b", 3, Decimal("0.5"), 0]]
+
+@pytest.mark.parametrize("report_class", [AvgResponseTime, CompactAvgResponseTime])
+def test_avg_skips_invalid_response_times(report_class):
+    pytest.importorskip("numpy")
+    by_line, by_batch = report_class(), report_class()
+    lines = [{"url": "/a", "response_time": value} for value in [Decimal("0.5"), None, "0.5" * 10, True, [0.5], float("nan"), 1]]
+    for line in lines:
+        by_line.process_line(line)
+    by_batch.process_batch(ColumnBatch(lines))
+
+    assert by_line.generate_table() == by_batch.generate_table() == [["/a", 2, Decimal("0.75")]]
+    assert by_line.invalid_lines() == by_batch.invalid_lines() == 5
+
+    merged = report_class()
+    merged.merge(by_line)
+    assert merged.invalid_lines() == 5
+
+def test_compact_avg_initializes_the_base_report():
+    report = CompactAvgResponseTime(top_k=1)
+
+    assert report.report == {}
+    assert report.heavy_hitters is not None and report.invalid_lines() == 0
@@ -0,0 +1,186 @@
+import asyncio
+from contextlib import contextmanager
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+from typing import Iterator, Sequence
+from unittest import mock
+import pytest
+
+from main import build_report, get_report_factory, query_server
+from logs_handler.engine import Follower, ReportServer, RunOptions, report_signature, query_report
+from logs_handler.engine.client import parse_address, request
+from logs_handler.engine.follow import FileTailer
+from logs_handler.engine.server import ServedReport, remove_socket
+from logs_handler.reports import AvgResponseTime
+from logs_handler.utils.filters import AcceptAll
+
+def write_log(path: pathlib.Path, lines_count: int) -> None:
+    with open(path, "w") as file:
+        for i in range(lines_count):
+            line = {"@timestamp": "2025-06-22T13:57:32+00:00", "url": f"/api/handler/{i % 3}", "response_time": 0.5, "http_user_agent": "curl"}
+            file.write(json.dumps(line) + "\n")
+
+@contextmanager
+def running_server(server: ReportServer, socket_path: str | None = None) -> Iterator[str]:
+    """Runs the server on a background event loop, yields its address."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    listener = asyncio.run_coroutine_threadsafe(server.start(socket_path, None if socket_path else 0), loop).result()
+    try:
+        yield socket_path or "127.0.0.1:{}".format(listener.sockets[0].getsockname()[1])
+    finally:
+        listener.close()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+def make_server(log_file: pathlib.Path, names: Sequence[str] = ("average", "user-agent")) -> ReportServer:
+    factories = [get_report_factory(name) for name in names]
+    follower = Follower([str(log_file)], factories, AcceptAll())
+    follower.poll_once()
+    served = {name: ServedReport(i, report_signature(factory, AcceptAll())) for i, (name, factory) in enumerate(zip(names, factories))}
+    return ReportServer(follower, served)
+
+@pytest.mark.parametrize("use_socket", [True, False])
+def test_serves_reports(tmp_path: pathlib.Path, use_socket: bool):
+    log_file = tmp_path / "served.log"
+    write_log(log_file, 30)
+    server = make_server(log_file)
+
+    with running_server(server, str(tmp_path / "reports.sock") if use_socket else None) as address:
+        health = request(address, "/health")
+        response = query_report(address, "average", file=str(log_file), limit=2)
+
+    assert health["reports"] == ["average", "user-agent"]
+    assert health["files"][0]["lines_read"] == 30
+    assert response["files"][0]["headers"] == ["handler", "total", "avg_response_time"]
+    assert response["files"][0]["rows"] == [["/api/handler/0", 10, 0.5], ["/api/handler/1", 10, 0.5]]
+
+def test_rejects_unknown_and_mismatching_queries(tmp_path: pathlib.Path):
+    log_file = tmp_path / "served.log"
+    write_log(log_file, 5)
+    server = make_server(log_file)
+
+    with running_server(server) as address:
+        with pytest.raises(ValueError, match="404"):
+            query_report(address, "percentiles")
+        with pytest.raises(ValueError, match="404"):
+            query_report(address, "average", file=str(tmp_path / "other.log"))
+        with pytest.raises(ValueError, match="409"):
+            query_report(address, "average", signature="0" * 40)
+        with pytest.raises(ValueError, match="400"):
+            request(address, "/reports/average?limit=0")
+
+def test_query_server_matches_local_reports(tmp_path: pathlib.Path):
+    log_file = tmp_path / "served.log"
+    write_log(log_file, 12)
+    server = make_server(log_file)
+
+    with running_server(server) as address:
+        results = query_server(address, [str(log_file)], ["user-agent"], [get_report_factory("user-agent")], AcceptAll())
+        with pytest.raises(ValueError, match="409"):
+            query_server(address, [str(log_file)], ["average"], [get_report_factory("average", top_k=1)], AcceptAll())
+
+    assert results == [(str(log_file), ["browser", "count"], [["curl", 12]])]
+
+def test_served_report_keeps_lines_other_reports_reject(tmp_path: pathlib.Path):
+    log_file = tmp_path / "partial.log"
+    write_log(log_file, 6)
+    with open(log_file, "a") as file:
+        # Lines the user-agent and timeseries reports reject, but the average report takes.
+        file.write('{"url": "/api/handler/0", "response_time": 1.5}\n' * 3)
+    server = make_server(log_file, ["average", "user-agent", "timeseries"])
+
+    with running_server(server) as address:
+        response = query_report(address, "average", file=str(log_file))
+
+    table, headers = build_report(str(log_file), AvgResponseTime)
+    assert response["files"][0]["headers"] == headers
+    assert response["files"][0]["rows"] == [[url, total, float(avg)] for url, total, avg in table]
+
+def test_socket_path_never_replaces_other_files(tmp_path: pathlib.Path):
+    log_file = tmp_path / "access.log"
+    write_log(log_file, 3)
+
+    with pytest.raises(ValueError, match="not a socket"):
+        remove_socket(str(log_file))
+    result = subprocess.run(
+        [sys.executable, "main.py", "serve", "-f", str(log_file), "--socket", str(log_file)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True
+    )
+
+    assert result.returncode == 2
+    assert "not a socket" in result.stderr
+    assert len(log_file.read_text().splitlines()) == 3
+
+def test_stale_socket_is_replaced(tmp_path: pathlib.Path):
+    log_file = tmp_path / "served.log"
+    write_log(log_file, 3)
+    socket_path = str(tmp_path / "reports.sock")
+
+    with running_server(make_server(log_file), socket_path):
+        pass
+    assert os.path.exists(socket_path)
+
+    with running_server(make_server(log_file), socket_path) as address:
+        assert request(address, "/health")["files"][0]["lines_read"] == 3
+
+def test_live_socket_is_never_removed(tmp_path: pathlib.Path):
+    log_file = tmp_path / "served.log"
+    write_log(log_file, 3)
+    socket_path = str(tmp_path / "reports.sock")
+
+    with running_server(make_server(log_file), socket_path) as address:
+        with pytest.raises(ValueError, match="in use"):
+            remove_socket(socket_path)
+        assert request(address, "/health")["files"][0]["lines_read"] == 3
+
+def test_served_follower_rejects_files_missing_fields(tmp_path: pathlib.Path):
+    log_file = tmp_path / "served.log"
+    log_file.write_text(json.dumps({"url": "/a"}) + "\n" + json.dumps({"url": "/b"}) + "\n")
+
+    for max_missing_fields, rejected in [(2, True), (0, False)]:
+        follower = Follower([str(log_file)], [AvgResponseTime], AcceptAll(), RunOptions(max_missing_fields=max_missing_fields))
+        if rejected:
+            with pytest.raises(ValueError, match="wrong structure"):
+                follower.poll_once()
+        else:
+            follower.poll_once()
+            assert follower.files[0].diagnostics.total == 2
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:8080") == ("127.0.0.1", 8080, None)
+    assert parse_address("http://localhost:8080/") == ("localhost", 8080, None)
+    assert parse_address("/tmp/reports.sock") == (None, None, "/tmp/reports.sock")
+
+def test_client_falls_back_to_local_processing(tmp_path: pathlib.Path):
+    log_file = tmp_path / "local.log"
+    write_log(log_file, 3)
+
+    result = subprocess.run(
+        [sys.executable, "main.py", "-f", str(log_file), "-r", "user-agent", "--format", "csv", "--server", str(tmp_path / "missing.sock")],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == "browser,count\ncurl,3\n"
+    assert "processing the files locally" in result.stderr
+
+def test_tailer_reads_backlog_over_several_polls(tmp_path: pathlib.Path):
+    log_file = tmp_path / "tailed.log"
+    write_log(log_file, 100)
+    tailer = FileTailer(str(log_file))
+
+    with mock.patch("logs_handler.engine.follow.BLOCK_SIZE", 1024), mock.patch("logs_handler.engine.follow.MAX_POLL_BYTES", 2048):
+        lines = tailer.poll()
+        assert tailer.backlog and 0 < len(lines) < 100
+        while tailer.backlog:
+            lines += tailer.poll()
+    tailer.close()
+
+    assert b"\n".join(lines) + b"\n" == log_file.read_bytes()
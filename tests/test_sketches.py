@@ -0,0 +1,143 @@
+from decimal import Decimal
+import pickle
+import random
+import pytest
+
+from logs_handler.reports import Percentiles, UrlNormalizer
+from logs_handler.reports.sketches import LogHistogram, SpaceSaving
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+def test_quantiles_within_error_bound():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-3, 1.2) for _ in range(20000)]
+    sketch = LogHistogram(alpha=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = exact_quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+    assert sketch.min == min(values)
+    assert sketch.max == max(values)
+
+def test_merge_is_lossless():
+    rng = random.Random(3)
+    values = [rng.uniform(0.001, 2.0) for _ in range(5000)]
+    whole, first, second = LogHistogram(), LogHistogram(), LogHistogram()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (first if i % 2 else second).add(value)
+
+    first.merge(second)
+
+    assert first.count == whole.count
+    assert (first.offset, list(first.counts)) == (whole.offset, list(whole.counts))
+    assert first.quantile(0.99) == whole.quantile(0.99)
+
+def test_bucket_count_is_bounded():
+    sketch = LogHistogram(alpha=0.01, max_buckets=64)
+    for exponent in range(-9, 10):
+        sketch.add(10.0 ** exponent)
+
+    assert len(sketch.counts) <= 64
+    assert sketch.count == 19
+    assert sketch.quantile(1.0) == pytest.approx(1e9, rel=0.01)
+
+def test_zeros_and_empty_sketch():
+    sketch = LogHistogram()
+    assert sketch.quantile(0.5) is None
+
+    sketch.add(0.0)
+    sketch.add(0.0)
+    sketch.add(1.0)
+
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1.0) == pytest.approx(1.0, rel=0.01)
+
+def test_percentiles_report():
+    report, other = Percentiles(), Percentiles()
+    for i in range(1, 101):
+        report.process_line({"url": "/a", "response_time": Decimal(i) / 1000})
+    other.process_line({"url": "/b", "response_time": 0.5})
+
+    report.merge(other)
+    table = report.generate_table()
+
+    assert [row[:3] for row in table] == [["/a", 100, 0.001], ["/b", 1, 0.5]]
+    assert table[0][3] == pytest.approx(0.050, rel=0.01)
+    assert table[0][-1] == 0.1
+
+def test_percentiles_skip_invalid_response_times():
+    report, other = Percentiles(), Percentiles(top_k=1)
+    for response_time in [0.2, None, "slow", float("nan"), "0.4"]:
+        report.process_line({"url": "/a", "response_time": response_time})
+        other.process_line({"url": "/a", "response_time": response_time})
+
+    assert [row[:3] for row in report.generate_table()] == [["/a", 2, 0.2]]
+    assert [row[:3] for row in other.generate_table()] == [["/a", 2, 0.2]]
+    assert report.invalid_lines() == other.invalid_lines() == 3
+
+    merged = Percentiles()
+    merged.merge(report)
+    assert merged.invalid_lines() == 3
+
+def test_space_saving_error_bounds():
+    rng = random.Random(11)
+    keys = [f"/api/{int(rng.paretovariate(1.2))}" for _ in range(20000)]
+    exact = {}
+    for key in keys:
+        exact[key] = exact.get(key, 0) + 1
+
+    summary = SpaceSaving(capacity=40)
+    for key in keys:
+        summary.increment(key)
+
+    assert len(summary.entries) <= 40
+    for key, count, error, _payload in summary.items():
+        assert count - error <= exact[key] <= count
+        assert error <= len(keys) // 40
+
+    true_top = sorted(exact, key=exact.get, reverse=True)[:5]
+    assert [key for key, *_rest in summary.top(5)] == true_top
+
+def test_space_saving_merge():
+    rng = random.Random(5)
+    keys = [f"agent-{min(int(rng.expovariate(0.3)), 60)}" for _ in range(10000)]
+    exact = {}
+    for key in keys:
+        exact[key] = exact.get(key, 0) + 1
+
+    first, second = SpaceSaving(capacity=20), SpaceSaving(capacity=20)
+    for i, key in enumerate(keys):
+        (first if i % 2 else second).increment(key)
+    first.merge(second)
+
+    assert len(first.entries) <= 20
+    for key, count, error, _payload in first.items():
+        assert count - error <= exact[key] <= count
+    assert [key for key, *_rest in first.top(3)] == sorted(exact, key=exact.get, reverse=True)[:3]
+
+def test_top_percentiles_report():
+    report = Percentiles(top_k=2, url_normalizer=UrlNormalizer())
+    for i in range(30):
+        report.process_line({"url": f"/api/users/{i}", "response_time": 0.1})
+    for i in range(10):
+        report.process_line({"url": f"/api/orders/{i}/items", "response_time": 0.2})
+    report.process_line({"url": "/health", "response_time": 0.3})
+
+    table = report.generate_table()
+    assert report.get_headers() == Percentiles.HEADERS + ["count_error"]
+    assert [row[:2] for row in table] == [["/api/users/{id}", 30], ["/api/orders/{id}/items", 10]]
+    assert table[0][-1] == 0
+
+def test_url_normalizer():
+    normalize = UrlNormalizer()
+
+    assert normalize("/api/users/42/orders/0b5d7e1a-3f7c-4a1e-9d2b-5c8e6f7a9b0c?page=2") == "/api/users/{id}/orders/{id}?page=2"
+    assert normalize("/api/v2/context/") == "/api/v2/context/"
+    assert normalize("/static/5f4dcc3b5aa765d61d8327deb882cf99") == "/static/{id}"
+    assert pickle.loads(pickle.dumps(normalize))("/api/7") == "/api/{id}"
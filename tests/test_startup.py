@@ -0,0 +1,29 @@
+import json
+import pathlib
+
+from benchmarks.startup import loaded_modules
+
+# Modules only needed by some runs, never by the startup of the cli.
+HEAVY_MODULES = ["numpy", "tabulate", "asyncio", "http.client", "concurrent.futures.process", "cProfile"]
+REPORT_MODULES = [
+    "logs_handler.reports.average_response_time",
+    "logs_handler.reports.user_agent",
+    "logs_handler.reports.percentiles",
+    "logs_handler.reports.timeseries",
+    "logs_handler.reports.groupby"
+]
+
+def test_help_imports_no_heavy_or_report_modules():
+    modules = loaded_modules(["--help"])
+
+    assert "logs_handler.cli.parser" in modules
+    assert [name for name in HEAVY_MODULES + REPORT_MODULES if name in modules] == []
+
+def test_run_imports_only_the_requested_report(tmp_path: pathlib.Path):
+    log_file = tmp_path / "small.log"
+    log_file.write_text(json.dumps({"@timestamp": "2025-06-22T13:57:32+00:00", "url": "/api/users", "response_time": 0.1}) + "\n")
+
+    modules = loaded_modules(["-f", str(log_file), "-r", "average", "--format", "csv"])
+
+    assert "logs_handler.reports.average_response_time" in modules
+    assert [name for name in HEAVY_MODULES + REPORT_MODULES[1:] if name in modules] == []
@@ -0,0 +1,82 @@
+import functools
+import json
+import os
+import pathlib
+from unittest import mock
+
+from main import build_reports
+from logs_handler.engine import RunOptions
+from logs_handler.engine.state import run_signature
+from logs_handler.reports import AvgResponseTime, UserAgent, UrlNormalizer
+from logs_handler.utils import read_json_lines
+from logs_handler.utils.filters import AcceptAll
+
+REPORT_CLASSES = [AvgResponseTime, UserAgent]
+
+def log_lines(first: int, last: int) -> str:
+    lines = []
+    for i in range(first, last):
+        line = {"@timestamp": "2025-06-22T13:57:32+00:00", "url": f"/api/{i % 3}", "response_time": 0.01 * (i % 7), "http_user_agent": f"agent-{i % 2}"}
+        lines.append(json.dumps(line) + "\n")
+    return "".join(lines)
+
+def test_incremental_run_processes_only_appended_lines(tmp_path: pathlib.Path):
+    log_file = tmp_path / "growing.log"
+    expected_file = tmp_path / "expected.log"
+    options = RunOptions(state_dir=str(tmp_path / "state"))
+    log_file.write_text(log_lines(0, 50))
+
+    assert build_reports(str(log_file), REPORT_CLASSES, options=options) == build_reports(str(log_file), REPORT_CLASSES)
+
+    appended_size = log_file.stat().st_size
+    partial_line = log_lines(80, 81)[:20]
+    with open(log_file, "a") as file:
+        file.write(log_lines(50, 80) + partial_line)
+    expected_file.write_text(log_lines(0, 80))
+
+    with mock.patch("logs_handler.engine.pipeline.read_json_lines", wraps=read_json_lines) as read_mock:
+        results = build_reports(str(log_file), REPORT_CLASSES, options=options)
+
+    assert results == build_reports(str(expected_file), REPORT_CLASSES)
+    _path, _fields, _stats, start, end, *_rest = read_mock.call_args.args
+    assert (start, end) == (appended_size, log_file.stat().st_size - len(partial_line))
+
+def test_incremental_run_unchanged_file(tmp_path: pathlib.Path):
+    log_file = tmp_path / "static.log"
+    options = RunOptions(state_dir=str(tmp_path / "state"))
+    log_file.write_text(log_lines(0, 50))
+    first = build_reports(str(log_file), REPORT_CLASSES, options=options)
+
+    with mock.patch("logs_handler.engine.pipeline.read_json_lines") as read_mock:
+        assert build_reports(str(log_file), REPORT_CLASSES, options=options) == first
+
+    read_mock.assert_not_called()
+
+def test_incremental_run_truncated_file(tmp_path: pathlib.Path):
+    log_file = tmp_path / "truncated.log"
+    options = RunOptions(state_dir=str(tmp_path / "state"))
+    log_file.write_text(log_lines(0, 50))
+    build_reports(str(log_file), REPORT_CLASSES, options=options)
+
+    log_file.write_text(log_lines(100, 110))
+
+    assert build_reports(str(log_file), REPORT_CLASSES, options=options) == build_reports(str(log_file), REPORT_CLASSES)
+
+def test_incremental_run_rotated_file(tmp_path: pathlib.Path):
+    log_file = tmp_path / "rotated.log"
+    new_file = tmp_path / "new.log"
+    options = RunOptions(state_dir=str(tmp_path / "state"))
+    log_file.write_text(log_lines(0, 50))
+    build_reports(str(log_file), REPORT_CLASSES, options=options)
+
+    new_file.write_text(log_lines(0, 50) + log_lines(7, 20))
+    os.replace(new_file, log_file)
+
+    assert build_reports(str(log_file), REPORT_CLASSES, options=options) == build_reports(str(log_file), REPORT_CLASSES)
+
+def test_run_signature_of_report_factories():
+    top_three = functools.partial(AvgResponseTime, top_k=3, url_normalizer=UrlNormalizer())
+
+    assert run_signature([top_three], AcceptAll()) == run_signature([functools.partial(AvgResponseTime, top_k=3, url_normalizer=UrlNormalizer())], AcceptAll())
+    assert run_signature([top_three], AcceptAll()) != run_signature([functools.partial(AvgResponseTime, top_k=4)], AcceptAll())
+    assert run_signature([top_three], AcceptAll()) != run_signature([AvgResponseTime], AcceptAll())
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import random
+import pytest
+
+from main import build_reports, build_reports_parallel
+from logs_handler.engine import RunOptions
+from logs_handler.reports import TimeSeries, UrlNormalizer
+from logs_handler.reports.timeseries import BucketData
+from logs_handler.utils import Diagnostics
+from logs_handler.utils.diagnostics import INVALID_VALUES
+from logs_handler.utils.filters import AcceptAll
+from logs_handler.utils.timestamps import epoch_second
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+def random_lines(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        {
+            "@timestamp": f"2025-06-22T13:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}+00:00",
+            "status": rng.choice([200, 200, 200, 304, 404, 500]),
+            "url": f"/api/{rng.choice('abc')}/{rng.randint(1, 5)}",
+            "response_time": round(rng.uniform(0.001, 2.0), 3)
+        }
+        for _ in range(count)
+    ]
+
+def test_epoch_second():
+    expected = int(datetime(2025, 6, 22, 13, 57, 32, tzinfo=timezone.utc).timestamp())
+
+    assert epoch_second("2025-06-22T13:57:32+00:00") == expected
+    assert epoch_second("2025-06-22T13:57:32.987Z") == expected
+    assert epoch_second("2025-06-22T16:57:32.5+03:00") == expected
+    assert epoch_second("2025-06-22T13:57:32") == expected
+
+def test_timeseries_buckets():
+    report = TimeSeries("1m")
+    report.process_line({"@timestamp": "2025-06-22T13:57:32+00:00", "status": 200, "response_time": 0.1})
+    report.process_line({"@timestamp": "2025-06-22T13:57:59+00:00", "status": 404, "response_time": 0.3})
+    report.process_line({"@timestamp": "2025-06-22T13:58:00+00:00", "status": 502, "response_time": 0.2})
+
+    assert report.generate_table() == [
+        ["2025-06-22T13:57:00+00:00", 2, 1, 0, 0.5, 0.2, 0.3],
+        ["2025-06-22T13:58:00+00:00", 1, 0, 1, 1.0, 0.2, 0.2]
+    ]
+
+def test_timeseries_by_handler():
+    report = TimeSeries("1h", by_handler=True, url_normalizer=UrlNormalizer())
+    report.process_line({"@timestamp": "2025-06-22T13:57:32+00:00", "status": 200, "url": "/a/1", "response_time": 0.1})
+    report.process_line({"@timestamp": "2025-06-22T13:20:00+00:00", "status": 200, "url": "/b", "response_time": 0.1})
+    report.process_line({"@timestamp": "2025-06-22T13:10:00+00:00", "status": 200, "url": "/a/2", "response_time": 0.1})
+
+    table = report.generate_table()
+
+    assert report.get_headers()[:3] == ["bucket", "handler", "count"]
+    assert [row[:3] for row in table] == [["2025-06-22T13:00:00+00:00", "/a/{id}", 2], ["2025-06-22T13:00:00+00:00", "/b", 1]]
+    assert "url" in report.get_required_fields()
+
+def test_timeseries_merge():
+    lines = random_lines(2000)
+    whole, first, second = TimeSeries("1m"), TimeSeries("1m"), TimeSeries("1m")
+    for line in lines:
+        whole.process_line(line)
+    for line in lines[:700]:
+        first.process_line(line)
+    for line in lines[700:]:
+        second.process_line(line)
+
+    first.merge(second)
+
+    assert first.generate_table() == whole.generate_table()
+
+def test_timeseries_invalid_bucket():
+    with pytest.raises(ValueError):
+        TimeSeries("1d")
+
+def test_bucket_data_empty():
+    assert BucketData().error_rate == 0.0
+    assert BucketData().average == 0.0
+
+def test_timeseries_batch_matches_line_path():
+    pytest.importorskip("numpy")
+    from logs_handler.utils.columns import ColumnBatch
+
+    lines = random_lines(3000, seed=2)
+    for by_handler in (False, True):
+        by_line, by_batch = TimeSeries("1m", by_handler), TimeSeries("1m", by_handler)
+        for line in lines:
+            by_line.process_line(line)
+        for first in range(0, len(lines), 1000):
+            by_batch.process_batch(ColumnBatch(lines[first:first + 1000]))
+
+        line_table, batch_table = by_line.generate_table(), by_batch.generate_table()
+        assert [row[:-2] for row in batch_table] == [row[:-2] for row in line_table]
+        for batch_row, line_row in zip(batch_table, line_table):
+            assert batch_row[-2:] == pytest.approx(line_row[-2:], abs=1e-6)
+
+def test_timeseries_parallel_matches_serial():
+    log_file = str(FIXTURES_DIR / "valid.log")
+    serial = build_reports(log_file, [TimeSeries], AcceptAll(), RunOptions(use_cache=False))
+    parallel = list(build_reports_parallel([log_file], [TimeSeries], AcceptAll(), 3, RunOptions(use_cache=False)))
+
+    assert parallel == [(log_file, serial)]
+    assert sum(row[1] for row in serial[0][0]) == 20
+
+@pytest.mark.parametrize("batch_size", [0, 100])
+def test_timeseries_skips_invalid_values(tmp_path: Path, batch_size: int):
+    log_file = tmp_path / "mixed.log"
+    log_file.write_text("\n".join([
+        '{"@timestamp": "2025-06-22T13:57:32+00:00", "status": "404", "response_time": 0.1}',
+        '{"@timestamp": "2025-06-22T13:57:40+00:00", "status": 500, "response_time": 0.3}',
+        '{"@timestamp": "yesterday", "status": 200, "response_time": 0.2}',
+        '{"@timestamp": "2025-06-22T13:57:50+00:00", "status": "OK", "response_time": 0.2}',
+    ]) + "\n")
+    diagnostics = Diagnostics(str(log_file))
+
+    results = build_reports(str(log_file), [TimeSeries], options=RunOptions(batch_size=batch_size, use_cache=False), diagnostics=diagnostics)
+
+    assert results[0][0] == [["2025-06-22T13:57:00+00:00", 2, 1, 1, 1.0, 0.2, 0.3]]
+    assert diagnostics.counts == {INVALID_VALUES: 2}
@@ -1,7 +1,8 @@
 import pytest
 from pathlib import Path
 
-from logs_handler.utils import load_json
+from logs_handler.utils import Diagnostics, load_json
+from logs_handler.utils.diagnostics import MISSING_FIELDS
 from logs_handler.reports.average_response_time import AvgResponseTime
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
@@ -31,13 +32,18 @@ def test_some_lines_missing_fields(capsys: pytest.CaptureFixture[str]):
     some_fiends_missing_file = FIXTURES_DIR / "some_missing_fields.log"
     required_fields = AvgResponseTime.REQUIRED_FIELDS
 
-    json_iter = load_json(str(some_fiends_missing_file), required_fields)
+    diagnostics = Diagnostics(str(some_fiends_missing_file))
+    json_iter = load_json(str(some_fiends_missing_file), required_fields, diagnostics=diagnostics)
     lines = list(json_iter)
 
     assert len(lines) == 17
 
-    captured_errors = capsys.readouterr()
-    assert captured_errors.err.count("line") == 3
+    assert diagnostics.counts == {MISSING_FIELDS: 3}
+    assert [sample.category for sample in diagnostics.samples] == [MISSING_FIELDS] * 3
+    assert [sample.line_num for sample in diagnostics.samples] == [1, 2, 3]
+
+    # Rejected lines are only summarized, never printed one by one.
+    assert capsys.readouterr().err == ""
 
 def test_all_lines_missing_fields():
     all_missing_fields_file = FIXTURES_DIR / "all_missing_fields.log"
@@ -0,0 +1,184 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+import json
+import pathlib
+from pathlib import Path
+import pickle
+import random
+from unittest import mock
+import pytest
+
+from main import build_reports, build_reports_parallel
+from logs_handler.cli.parser import init_parser, parse_args
+from logs_handler.engine import RunOptions
+from logs_handler.reports import AvgResponseTime, UserAgent
+from logs_handler.utils.filters import AcceptAll, AllFilters, DateFilter, WhereFilter
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+def random_lines(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        line = {
+            "status": rng.choice([200, 301, 404, 500, 503]),
+            "url": rng.choice(["/api/users/1", "/api/users/2", "/api/orders/", "/health"]),
+            "request_method": rng.choice(["GET", "POST", "PUT"]),
+            "response_time": round(rng.uniform(0.0, 2.0), 3)
+        }
+        if rng.random() < 0.1:
+            del line[rng.choice(list(line))]
+        lines.append(line)
+    return lines
+
+def test_where_comparisons():
+    where = WhereFilter('status >= 500 and request_method in ("POST", "PUT")')
+
+    assert where({"status": 502, "request_method": "POST"})
+    assert not where({"status": 502, "request_method": "GET"})
+    assert not where({"status": 200, "request_method": "PUT"})
+    assert not where({"request_method": "PUT"})
+
+def test_where_precedence_and_not():
+    where = WhereFilter('url ~ "^/api/" and not (status == 200 or status == 301) or request_method == "PUT"')
+
+    assert where({"url": "/api/users/1", "status": 404})
+    assert not where({"url": "/api/users/1", "status": 200})
+    assert where({"url": "/health", "status": 200, "request_method": "PUT"})
+
+def test_where_numbers_whatever_decoded():
+    where = WhereFilter("response_time > 0.5 and status == 200")
+
+    assert where({"response_time": Decimal("0.6"), "status": 200})
+    assert where({"response_time": 0.6, "status": 200.0})
+    assert not where({"response_time": Decimal("0.5"), "status": 200})
+    assert not where({"response_time": "slow", "status": 200})
+
+def test_where_missing_fields():
+    assert WhereFilter("user == null")({})
+    assert WhereFilter('user != "bob"')({})
+    assert not WhereFilter('user ~ "b"')({})
+    assert not WhereFilter('user < "b"')({"user": 1})
+    assert WhereFilter('user !~ "b"')({})
+
+def test_where_not_in_and_keywords_case():
+    where = WhereFilter('request_method NOT IN ("GET", "HEAD") AND url != "/health"')
+
+    assert where({"request_method": "POST", "url": "/"})
+    assert not where({"request_method": "GET", "url": "/"})
+    assert where.get_fields() == ["request_method", "url"]
+
+@pytest.mark.parametrize("expression", [
+    "status >",
+    "status == 200 and",
+    "(status == 200",
+    'url ~ "("',
+    "status < null",
+    "status 200",
+    "$status == 1",
+    "url in ()"
+])
+def test_where_syntax_errors(expression: str):
+    with pytest.raises(ValueError):
+        WhereFilter(expression)
+
+def test_where_matches_python_predicate():
+    lines = random_lines(3000)
+    where = WhereFilter('(status >= 500 or url ~ "^/api/users/") and request_method != "GET" and response_time <= 1.5')
+
+    def expected(line):
+        status, url = line.get("status"), line.get("url")
+        response_time = line.get("response_time")
+        return (
+            (status is not None and status >= 500 or url is not None and url.startswith("/api/users/"))
+            and line.get("request_method") != "GET"
+            and response_time is not None and response_time <= 1.5
+        )
+
+    assert [where(line) for line in lines] == [expected(line) for line in lines]
+
+@pytest.mark.parametrize("expression", [
+    'request_method == "POST"',
+    'url ~ "^/api/users/" and request_method in ("PUT", "POST")',
+    'url == "/health" or url ~ "^/api/ord"',
+    'request_method == "GET" and status >= 500',
+])
+def test_where_prefilter_never_rejects_kept_lines(expression: str):
+    where = WhereFilter(expression)
+    prefilter = where.get_prefilter()
+    assert prefilter is not None
+
+    lines = random_lines(2000, seed=3)
+    for line in lines:
+        if where(line):
+            assert prefilter(json.dumps(line).encode())
+    assert not all(prefilter(json.dumps(line).encode()) for line in lines)
+
+def test_where_prefilter_only_for_required_clauses():
+    assert WhereFilter("status >= 500").get_prefilter() is None
+    assert WhereFilter('request_method == "GET" or status == 500').get_prefilter() is None
+    assert WhereFilter('not request_method == "GET"').get_prefilter() is None
+    assert WhereFilter('url ~ "^/a|/b"').get_prefilter() is None
+
+def test_where_is_picklable():
+    where = WhereFilter('url ~ "^/api/" and status == 200')
+    restored = pickle.loads(pickle.dumps(where))
+
+    assert restored == where
+    assert restored({"url": "/api/x", "status": 200})
+
+def test_all_filters_combine():
+    day = DateFilter.for_day(datetime(2025, 6, 22, tzinfo=timezone.utc))
+    where = WhereFilter('request_method == "GET"')
+    combined = AllFilters.of(day, where)
+
+    assert AllFilters.of(AcceptAll(), where) is where
+    assert combined.get_fields() == ["@timestamp", "request_method"]
+    assert combined({"@timestamp": "2025-06-22T10:00:00+00:00", "request_method": "GET"})
+    assert not combined({"@timestamp": "2025-06-21T10:00:00+00:00", "request_method": "GET"})
+    prefilter = combined.get_prefilter()
+    assert not prefilter(b'{"@timestamp": "2025-06-22T10:00:00+00:00", "request_method": "POST"}')
+    assert not prefilter(b'{"@timestamp": "2025-06-21T10:00:00+00:00", "request_method": "GET"}')
+
+def test_build_reports_with_where():
+    log_file = str(FIXTURES_DIR / "valid.log")
+    where = WhereFilter('url == "/api/context/..."')
+
+    results = build_reports(log_file, [AvgResponseTime, UserAgent], where, RunOptions(use_cache=False))
+    expected = build_reports(log_file, [AvgResponseTime, UserAgent], lambda line: line["url"] == "/api/context/...", RunOptions(use_cache=False))
+
+    assert results == expected
+    assert [row[0] for row in results[0][0]] == ["/api/context/..."]
+
+def test_build_reports_parallel_with_where():
+    log_file = str(FIXTURES_DIR / "valid.log")
+    where = WhereFilter('url ~ "^/api/context"')
+
+    results = list(build_reports_parallel([log_file], [AvgResponseTime], where, 3, RunOptions(use_cache=False)))
+
+    assert results == [(log_file, build_reports(log_file, [AvgResponseTime], where, RunOptions(use_cache=False)))]
+
+def test_parse_args_where(tmp_path: pathlib.Path):
+    log_file = tmp_path / "access.log"
+    log_file.write_text("")
+    parser = init_parser()
+    args = ["main.py", "-f", str(log_file), "-r", "average", "--date", "2025-06-22", "--where", 'status == 500']
+
+    with mock.patch("sys.argv", args):
+        parsed_args = parse_args(parser)
+
+    assert parsed_args.where == WhereFilter("status == 500")
+    assert isinstance(parsed_args.line_filter, AllFilters)
+
+def test_parse_args_invalid_where(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]):
+    log_file = tmp_path / "access.log"
+    log_file.write_text("")
+    parser = init_parser()
+    args = ["main.py", "-f", str(log_file), "-r", "average", "--where", "status =="]
+
+    with mock.patch("sys.argv", args):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args(parser)
+
+    assert excinfo.value.code == 2
+    assert "invalid where expression" in capsys.readouterr().err
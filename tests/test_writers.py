@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+import pytest
+
+from main import main, collect_reports
+from logs_handler.reports import AvgResponseTime, UserAgent, Percentiles, TimeSeries, GroupBy
+from logs_handler.utils.writers import make_writer
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+VALID_LOG = str(FIXTURES_DIR / "valid.log")
+ROWS = [["/api/a", 3, Decimal("0.5")], ["/api/b", 1, Decimal("0.25")]]
+HEADERS = ["handler", "total", "avg_response_time"]
+
+def write(output_format: str) -> str:
+    stream = io.StringIO()
+    writer = make_writer(output_format, stream)
+    writer.begin()
+    writer.write("a.log", HEADERS, iter(ROWS))
+    writer.write("b.log", ["browser", "count"], iter([["x", 2]]))
+    writer.end()
+    return stream.getvalue()
+
+def test_csv_writer():
+    sections = write("csv").split("\n\n")
+
+    assert list(csv.reader(io.StringIO(sections[0]))) == [HEADERS, ["/api/a", "3", "0.5"], ["/api/b", "1", "0.25"]]
+    assert list(csv.reader(io.StringIO(sections[1]))) == [["browser", "count"], ["x", "2"]]
+
+def test_ndjson_writer():
+    rows = [json.loads(line) for line in write("ndjson").splitlines()]
+
+    assert rows == [
+        {"file": "a.log", "handler": "/api/a", "total": 3, "avg_response_time": 0.5},
+        {"file": "a.log", "handler": "/api/b", "total": 1, "avg_response_time": 0.25},
+        {"file": "b.log", "browser": "x", "count": 2}
+    ]
+
+def test_json_writer():
+    document = json.loads(write("json"))
+
+    assert document == [
+        {"file": "a.log", "headers": HEADERS, "rows": [["/api/a", 3, 0.5], ["/api/b", 1, 0.25]]},
+        {"file": "b.log", "headers": ["browser", "count"], "rows": [["x", 2]]}
+    ]
+
+def test_json_writer_without_reports():
+    stream = io.StringIO()
+    writer = make_writer("json", stream)
+    writer.begin()
+    writer.end()
+
+    assert json.loads(stream.getvalue()) == []
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        make_writer("xml")
+
+@pytest.mark.parametrize("report_class", [AvgResponseTime, UserAgent, Percentiles, TimeSeries, lambda: GroupBy(["url", "status"])])
+def test_limit_is_prefix_of_full_table(report_class):
+    report = collect_reports(VALID_LOG, [report_class])[0]
+    table = report.generate_table()
+
+    for limit in (1, 2, len(table) + 1):
+        assert list(report.iter_table(limit)) == table[:limit]
+
+def test_groupby_limit_and_top():
+    report = collect_reports(VALID_LOG, [lambda: GroupBy(["url"], limit=2)])[0]
+    full = collect_reports(VALID_LOG, [lambda: GroupBy(["url"])])[0].generate_table()
+
+    assert report.generate_table() == full[:2]
+    assert list(report.iter_table(1)) == full[:1]
+    assert list(report.iter_table(5)) == full[:2]
+
+def test_cli_format_and_limit(capsys: pytest.CaptureFixture[str]):
+    with mock.patch("sys.argv", ["main.py", "-f", VALID_LOG, "-r", "average", "--format", "ndjson", "--limit", "2"]):
+        main()
+
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    expected = collect_reports(VALID_LOG, [AvgResponseTime])[0].generate_table()[:2]
+    assert [[row["handler"], row["total"]] for row in rows] == [row[:2] for row in expected]